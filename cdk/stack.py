@@ -6,6 +6,7 @@ from aws_cdk import (
     aws_events as events,
     aws_events_targets as targets,
     aws_logs as logs,
+    aws_s3 as s3,
     Duration,
     RemovalPolicy,
 )
@@ -18,7 +19,10 @@ class RssFeedStack(Stack):
 
         # DynamoDB Table: RSSContent
         # Partition Key: url (String)
-        # GSI: StatusIndex (status, dateAdded)
+        # GSI: UnpublishedIndex (queue_feed, queue_sort), sparse and keys-only: only unpublished
+        # items carry queue_feed, one partition per feed. DynamoDB allows a single GSI creation or
+        # deletion per update, so when upgrading, add it, backfill it, then drop StatusIndex and
+        # FeedQueueIndex in separate deploys.
         self.rss_table = dynamodb.Table(
             self, "RSSContent",
             partition_key=dynamodb.Attribute(name="url", type=dynamodb.AttributeType.STRING),
@@ -27,10 +31,19 @@ class RssFeedStack(Stack):
         )
         
         self.rss_table.add_global_secondary_index(
-            index_name="StatusIndex",
-            partition_key=dynamodb.Attribute(name="status", type=dynamodb.AttributeType.STRING),
+            index_name="UnpublishedIndex",
+            partition_key=dynamodb.Attribute(name="queue_feed", type=dynamodb.AttributeType.STRING),
+            sort_key=dynamodb.Attribute(name="queue_sort", type=dynamodb.AttributeType.STRING),
+            projection_type=dynamodb.ProjectionType.KEYS_ONLY
+        )
+
+        # GSI: EnrichIndex (enrich_feed, dateAdded), sparse and keys-only: only items waiting for
+        # the enrichment stage carry enrich_feed. Deploy it on its own (one GSI change per update).
+        self.rss_table.add_global_secondary_index(
+            index_name="EnrichIndex",
+            partition_key=dynamodb.Attribute(name="enrich_feed", type=dynamodb.AttributeType.STRING),
             sort_key=dynamodb.Attribute(name="dateAdded", type=dynamodb.AttributeType.STRING),
-            projection_type=dynamodb.ProjectionType.ALL
+            projection_type=dynamodb.ProjectionType.KEYS_ONLY
         )
 
         # DynamoDB Table: FeedConfigurations
@@ -42,8 +55,67 @@ class RssFeedStack(Stack):
             removal_policy=RemovalPolicy.RETAIN
         )
 
+        # DynamoDB Table: FeedFetchState
+        # Partition Key: feed_url (String)
+        # Per feed URL state kept between fetch runs (ETag, Last-Modified, body hash)
+        self.fetch_state_table = dynamodb.Table(
+            self, "FeedFetchState",
+            partition_key=dynamodb.Attribute(name="feed_url", type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy=RemovalPolicy.RETAIN
+        )
+
+        # DynamoDB Table: SummaryCache
+        # Partition Key: digest (String), sha256 of the normalized article text, prompt version and model
+        # LLM summaries shared by every run and feed, expired through expires_at
+        self.summary_cache_table = dynamodb.Table(
+            self, "SummaryCache",
+            partition_key=dynamodb.Attribute(name="digest", type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
+        # Partition Key: domain (String), article host without www.
+        # Extraction strategy that last worked for each site, with per-strategy attempts, failures and latency
+        self.extraction_memo_table = dynamodb.Table(
+            self, "ExtractionMemo",
+            partition_key=dynamodb.Attribute(name="domain", type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
+        # S3 Bucket: durable copy of the seen-URL filter (Bloom filter of every ingested URL)
+        self.seen_filter_bucket = s3.Bucket(
+            self, "SeenFilterBucket",
+            block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+            encryption=s3.BucketEncryption.S3_MANAGED,
+            removal_policy=RemovalPolicy.RETAIN
+        )
+
         # Lambda Layer? (We use DockerImage so no layer needed presumably, or baking it in)
-        
+
+        # `cdk deploy -c fetch_enrich_inline=true`: Fetch enriches the items it stores itself, with
+        # ENRICH_WORKERS worker processes, instead of invoking the Enrich function. It then needs
+        # what Enrich has (caches, OpenAI key) and a second vCPU for the workers (over 1,769 MB).
+        enrich_inline = str(self.node.try_get_context("fetch_enrich_inline")).lower() == "true"
+        fetch_environment = {
+            "RSS_TABLE_NAME": self.rss_table.table_name,
+            "CONFIG_TABLE_NAME": self.config_table.table_name,
+            "FETCH_STATE_TABLE_NAME": self.fetch_state_table.table_name,
+            "SEEN_FILTER_BUCKET": self.seen_filter_bucket.bucket_name,
+            # Resume unfinished fetch runs in a new invocation
+            "FETCH_SELF_CONTINUE": "1"
+        }
+        if enrich_inline:
+            fetch_environment.update({
+                "FETCH_ENRICH_INLINE": "1",
+                "ENRICH_WORKERS": "2",
+                "SUMMARY_CACHE_TABLE_NAME": self.summary_cache_table.table_name,
+                "EXTRACTION_MEMO_TABLE_NAME": self.extraction_memo_table.table_name,
+                "PAGE_CACHE_DIR": "/tmp/pages",
+            })
+
         # 1. Fetch Feed Function
         self.fetch_function = _lambda.DockerImageFunction(
             self, "FetchFeedFunction",
@@ -52,15 +124,35 @@ class RssFeedStack(Stack):
                 cmd=["lambda_fetch.handler"]
             ),
             timeout=Duration.minutes(5),
+            memory_size=3538 if enrich_inline else 512,
+            log_retention=logs.RetentionDays.ONE_WEEK,
+            environment=fetch_environment
+        )
+
+        # 2. Enrich Function: article extraction, summary, hashtags and post text of new items
+        self.enrich_function = _lambda.DockerImageFunction(
+            self, "EnrichFunction",
+            code=_lambda.DockerImageCode.from_image_asset(
+                "../publishfeed",
+                cmd=["lambda_enrich.handler"]
+            ),
+            timeout=Duration.minutes(5),
             memory_size=512,
             log_retention=logs.RetentionDays.ONE_WEEK,
             environment={
                 "RSS_TABLE_NAME": self.rss_table.table_name,
-                "CONFIG_TABLE_NAME": self.config_table.table_name
+                "CONFIG_TABLE_NAME": self.config_table.table_name,
+                "SUMMARY_CACHE_TABLE_NAME": self.summary_cache_table.table_name,
+                "EXTRACTION_MEMO_TABLE_NAME": self.extraction_memo_table.table_name,
+                "PAGE_CACHE_DIR": "/tmp/pages",
             }
         )
+        if not enrich_inline:
+            # Fetch starts the enrichment as soon as it has stored new items
+            self.fetch_function.add_environment("ENRICH_FUNCTION_NAME", self.enrich_function.function_name)
+            self.enrich_function.grant_invoke(self.fetch_function)
 
-        # 2. Publish Feed Function
+        # 3. Publish Feed Function
         self.publish_function = _lambda.DockerImageFunction(
             self, "PublishFeedFunction",
             code=_lambda.DockerImageCode.from_image_asset(
@@ -73,6 +165,9 @@ class RssFeedStack(Stack):
             environment={
                 "RSS_TABLE_NAME": self.rss_table.table_name,
                 "CONFIG_TABLE_NAME": self.config_table.table_name,
+                "SUMMARY_CACHE_TABLE_NAME": self.summary_cache_table.table_name,
+                "EXTRACTION_MEMO_TABLE_NAME": self.extraction_memo_table.table_name,
+                "PAGE_CACHE_DIR": "/tmp/pages",
                 # TWEET_MAX_LENGTH etc defined in config.py in the image
             }
         )
@@ -80,9 +175,21 @@ class RssFeedStack(Stack):
         # Grant Permissions
         self.rss_table.grant_read_write_data(self.fetch_function)
         self.config_table.grant_read_data(self.fetch_function)
-        
+        self.fetch_state_table.grant_read_write_data(self.fetch_function)
+        self.seen_filter_bucket.grant_read_write(self.fetch_function)
+        if enrich_inline:
+            self.summary_cache_table.grant_read_write_data(self.fetch_function)
+            self.extraction_memo_table.grant_read_write_data(self.fetch_function)
+
+        self.rss_table.grant_read_write_data(self.enrich_function)
+        self.config_table.grant_read_data(self.enrich_function)
+        self.summary_cache_table.grant_read_write_data(self.enrich_function)
+        self.extraction_memo_table.grant_read_write_data(self.enrich_function)
+
         self.rss_table.grant_read_write_data(self.publish_function)
         self.config_table.grant_read_data(self.publish_function)
+        self.summary_cache_table.grant_read_write_data(self.publish_function)
+        self.extraction_memo_table.grant_read_write_data(self.publish_function)
         
         # Grant SSM Permissions (Broad grant for now or specific path?)
         # We need to grant access to /rss-feed/*
@@ -98,6 +205,17 @@ class RssFeedStack(Stack):
             resources=["arn:aws:ssm:*:*:parameter/rss-feed/*"]
         )
         self.publish_function.add_to_role_policy(ssm_policy)
+        # OpenAI key for the summaries
+        self.enrich_function.add_to_role_policy(ssm_policy)
+        if enrich_inline:
+            self.fetch_function.add_to_role_policy(ssm_policy)
+
+        # The fetch function re-invokes itself to resume a run cut short by its timeout.
+        # A name pattern avoids the circular dependency of granting on its own ARN.
+        self.fetch_function.add_to_role_policy(iam.PolicyStatement(
+            actions=["lambda:InvokeFunction"],
+            resources=[f"arn:aws:lambda:{self.region}:{self.account}:function:{self.stack_name}-FetchFeedFunction*"]
+        ))
 
 
         # Scheduler
@@ -108,7 +226,14 @@ class RssFeedStack(Stack):
         )
         rule_fetch.add_target(targets.LambdaFunction(self.fetch_function))
 
-        # 2. Publish Every 2 Hours
+        # 2. Enrich Hourly, picking up what the run started by Fetch left over
+        rule_enrich = events.Rule(
+            self, "RuleEnrichHourly",
+            schedule=events.Schedule.rate(Duration.hours(1))
+        )
+        rule_enrich.add_target(targets.LambdaFunction(self.enrich_function))
+
+        # 3. Publish Every 2 Hours
         rule_publish = events.Rule(
             self, "RulePublishEvery2Hours",
             schedule=events.Schedule.rate(Duration.hours(2))
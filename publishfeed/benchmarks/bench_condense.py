@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""
+LLM input tokens and time-to-summary per article, before and after
+condensing the extracted text to LLM_INPUT_TOKEN_BUDGET tokens.
+
+Articles are read from a directory of saved HTML pages (--corpus, *.html,
+the first <title> or <h1> is the title), or synthesized: long pages with
+navigation, related links, comments and a footer around the article.
+Each page goes through both extraction paths of llm_helpers: newspaper on
+the HTML, and the page-wide BeautifulSoup text the fallbacks return.
+
+Time-to-summary is the condensation time plus the LLM call. The call is
+modelled (--base-ms + --ms-per-1k-tokens per 1000 prompt tokens) unless
+--live is given, which calls OpenAI through summarize_text (needs a key;
+the summary cache is bypassed).
+
+    python benchmarks/bench_condense.py --pages 40
+    python benchmarks/bench_condense.py --corpus ~/saved_articles --live
+"""
+import argparse
+import glob
+import os
+import random
+import statistics
+import sys
+import time
+import unittest.mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import newspaper
+from bs4 import BeautifulSoup
+
+import config
+import llm_helpers
+from condense import condense, estimate_tokens
+
+WORDS = ('cloud kubernetes cluster release security patch database latency model training inference '
+         'container serverless network storage developer platform update feature performance team '
+         'customer region outage migration pipeline observability cost scale').split()
+
+
+TEMPLATES = (
+    'The {} team said that the new {} update will improve {} for most of their {} customers.',
+    'According to the announcement, {} and {} are now available in every {} region.',
+    'This is a change that many {} users have been asking for since the last {} release.',
+    'It also means that the {} can be moved to {} without any {} downtime.',
+    'Engineers who tested the {} reported that {} dropped while {} stayed the same.',
+)
+
+
+def sentence(rng, topic=()):
+    template = rng.choice(TEMPLATES)
+    words = list(topic) + rng.sample(WORDS, template.count('{}'))
+    return template.format(*words[:template.count('{}')])
+
+
+def synthetic_page(rng, index):
+    topic = rng.sample(WORDS, 3)
+    title = f"{' '.join(topic).title()} explained: what changes in release {index}"
+    nav = ''.join(f'<li><a href="/s/{i}">Section {i}</a></li>' for i in range(40))
+    body = [f'<h1>{title}</h1>', f'<p>{" ".join(sentence(rng, topic) for _ in range(3))}</p>']
+    for section in range(rng.randint(4, 8)):
+        body.append(f'<h2>{" ".join(rng.sample(WORDS, 3)).title()}</h2>')
+        for _ in range(rng.randint(4, 9)):
+            body.append(f'<p>{" ".join(sentence(rng) for _ in range(rng.randint(3, 6)))}</p>')
+    related = ''.join(f'<li><a href="/a/{i}">{sentence(rng)}</a></li>' for i in range(25))
+    comments = ''.join(f'<div class="comment"><p>{sentence(rng)} {sentence(rng)}</p></div>' for _ in range(60))
+    return f"""<html><head><title>{title}</title></head><body>
+<header><nav><ul>{nav}</ul></nav></header>
+<article>{''.join(body)}</article>
+<aside><h3>Related</h3><ul>{related}</ul></aside>
+<section id="comments">{comments}</section>
+<footer><p>Subscribe to our newsletter. Privacy policy. Terms of use. Cookie settings.</p></footer>
+</body></html>"""
+
+
+def load_corpus(directory, pages):
+    if directory:
+        for path in sorted(glob.glob(os.path.join(os.path.expanduser(directory), '*.html'))):
+            with open(path, encoding='utf-8', errors='replace') as f:
+                yield os.path.basename(path), f.read()
+        return
+    rng = random.Random(1)
+    for index in range(pages):
+        yield f'synthetic-{index:03d}', synthetic_page(rng, index)
+
+
+def extractions(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    heading = soup.find('title') or soup.find('h1')
+    title = heading.get_text(strip=True) if heading else ''
+
+    article = newspaper.Article('https://example.com/article')
+    article.download(input_html=html)
+    article.parse()
+    page_text = soup.get_text(' ', strip=True)
+    return title, {'newspaper': article.text or page_text, 'page text': page_text}
+
+
+def prompt_tokens(text):
+    return estimate_tokens(llm_helpers.SUMMARY_PROMPT.format(text=text))
+
+
+def time_to_summary(text, title, condensed, args):
+    started = time.perf_counter()
+    if condensed:
+        text = condense(text, title)
+    condense_ms = (time.perf_counter() - started) * 1000
+    tokens = prompt_tokens(text)
+    if args.live:
+        started = time.perf_counter()
+        with unittest.mock.patch('llm_helpers.condense', lambda text, title: text), \
+                unittest.mock.patch('summary_cache.SummaryCache.get', return_value=None):
+            llm_helpers.summarize_text(text, title=title)
+        llm_ms = (time.perf_counter() - started) * 1000
+    else:
+        llm_ms = args.base_ms + args.ms_per_1k_tokens * tokens / 1000
+    return tokens, condense_ms, condense_ms + llm_ms
+
+
+def report(name, rows):
+    tokens = [row[0] for row in rows]
+    condense_ms = [row[1] for row in rows]
+    total_ms = [row[2] for row in rows]
+    print(f"  {name:<26} input tokens median {statistics.median(tokens):7.0f}  max {max(tokens):7d}  "
+          f"condense {statistics.mean(condense_ms):5.1f} ms  "
+          f"time-to-summary median {statistics.median(total_ms):6.0f} ms  max {max(total_ms):6.0f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark LLM input condensation')
+    parser.add_argument('--corpus', help='directory of saved article HTML (*.html)')
+    parser.add_argument('--pages', type=int, default=40, help='synthetic pages without --corpus')
+    parser.add_argument('--budget', type=int, default=config.LLM_INPUT_TOKEN_BUDGET)
+    parser.add_argument('--base-ms', type=float, default=900, help='modelled LLM latency at 0 tokens')
+    parser.add_argument('--ms-per-1k-tokens', type=float, default=250, help='modelled LLM latency per 1000 prompt tokens')
+    parser.add_argument('--live', action='store_true', help='call OpenAI instead of the latency model')
+    args = parser.parse_args()
+    config.LLM_INPUT_TOKEN_BUDGET = args.budget
+
+    results = {}
+    count = 0
+    for name, html in load_corpus(args.corpus, args.pages):
+        title, texts = extractions(html)
+        count += 1
+        for path, text in texts.items():
+            for condensed in (False, True):
+                results.setdefault((path, condensed), []).append(time_to_summary(text, title, condensed, args))
+
+    model = 'live OpenAI' if args.live else f'modelled LLM ({args.base_ms:.0f} ms + {args.ms_per_1k_tokens:.0f} ms/1k tokens)'
+    print(f"{count} articles, budget {args.budget} tokens, {model}")
+    for (path, condensed), rows in results.items():
+        report(f"{path}, {'after' if condensed else 'before'}", rows)
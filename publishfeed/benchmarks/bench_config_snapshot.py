@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Per-invocation cost of loading feed configs, before and after the config
+snapshot: the old single scan plus one get_item (and two DynamoDBOps) per
+feed, against one paginated scan shared by every helper.
+
+DynamoDB is an in-memory table with a fixed latency per round trip; boto3
+clients and resources are really created, so their setup cost is included.
+
+    python benchmarks/bench_config_snapshot.py --feeds 50 --latency 0.01
+"""
+import argparse
+import os
+import sys
+import time
+import unittest.mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+import boto3
+
+import clients
+from config_snapshot import clear_config_snapshot, load_config_snapshot
+from dynamo_ops import DynamoDBOps
+from helpers import Helper
+from test_data.fake_dynamodb import FakeDynamoDBResource
+
+_real_resource = boto3.resource
+
+
+class SlowResource(FakeDynamoDBResource):
+    """
+    FakeDynamoDBResource whose table calls each take `latency` seconds.
+    """
+    def __init__(self, latency, page_size, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.page_size = page_size
+
+    def Table(self, name):
+        table = super().Table(name)
+        if not hasattr(table, 'slow'):
+            table.slow = True
+            table.page_size = self.page_size
+            for operation in ('get_item', 'scan'):
+                method = getattr(table, operation)
+                setattr(table, operation, self._delayed(method))
+        return table
+
+    def _delayed(self, method):
+        def call(*args, **kwargs):
+            time.sleep(self.latency)
+            return method(*args, **kwargs)
+        return call
+
+
+def old_invocation(resource):
+    feeds = DynamoDBOps().config_table.scan()['Items']
+    for feed in feeds:
+        Helper(feed['feed_id'])
+    return len(feeds)
+
+
+def new_invocation(resource):
+    db_ops = DynamoDBOps()
+    feeds = load_config_snapshot(db_ops)
+    for feed in feeds:
+        Helper(feed.feed_id, feed_config=feed, db_ops=db_ops)
+    return len(feeds)
+
+
+def bench(name, invocation, resource, warm_runs):
+    def make_resource(*args, **kwargs):
+        _real_resource('dynamodb') # pay the real setup cost
+        return resource
+
+    clear_config_snapshot()
+    clients.clear()
+    with unittest.mock.patch('boto3.resource', make_resource):
+        started = time.perf_counter()
+        loaded = invocation(resource)
+        cold = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(warm_runs):
+            invocation(resource)
+        warm = (time.perf_counter() - started) / warm_runs
+    print(f"  {name}: {loaded} feeds loaded, cold {cold * 1000:.0f} ms, warm {warm * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark feed config loading per invocation')
+    parser.add_argument('--feeds', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.01, help='seconds per DynamoDB round trip')
+    parser.add_argument('--page-size', type=int, default=None,
+                        help='configs per scan page (emulates the 1 MB limit)')
+    parser.add_argument('--warm-runs', type=int, default=5)
+    args = parser.parse_args()
+
+    resource = SlowResource(args.latency, args.page_size, keys={'FeedConfigurations': 'feed_id'})
+    table = resource.Table('FeedConfigurations')
+    for i in range(args.feeds):
+        table.put_item(Item={'feed_id': f'feed{i:03d}', 'urls': [f'https://example.com/{i}/rss'],
+                             'hashtags': '#news'})
+    table.put_item(Item={'feed_id': '__meta__', 'version': 'bench'})
+
+    print(f"{args.feeds} feeds, {args.latency * 1000:.0f} ms per round trip, page size {args.page_size}")
+    bench('before (scan + get_item per feed)', old_invocation, resource, args.warm_runs)
+    bench('after (cached config snapshot)', new_invocation, resource, args.warm_runs)
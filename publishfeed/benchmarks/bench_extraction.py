@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Extraction attempts, requests and time per article, with and without the
+per-domain strategy memo.
+
+Each site is a local HTTP server (see test_data/article_pages.py) whose
+articles only one strategy can extract: 'newspaper' sites, 'list' sites
+(BeautifulSoup only) and 'blocked' sites (curl-like request only). Every
+article is extracted once with the memo forgotten before each article
+(every article walks the strategies in their default order), then once
+more with the memo kept across articles.
+
+    python benchmarks/bench_extraction.py --sites 3 --articles 10
+"""
+import argparse
+import contextlib
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import llm_helpers
+from extraction_memo import clear_extraction_memo, get_extraction_memo
+from page_cache import reset_page_cache
+from test_data.article_pages import SITE_KINDS, site_routes
+from test_data.feed_server import FeedServer
+
+
+def run(servers, articles, memo):
+    clear_extraction_memo()
+    reset_page_cache()
+    timings = []
+    requests = 0
+    extracted = 0
+    attempts = 0
+    for index in range(articles):
+        for server in servers:
+            if not memo:
+                attempts += get_extraction_memo().stats()['attempts']
+                clear_extraction_memo()
+            before = len(server.requests)
+            started = time.perf_counter()
+            if llm_helpers.extract_article_text(server.url(f'/article{index}')):
+                extracted += 1
+            timings.append((time.perf_counter() - started) * 1000)
+            requests += len(server.requests) - before
+    attempts += get_extraction_memo().stats()['attempts']
+    count = len(timings)
+    print(f"  {'memo' if memo else 'no memo':<8} attempts/article {attempts / count:4.2f}  "
+          f"requests/article {requests / count:4.2f}  extracted {extracted}/{count}  "
+          f"median {statistics.median(timings):6.1f} ms  max {max(timings):6.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark article extraction with the strategy memo')
+    parser.add_argument('--sites', type=int, default=2, help='sites of each kind')
+    parser.add_argument('--articles', type=int, default=10, help='articles per site')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    kinds = [kind for kind in SITE_KINDS for _ in range(args.sites)]
+    with contextlib.ExitStack() as stack:
+        servers = [stack.enter_context(FeedServer(site_routes(kind, args.articles))) for kind in kinds]
+        print(f"{len(servers)} sites ({', '.join(SITE_KINDS)}), {args.articles} articles each")
+        run(servers, args.articles, memo=False)
+        run(servers, args.articles, memo=True)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Titles per second of hashtag generation: the previous per-call loop (a
+regex compiled and a fuzz.partial_ratio per keyword), the compiled
+HashtagMatcher one title at a time, and generate_hashtags_batch; then
+batches matched with a feed dictionary of only --feed-keywords keywords.
+
+Titles are the golden set of the tests (test_data/hashtag_titles.py),
+repeated to --titles titles.
+
+    python benchmarks/bench_hashtags.py --titles 5000
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from rapidfuzz import fuzz
+
+from generate_hashtags_fuzzy import KEYWORDS_TO_HASHTAGS, HashtagMatcher, generate_hashtags_batch, generate_hashtags_fuzzy
+from test_data.hashtag_titles import TITLES
+
+
+def previous_hashtags(title):
+    """The loop generate_hashtags_fuzzy ran before HashtagMatcher."""
+    hashtags = set()
+    title_clean = re.sub(r"[^\w\s]", "", title.lower())
+    for phrase, hashtag in dict(KEYWORDS_TO_HASHTAGS).items():
+        pattern = r'\b' + re.escape(phrase.lower()) + r'\b'
+        if re.search(pattern, title_clean):
+            hashtags.add(hashtag)
+        elif fuzz.partial_ratio(phrase.lower(), title_clean) >= 85:
+            hashtags.add(hashtag)
+    return list(hashtags)
+
+
+def run(name, generate, titles):
+    started = time.perf_counter()
+    results = generate(titles)
+    elapsed = time.perf_counter() - started
+    print(f"  {name:<10} {len(titles) / elapsed:9.0f} titles/s")
+    return [sorted(hashtags) for hashtags in results]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark hashtag generation')
+    parser.add_argument('--titles', type=int, default=5000, help='titles matched')
+    parser.add_argument('--feed-keywords', type=int, default=10, help='keywords of the feed dictionary')
+    args = parser.parse_args()
+
+    titles = (TITLES * (args.titles // len(TITLES) + 1))[:args.titles]
+    print(f"{len(titles)} titles, {len(KEYWORDS_TO_HASHTAGS)} keywords")
+    expected = run('previous', lambda titles: [previous_hashtags(title) for title in titles], titles)
+    assert run('single', lambda titles: [generate_hashtags_fuzzy(title) for title in titles], titles) == expected
+    assert run('batch', generate_hashtags_batch, titles) == expected
+    feed = HashtagMatcher(dict(list(KEYWORDS_TO_HASHTAGS.items())[:args.feed_keywords]))
+    run(f'feed ({len(feed)})', feed.match_batch, titles)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Throughput and peak memory of HTML to text extraction: the single-parse
+lxml extractor (html_text.py) against newspaper and the BeautifulSoup
+path that _extract_with_advanced_requests used before it (html.parser,
+decompose, then up to 14 CSS selects).
+
+Pages are read from a directory of saved HTML pages (--corpus, *.html),
+or synthesized like in bench_condense.py. Throughput is pages per second
+over --repeat passes on the corpus. Memory is reported twice: the largest
+Python heap peak (tracemalloc) while extracting a single page, and the
+growth of the peak RSS of a forked process extracting the whole corpus,
+which includes what libxml2 allocates outside the Python heap.
+
+    python benchmarks/bench_html_text.py --pages 40
+    python benchmarks/bench_html_text.py --corpus ~/saved_articles
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import newspaper
+from bs4 import BeautifulSoup
+
+from bench_condense import load_corpus
+from html_text import extract_text
+
+CONTENT_SELECTORS = [
+    "article", '[role="main"]', "main", ".content", ".post-content", ".entry-content",
+    ".article-content", ".post-body", ".story-body", ".post", ".entry", ".article",
+    ".blog-post", ".single-post",
+]
+
+
+def beautifulsoup_text(html):
+    """The previous advanced fallback parse."""
+    soup = BeautifulSoup(html, "html.parser")
+    for element in soup(["script", "style", "nav", "header", "footer", "aside", "iframe", "noscript"]):
+        element.decompose()
+    text = ""
+    for selector in CONTENT_SELECTORS:
+        elements = soup.select(selector)
+        if elements:
+            text = " ".join([elem.get_text(strip=True) for elem in elements])
+            if len(text) > 200:
+                break
+    if not text or len(text) < 200:
+        body = soup.find("body")
+        if body:
+            text = body.get_text(strip=True)
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    return " ".join(lines)
+
+
+def newspaper_text(html):
+    article = newspaper.Article('https://example.com/article')
+    article.download(input_html=html)
+    article.parse()
+    return article.text
+
+
+EXTRACTORS = {
+    'newspaper': newspaper_text,
+    'beautifulsoup': beautifulsoup_text,
+    'lxml': extract_text,
+}
+
+
+def rss_growth(extract, pages, connection):
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for html in pages:
+        extract(html)
+    connection.send(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+
+
+def peak_rss_growth(extract, pages):
+    """
+    Peak RSS growth in KiB of a forked process extracting every page.
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.get_context('fork').Process(target=rss_growth, args=(extract, pages, sender))
+    process.start()
+    growth = receiver.recv()
+    process.join()
+    return growth
+
+
+def run(name, extract, pages, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        lengths = [len(extract(html)) for html in pages]
+    elapsed = time.perf_counter() - started
+
+    peaks = []
+    for html in pages:
+        tracemalloc.start()
+        extract(html)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    print(f"  {name:<14} {len(pages) * repeat / elapsed:7.1f} pages/s  "
+          f"python heap peak {max(peaks) / 2**20:5.2f} MiB  "
+          f"peak RSS growth {peak_rss_growth(extract, pages) / 1024:6.1f} MiB  "
+          f"text median {statistics.median(lengths):7.0f} chars")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark HTML to text extraction')
+    parser.add_argument('--corpus', help='directory of saved article HTML (*.html)')
+    parser.add_argument('--pages', type=int, default=40, help='synthetic pages without --corpus')
+    parser.add_argument('--repeat', type=int, default=3, help='passes over the corpus for throughput')
+    args = parser.parse_args()
+
+    pages = [html for name, html in load_corpus(args.corpus, args.pages)]
+    size = statistics.median(len(html) for html in pages)
+    print(f"{len(pages)} pages, median {size / 1024:.0f} KiB")
+    for name, extract in EXTRACTORS.items():
+        run(name, extract, pages, args.repeat)
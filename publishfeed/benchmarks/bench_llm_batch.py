@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Wall time to summarize a day's worth of new items one call after the
+other (summarize_text per item, as before) against one summarize_many
+batch, over the local stub chat completions server from test_data.
+
+    python benchmarks/bench_llm_batch.py --items 40 --latency 1.5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import clients
+import llm_helpers
+from llm_client import LLMClient, OpenAIChatProvider
+from summary_cache import clear_summary_cache
+from test_data.stub_llm import LLMServer
+
+
+def bench(name, summarize, server, count):
+    clear_summary_cache()
+    requests_before = len(server.requests)
+    started = time.perf_counter()
+    summaries = summarize()
+    elapsed = time.perf_counter() - started
+    done = sum(1 for summary in summaries if summary)
+    print(f"  {name:<36} {elapsed:6.2f} s  {done}/{count} summaries  "
+          f"{len(server.requests) - requests_before} requests, peak {server.peak} in flight")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark batched LLM summarization')
+    parser.add_argument('--items', type=int, default=40)
+    parser.add_argument('--latency', type=float, default=1.5, help='seconds per stub completion')
+    parser.add_argument('--concurrency', type=int, default=None)
+    args = parser.parse_args()
+
+    texts = [f'Article {i} explains what release {i} of the platform changes for its users. ' * 30
+             for i in range(args.items)]
+    with LLMServer(latency=args.latency) as server:
+        client = LLMClient(OpenAIChatProvider(lambda: 'sk-bench', api_base=server.api_base),
+                           max_concurrency=args.concurrency)
+        print(f"{args.items} items, {args.latency:.1f} s per completion, "
+              f"{client.max_concurrency} requests in flight at most")
+        with clients.override('llm', client):
+            bench('before: summarize_text per item', lambda: [llm_helpers.summarize_text(t) for t in texts],
+                  server, args.items)
+            server.peak = 0
+            bench('after: summarize_many', lambda: llm_helpers.summarize_many(texts), server, args.items)
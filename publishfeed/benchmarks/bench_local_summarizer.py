@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+"""
+Quality and latency of the local extractive summarizer against simple
+baselines on a fixed corpus.
+
+The corpus is a handful of short tech news articles, each with a
+hand-written one or two sentence reference summary. Every summarizer is
+scored with ROUGE-1 and ROUGE-2 F1 against the reference (unigram and
+bigram overlap of lowercased words) and timed per article:
+
+- lead-1: the first sentence
+- lead-3: the first three sentences, cut to --max-chars
+- local: local_summarizer.summarize_local
+- llm: llm_helpers.summarize_text, only with --live (needs a key; the
+  summary cache is bypassed)
+
+    python benchmarks/bench_local_summarizer.py --repeat 20
+    python benchmarks/bench_local_summarizer.py --live
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+import unittest.mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import config
+import local_summarizer
+from local_summarizer import summarize_local
+
+CORPUS = [
+    {
+        'title': 'Python 3.13 ships an experimental free-threaded build',
+        'text': (
+            "Python 3.13 was released this week with a long list of changes.\n"
+            "The most discussed one is an experimental build that runs without the global interpreter lock. "
+            "Removing the lock lets Python threads run on several CPU cores at the same time. "
+            "The free-threaded build is optional and has to be installed separately.\n"
+            "Single-threaded code is currently slower on the free-threaded build. "
+            "The core developers expect that overhead to shrink over the next releases. "
+            "Extension modules written in C need to be rebuilt and declare that they support running without the lock.\n"
+            "The release also brings a new interactive interpreter with colour and multi-line editing. "
+            "An experimental just-in-time compiler is included but disabled by default."
+        ),
+        'reference': (
+            "Python 3.13 adds an experimental free-threaded build without the global interpreter lock, "
+            "letting threads run on several CPU cores."
+        ),
+    },
+    {
+        'title': 'Major cloud outage takes down services across a region',
+        'text': (
+            "Thousands of websites went offline on Tuesday afternoon.\n"
+            "A major cloud provider suffered an outage in one of its busiest regions that lasted nearly four hours. "
+            "The outage was caused by a faulty network configuration change pushed during routine maintenance. "
+            "Services that ran in a single region were hit hardest, while applications spread across regions kept working.\n"
+            "The provider rolled back the change and restored most services by the evening. "
+            "It said it will add more checks before configuration changes reach production. "
+            "Customers affected by the outage will receive service credits."
+        ),
+        'reference': (
+            "A faulty network configuration change caused a four hour cloud outage in one region, "
+            "taking down services that were not spread across regions."
+        ),
+    },
+    {
+        'title': 'Critical vulnerability found in popular logging library',
+        'text': (
+            "Security researchers disclosed a critical vulnerability in a widely used logging library on Friday.\n"
+            "The flaw allows remote code execution when an attacker controls a string that gets logged. "
+            "Because the library is used by millions of applications, the impact is expected to be broad. "
+            "Exploit attempts were observed within hours of the disclosure.\n"
+            "The maintainers released a patched version and urged all users to upgrade immediately. "
+            "Teams that cannot upgrade right away can disable the vulnerable lookup feature as a workaround. "
+            "Several government agencies issued advisories about the flaw."
+        ),
+        'reference': (
+            "A critical remote code execution vulnerability in a popular logging library is being exploited; "
+            "users should upgrade to the patched version immediately."
+        ),
+    },
+    {
+        'title': 'Database vendor releases vector search for AI applications',
+        'text': (
+            "The company held its annual developer conference in San Francisco.\n"
+            "Its open source database now supports vector search, a feature aimed at AI applications. "
+            "Vector search lets developers store embeddings next to their regular data and query them by similarity. "
+            "The vendor says the new index answers similarity queries in a few milliseconds on millions of vectors.\n"
+            "Until now many teams ran a separate vector database next to their main one. "
+            "Keeping both in one database removes the need to synchronize them. "
+            "The feature is available in preview for all cloud customers."
+        ),
+        'reference': (
+            "The database now supports vector search for AI applications, so embeddings can be queried "
+            "by similarity without a separate vector database."
+        ),
+    },
+    {
+        'title': 'Kubernetes release deprecates the old container runtime interface',
+        'text': (
+            "The latest Kubernetes release contains more than forty enhancements.\n"
+            "The old container runtime interface is now deprecated and will be removed in two releases. "
+            "Clusters still using it need to move to a runtime that implements the current interface. "
+            "Most managed Kubernetes services have already migrated their clusters.\n"
+            "The release also graduates sidecar containers to stable. "
+            "Sidecar containers start before the main container and stop after it. "
+            "Release notes list the changes that may need action from cluster administrators."
+        ),
+        'reference': (
+            "Kubernetes deprecates the old container runtime interface, so clusters using it must migrate "
+            "before it is removed in two releases."
+        ),
+    },
+    {
+        'title': 'Browser vendors agree on a shared benchmark for web performance',
+        'text': (
+            "Performance has long been a point of competition between browsers.\n"
+            "The major browser vendors announced a shared benchmark that measures the responsiveness of web applications. "
+            "The benchmark runs common tasks such as adding items to a to-do list and rendering charts. "
+            "Each vendor previously optimized for its own set of tests.\n"
+            "A shared benchmark means improvements for one browser should also make the web faster for everyone. "
+            "The benchmark is open source and developed in a public repository. "
+            "The first results show large differences between browsers on some tasks."
+        ),
+        'reference': (
+            "Browser vendors agreed on a shared open source benchmark for web application responsiveness "
+            "instead of optimizing for their own tests."
+        ),
+    },
+]
+
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def ngrams(text, n):
+    words = WORD.findall(text.lower())
+    grams = {}
+    for i in range(len(words) - n + 1):
+        gram = tuple(words[i:i + n])
+        grams[gram] = grams.get(gram, 0) + 1
+    return grams
+
+
+def rouge(summary, reference, n):
+    candidate, wanted = ngrams(summary, n), ngrams(reference, n)
+    overlap = sum(min(count, wanted.get(gram, 0)) for gram, count in candidate.items())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(candidate.values())
+    recall = overlap / sum(wanted.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def lead(count, max_chars):
+    def summarize(text, title):
+        sentences = local_summarizer.sentences(text)
+        summary = ' '.join(sentences[:count])
+        if len(summary) > max_chars:
+            summary = summary[:max_chars - 1].rsplit(' ', 1)[0] + '…'
+        return summary
+    return summarize
+
+
+def llm(text, title):
+    import llm_helpers
+    with unittest.mock.patch('summary_cache.SummaryCache.get', return_value=None):
+        return llm_helpers.summarize_text(text, title=title)
+
+
+def run(name, summarize, repeat):
+    rouge1, rouge2, ms = [], [], []
+    for article in CORPUS:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            summary = summarize(article['text'], article['title'])
+            timings.append((time.perf_counter() - started) * 1000)
+        rouge1.append(rouge(summary, article['reference'], 1))
+        rouge2.append(rouge(summary, article['reference'], 2))
+        ms.append(statistics.median(timings))
+    print(f"  {name:<8} ROUGE-1 {statistics.mean(rouge1):.3f}  ROUGE-2 {statistics.mean(rouge2):.3f}  "
+          f"median {statistics.median(ms):8.2f} ms  max {max(ms):8.2f} ms per article")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the local extractive summarizer')
+    parser.add_argument('--max-chars', type=int, default=config.LOCAL_SUMMARY_MAX_CHARS)
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per article (median is kept)')
+    parser.add_argument('--live', action='store_true', help='also score the OpenAI summary')
+    parser.add_argument('--show', action='store_true', help='print the local summary of each article')
+    args = parser.parse_args()
+
+    summarizers = {
+        'lead-1': lead(1, args.max_chars),
+        'lead-3': lead(3, args.max_chars),
+        'local': lambda text, title: summarize_local(text, title, args.max_chars),
+    }
+    if args.live:
+        summarizers['llm'] = llm
+
+    print(f"{len(CORPUS)} articles, summaries up to {args.max_chars} characters")
+    for name, summarize in summarizers.items():
+        run(name, summarize, 1 if name == 'llm' else args.repeat)
+    if args.show:
+        for article in CORPUS:
+            print(f"\n{article['title']}\n  {summarize_local(article['text'], article['title'], args.max_chars)}")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Items per second of batch enrichment in this process (enrichment.enrich_items)
+against enrich_parallel with 1, 2, 4... worker processes.
+
+Pages are synthesized like in bench_condense.py (or read from --corpus) and
+served by a local HTTP server, optionally answering after --delay seconds to
+stand for the network. Summaries use the offline summarizer, so the numbers
+are download, extraction, hashtags and thumbnail only. Worker processes only
+help with as many CPUs as workers: the CPU count is printed first.
+
+    python benchmarks/bench_parallel_enrich.py --pages 60 --workers 1 2 4
+    python benchmarks/bench_parallel_enrich.py --delay 0.2
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_condense import load_corpus
+from config_snapshot import FeedConfig
+from enrichment import enrich_items
+from extraction_memo import clear_extraction_memo
+from page_cache import reset_page_cache
+from parallel_enrich import enrich_parallel
+from test_data.feed_server import FeedServer
+
+
+def run(name, enrich, items):
+    clear_extraction_memo()
+    reset_page_cache()
+    started = time.perf_counter()
+    enriched = sum(1 for attributes in enrich(items) if attributes['text_digest'])
+    elapsed = time.perf_counter() - started
+    print(f"  {name:<12} {len(items) / elapsed:6.1f} items/s  {elapsed:6.2f} s  extracted {enriched}/{len(items)}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark enrichment with worker processes')
+    parser.add_argument('--corpus', help='directory of saved article HTML (*.html)')
+    parser.add_argument('--pages', type=int, default=60, help='synthetic pages without --corpus')
+    parser.add_argument('--delay', type=float, default=0.0, help='seconds before the server answers')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='worker counts to compare')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    routes = {f'/{name}': {'body': html.encode('utf-8'), 'delay': args.delay}
+              for name, html in load_corpus(args.corpus, args.pages)}
+    feed = FeedConfig({'feed_id': 'bench', 'summarizer': 'local'})
+    with FeedServer(routes) as server:
+        items = [{'url': server.url(path), 'title': f'Kubernetes and serverless databases {index}'}
+                 for index, path in enumerate(routes)]
+        print(f"{len(items)} pages, {os.cpu_count()} CPUs, delay {args.delay:.2f} s")
+        run('in process', lambda items: enrich_items(items, feed), items)
+        for workers in args.workers:
+            run(f'{workers} workers',
+                lambda items: (attributes for item, attributes in enrich_parallel(items, feed, workers=workers)),
+                items)
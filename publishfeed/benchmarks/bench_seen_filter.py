@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Lookup cost and memory of the seen-URL filter.
+
+    python benchmarks/bench_seen_filter.py --urls 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from seen_filter import BloomFilter
+
+
+def bench(num_urls, fp_rate, lookups):
+    bloom = BloomFilter.for_capacity(num_urls, fp_rate=fp_rate, max_bytes=1 << 30)
+    urls = [f"https://example.com/{i}/some-article-slug" for i in range(num_urls)]
+
+    started = time.perf_counter()
+    for url in urls:
+        bloom.add(url)
+    add_seconds = time.perf_counter() - started
+
+    seen = urls[:lookups]
+    unseen = [f"https://example.org/{i}/another-article" for i in range(lookups)]
+
+    started = time.perf_counter()
+    for url in seen:
+        url in bloom
+    seen_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    false_positives = sum(1 for url in unseen if url in bloom)
+    unseen_seconds = time.perf_counter() - started
+
+    blob = bloom.to_bytes()
+    print(f"URLs: {num_urls}  target fp rate: {fp_rate}  hashes: {bloom.num_hashes}")
+    print(f"  memory: {len(bloom.bits) / 1024 / 1024:.2f} MiB "
+          f"({len(bloom.bits) * 8 / num_urls:.1f} bits/URL, "
+          f"{len(bloom.bits) / 1024 / 1024 / num_urls * 1e6:.2f} MiB per million URLs)")
+    print(f"  blob size: {len(blob)} bytes")
+    print(f"  add: {add_seconds / num_urls * 1e6:.2f} us/URL")
+    print(f"  lookup (seen): {seen_seconds / lookups * 1e6:.2f} us/URL")
+    print(f"  lookup (unseen): {unseen_seconds / lookups * 1e6:.2f} us/URL")
+    print(f"  measured fp rate: {false_positives / lookups:.4%} "
+          f"(expected {bloom.expected_fp_rate:.4%})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the seen-URL filter')
+    parser.add_argument('--urls', type=int, default=1000000)
+    parser.add_argument('--lookups', type=int, default=100000)
+    parser.add_argument('--fp-rate', type=float, nargs='+', default=[0.01, 0.001])
+    args = parser.parse_args()
+
+    for fp_rate in args.fp_rate:
+        bench(args.urls, fp_rate, args.lookups)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+Read units consumed per selection over a synthetic backlog, for the
+earlier StatusIndex sample (50 oldest full items, random.choice) and each
+selection policy on the sparse keys-only UnpublishedIndex.
+
+DynamoDB is the in-memory fake from test_data, charging 0.5 read units
+per started 4 KB like an eventually consistent read.
+
+    python benchmarks/bench_selection.py --items 100000 --selections 100
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from boto3.dynamodb.conditions import Key
+
+import clients
+from dynamo_ops import QUEUE_INDEX, DynamoDBOps
+from selection import selection_policy
+from test_data.fake_dynamodb import FakeDynamoDBResource
+
+START = datetime(2025, 1, 1)
+WORDS = ['cloud', 'python', 'security', 'kubernetes', 'release', 'database', 'linux', 'ai', 'edge', 'rust']
+POLICIES = [
+    {'selection': 'oldest'},
+    {'selection': 'freshest'},
+    {'selection': 'uniform'},
+    {'selection': 'score', 'score_keywords': ['python', 'security']},
+]
+
+
+def backlog(count):
+    for i in range(count):
+        words = random.sample(WORDS, 4)
+        yield {
+            'url': f'https://example.com/{i:06d}/{"-".join(words)}',
+            'link': f'https://example.com/{i:06d}/{"-".join(words)}?utm_source=rss',
+            'title': ' '.join(words).capitalize() + ' explained in a long enough article title',
+            'dateAdded': (START + timedelta(minutes=i)).isoformat(),
+            'status': 'unpublished',
+            'feed_id': 'feedA',
+        }
+
+
+def old_selection(table):
+    # The query get_random_unpublished_item used to run on StatusIndex (projection ALL)
+    response = table.query(IndexName='StatusIndex', KeyConditionExpression=Key('status').eq('unpublished'), Limit=50)
+    return random.choice(response['Items'])
+
+
+def report(name, table, picks, count):
+    positions = [int(item['url'].split('/')[3]) for item in picks]
+    print(f"  {name:<32} {table.read_units / len(picks):6.2f} RCU/selection  "
+          f"{table.calls.get('query', 0) / len(picks):.2f} queries  "
+          f"{table.calls.get('get_item', 0) / len(picks):.2f} gets  "
+          f"{len(set(positions)):4d} distinct picks, up to {max(positions) / count:.0%} into the backlog")
+
+
+def bench(count, selections):
+    resource = FakeDynamoDBResource(indexes={'RSSContent': {
+        'StatusIndex': ('status', 'dateAdded'),
+        QUEUE_INDEX: ('queue_feed', 'queue_sort', ()),
+    }})
+    table = resource.Table('RSSContent')
+    items = list(backlog(count))
+    print(f"{count} unpublished items, {selections} selections each (items are not published in between)")
+
+    with clients.override('dynamodb', resource):
+        db_ops = DynamoDBOps()
+
+        for item in items:
+            table.items[item['url']] = dict(item)
+        table.calls.clear()
+        table.read_units = 0.0
+        picks = [old_selection(table) for _ in range(selections)]
+        report('before: 50 oldest, full items', table, picks, count)
+
+        for feed_config in POLICIES:
+            policy = selection_policy(feed_config)
+            table.items.clear()
+            db_ops.batch_write_rss_items([dict(item) for item in items], policy)
+            table.calls.clear()
+            table.read_units = 0.0
+            picks = [db_ops.select_unpublished_item('feedA', policy) for _ in range(selections)]
+            report(policy.name, table, picks, count)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark read units per publish selection')
+    parser.add_argument('--items', type=int, default=100000)
+    parser.add_argument('--selections', type=int, default=100)
+    args = parser.parse_args()
+
+    random.seed(1)
+    bench(args.items, args.selections)
@@ -0,0 +1,115 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_hsenc', '_hsmi', 'ref_src', 'ref_url', 'cmpid', 'ocid', 'sr_share', 'spm',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+# Redirect wrappers: (host, path) -> query parameters holding the real URL
+REDIRECT_WRAPPERS = {
+    ('google.com', '/url'): ('url', 'q'),
+    ('news.google.com', '/url'): ('url', 'q'),
+    ('l.facebook.com', '/l.php'): ('u',),
+    ('linkedin.com', '/redir/redirect'): ('url',),
+    ('out.reddit.com', ''): ('url',),
+    ('t.umblr.com', '/redirect'): ('z',),
+}
+
+
+def _host(netloc):
+    host = netloc.lower().rsplit('@', 1)[-1]
+    if host.endswith(':80') or host.endswith(':443'):
+        host = host.rsplit(':', 1)[0]
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+def _unwrap(url):
+    """
+    Follow known redirect wrappers to the URL they point at.
+    """
+    for _ in range(3):
+        parts = urlsplit(url)
+        host = _host(parts.netloc)
+        path = parts.path.rstrip('/')
+        params = REDIRECT_WRAPPERS.get((host, path)) or REDIRECT_WRAPPERS.get((host, ''))
+        if not params:
+            return url
+        query = dict(parse_qsl(parts.query))
+        target = next((query[name] for name in params if query.get(name, '').startswith('http')), None)
+        if not target:
+            return url
+        url = target
+    return url
+
+
+def canonicalize_url(url):
+    """
+    Normalize a URL so the same article gets the same key however it was
+    linked: redirect wrappers unwrapped, https, lowercase host without
+    "www.", no default port, no tracking parameters or fragment, sorted
+    query and no trailing slash.
+    """
+    if not url:
+        return url
+    url = _unwrap(url.strip())
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https'):
+        return url
+
+    query = [
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)
+    ]
+    path = parts.path.rstrip('/')
+    return urlunsplit(('https', _host(parts.netloc), path, urlencode(sorted(query)), ''))
+
+
+def link_host(link):
+    """
+    Canonical host of a link, '' if it has none.
+    """
+    if not link:
+        return ''
+    return urlsplit(canonicalize_url(link)).netloc
+
+
+def guid_key(entry_id, link):
+    """
+    Key of an entry whose id is not a URL: "guid:<host of its link>:<id>".
+    Such ids (counters, short ids) are only unique within a site, so they
+    are scoped by the host of the entry's link.
+    """
+    host = link_host(link)
+    return f'guid:{host}:{entry_id}' if host else 'guid:' + entry_id
+
+
+def item_identity(entry):
+    """
+    Key identifying a feed entry in RSSContent.
+
+    The entry id (RSS guid / Atom id) is preferred when present, as it is
+    stable across tracking parameters and link rewrites. URL-like ids are
+    canonicalized, others are namespaced with "guid:" and the host of the
+    link (see guid_key). Entries without an id fall back to their
+    canonical link.
+    """
+    entry_id = (entry.get('id') or '').strip()
+    if entry_id.startswith(('http://', 'https://')):
+        return canonicalize_url(entry_id)
+    if entry_id:
+        return guid_key(entry_id, entry.get('link'))
+    return canonicalize_url(entry.get('link'))
+
+
+def item_aliases(entry):
+    """
+    Every key the entry may already be stored under: its identity, its
+    canonical link and its raw link (rows written before canonicalization).
+    """
+    link = entry.get('link')
+    aliases = [item_identity(entry), canonicalize_url(link), link]
+    return [alias for alias in dict.fromkeys(aliases) if alias]
@@ -0,0 +1,124 @@
+"""
+Process-wide registry of service clients (boto3, Twitter, LinkedIn, LLM).
+
+Clients are created on first use and kept for the life of the process, so
+every feed and every warm Lambda invocation shares the same connections
+instead of paying for a new client per helper. Tests replace clients with
+override() and drop everything with clear().
+"""
+import contextlib
+import hashlib
+import json
+import threading
+
+import boto3
+
+_lock = threading.RLock()
+_clients = {}
+_overrides = {}
+_missing = object()
+
+
+def _get(name, factory):
+    if name in _overrides:
+        return _overrides[name]
+    with _lock:
+        if name not in _clients:
+            _clients[name] = factory()
+        return _clients[name]
+
+
+def resource(service):
+    """
+    Return the shared boto3 resource for `service` (e.g. 'dynamodb').
+    """
+    return _get(service, lambda: boto3.resource(service))
+
+
+def table(name):
+    """
+    Return the shared boto3 DynamoDB Table `name`.
+    """
+    if 'dynamodb' in _overrides:
+        return _overrides['dynamodb'].Table(name)
+    return _get(f'table:{name}', lambda: resource('dynamodb').Table(name))
+
+
+def client(service):
+    """
+    Return the shared boto3 client for `service` (e.g. 'ssm', 's3').
+    """
+    return _get(f'client:{service}', lambda: boto3.client(service))
+
+
+def _fingerprint(secrets):
+    return hashlib.sha256(json.dumps(secrets, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def twitter(feed_id, secrets):
+    """
+    Return the Twitter client of a feed. A new one is built only when the
+    feed's credentials change.
+    """
+    from twitter import Twitter
+    if 'twitter' in _overrides:
+        return _overrides['twitter']
+    name = f'twitter:{feed_id}:{_fingerprint(secrets)}'
+    return _get(name, lambda: Twitter(**secrets))
+
+
+def linkedin(access_token):
+    """
+    Return the LinkedIn client for an access token.
+    """
+    from ln_post import LinkedIn
+    if 'linkedin' in _overrides:
+        return _overrides['linkedin']
+    name = f'linkedin:{_fingerprint(access_token)}'
+    return _get(name, lambda: LinkedIn(access_token))
+
+
+def llm():
+    """
+    Return the LLM client used for summaries (see llm_client.py).
+    """
+    from llm_client import LLMClient, OpenAIChatProvider
+    from llm_helpers import _ensure_openai_key
+    return _get('llm', lambda: LLMClient(OpenAIChatProvider(_ensure_openai_key)))
+
+
+def forget(prefix):
+    """
+    Drop cached clients whose name starts with `prefix` (e.g. 'twitter:feed1:'
+    after its credentials were rejected).
+    """
+    with _lock:
+        for name in [name for name in _clients if name.startswith(prefix)]:
+            del _clients[name]
+
+
+@contextlib.contextmanager
+def override(name, value):
+    """
+    Use `value` for `name` while the block runs. Names are the service for
+    boto3 resources ('dynamodb'), 'client:<service>' for boto3 clients,
+    'twitter' or 'linkedin' for every feed's social clients, and 'llm'.
+    """
+    previous = _overrides.get(name, _missing)
+    _overrides[name] = value
+    try:
+        yield value
+    finally:
+        if previous is _missing:
+            _overrides.pop(name, None)
+        else:
+            _overrides[name] = previous
+
+
+def clear():
+    """
+    Forget every cached client and override.
+    """
+    with _lock:
+        _clients.clear()
+        _overrides.clear()
@@ -0,0 +1,110 @@
+"""
+Condensation of extracted article text before it goes into the LLM
+prompt.
+
+Extraction can return a whole page (the fallbacks take the text of the
+entire body), while a social media summary only needs the gist. Text
+over the token budget is cut down to its highest-value parts: the lead
+paragraphs, headings, and sentences sharing words with the title, kept in
+their original order.
+
+Tokens are counted with tiktoken when it is installed, estimated at four
+characters per token otherwise.
+"""
+import math
+import re
+
+import config
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding('cl100k_base')
+except Exception: # pragma: no cover
+    tiktoken = None
+    _encoding = None
+
+SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+(?=[A-Z0-9"\'(\[])')
+WORD = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset(
+    'a an and are as at be but by for from has have how in is it its of on or that the this to was '
+    'were what when where which who why will with you your new'.split()
+)
+HEADING_MAX_WORDS = 12
+LEAD_PARAGRAPHS = 3
+
+
+def estimate_tokens(text):
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def _words(text):
+    return {word for word in WORD.findall(text.lower()) if word not in STOPWORDS and len(word) > 1}
+
+
+def _is_heading(paragraph):
+    return len(paragraph.split()) <= HEADING_MAX_WORDS and not paragraph.rstrip().endswith(('.', '!', '?', ':', ','))
+
+
+def _segments(text):
+    """
+    Split text into (paragraph index, is heading, sentence) triples.
+    """
+    paragraphs = [p.strip() for p in re.split(r'\n\s*\n|\n', text) if p.strip()]
+    segments = []
+    for index, paragraph in enumerate(paragraphs):
+        if _is_heading(paragraph):
+            segments.append((index, True, paragraph))
+            continue
+        for sentence in SENTENCE_END.split(paragraph):
+            if sentence.strip():
+                segments.append((index, False, sentence.strip()))
+    return segments
+
+
+def condense(text, title='', budget=None):
+    """
+    Return `text` cut down to at most `budget` tokens (LLM_INPUT_TOKEN_BUDGET
+    by default), unchanged if it already fits.
+
+    Each sentence is scored for being in the lead, being a heading and its
+    word overlap with the title; the best ones are kept until the budget is
+    spent, repeated sentences (boilerplate) only once.
+    """
+    budget = budget or config.LLM_INPUT_TOKEN_BUDGET
+    if not text or estimate_tokens(text) <= budget:
+        return text
+
+    title_words = _words(title)
+    scored = []
+    seen = set()
+    for position, (paragraph, heading, sentence) in enumerate(_segments(text)):
+        if sentence in seen:
+            continue
+        seen.add(sentence)
+        score = 0.0
+        if paragraph < LEAD_PARAGRAPHS:
+            score += 3.0 / (paragraph + 1)
+        if heading:
+            score += 1.5
+        if title_words:
+            score += 4.0 * len(_words(sentence) & title_words) / len(title_words)
+        # Very short fragments are mostly navigation and captions
+        if len(sentence.split()) < 4 and not heading:
+            score -= 1.0
+        scored.append((score, position, paragraph, sentence))
+
+    kept = []
+    spent = 0
+    for score, position, paragraph, sentence in sorted(scored, key=lambda s: (-s[0], s[1])):
+        tokens = estimate_tokens(sentence) + 1
+        if spent + tokens > budget:
+            continue
+        kept.append((position, paragraph, sentence))
+        spent += tokens
+
+    paragraphs = {}
+    for position, paragraph, sentence in sorted(kept):
+        paragraphs.setdefault(paragraph, []).append(sentence)
+    return "\n".join(" ".join(sentences) for sentences in paragraphs.values())
@@ -1,7 +1,88 @@
+import os
+
 
 TWEET_MAX_LENGTH = 280
 TWEET_URL_LENGTH = 22
 TWEET_IMG_LENGTH = 0 #23
 
+# Feed configurations are re-read at most this often by warm Lambdas (seconds)
+CONFIG_SNAPSHOT_TTL = 300
+# Selection policy of feeds without `selection` in FeedConfigurations (see selection.py)
+DEFAULT_SELECTION_POLICY = 'uniform'
+
+# SSM secrets are kept in memory this long by warm Lambdas (seconds)
+SECRETS_TTL = 900
+
+# Feed fetching
+FETCH_MAX_CONCURRENCY = 20 # simultaneous downloads across all hosts
+FETCH_PER_HOST_CONCURRENCY = 2 # simultaneous downloads against a single host
+FETCH_TIMEOUT = 10 # seconds, per feed URL
+FETCH_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/114.0.0.0 Safari/537.36"
+)
+FETCH_DEADLINE_MARGIN = 20 # seconds kept free before the Lambda timeout
+FETCH_MIN_FEED_TIME = 5 # seconds needed to start another feed
+FETCH_FEED_TIME_BUDGET = 60 # seconds a single feed may take
+FETCH_MAX_CONTINUATIONS = 3 # self-invocations in a row to finish a run
+FETCH_CURSOR_MAX_AGE = 36 * 3600 # seconds after which an unfinished run is abandoned (over the daily schedule)
+FETCH_STATE_FILE = os.environ.get('FETCH_STATE_FILE', '') # local JSON file of per feed HTTP validators, DynamoDB when empty
+
+# Enrichment stage (lambda_enrich.py)
+ENRICH_DEADLINE_MARGIN = 30 # seconds kept free before the Lambda timeout
+ENRICH_MAX_ITEMS_PER_FEED = 20 # items enriched per feed and run, the rest wait for the next run
+ENRICH_BATCH_SIZE = 10 # items whose summaries are requested together
+ENRICH_WORKERS = int(os.environ.get('ENRICH_WORKERS', '1')) # processes parsing pages (parallel_enrich.py), 1 parses in process
+
+# LLM client (llm_client.py)
+LLM_API_BASE = os.environ.get('LLM_API_BASE', 'https://api.openai.com/v1') # OpenAI compatible endpoint
+LLM_MODEL = os.environ.get('LLM_MODEL', 'gpt-3.5-turbo')
+LLM_RPM = 500 # requests per minute
+LLM_TPM = 200000 # tokens per minute, prompt plus max_tokens
+LLM_MAX_CONCURRENCY = 8 # requests in flight
+LLM_REQUEST_DEADLINE = 60 # seconds per request, retries included
+LLM_MAX_ATTEMPTS = 4
+LLM_BACKOFF_BASE = 1 # seconds, doubled on every retry (full jitter)
+LLM_BACKOFF_CAP = 20 # seconds
+
+# Article text sent to the LLM is condensed to this many tokens (condense.py)
+LLM_INPUT_TOKEN_BUDGET = 1200
+
+# Article text extraction (llm_helpers.extract_article_text, extraction_memo.py)
+EXTRACT_DEADLINE = 20 # seconds per article, every strategy included
+
+# Summarizer of feeds without `summarizer` in FeedConfigurations: 'llm' (OpenAI only),
+# 'local' (offline extractive, local_summarizer.py), 'fallback' (local when the LLM
+# fails) or 'race' (local when the LLM has not answered within SUMMARY_RACE_DEADLINE)
+DEFAULT_SUMMARIZER = 'fallback'
+SUMMARY_RACE_DEADLINE = 8 # seconds
+LOCAL_SUMMARY_MAX_CHARS = 250
+
+# LLM summary cache (summary_cache.py), durable layer enabled by SUMMARY_CACHE_TABLE_NAME
+SUMMARY_CACHE_SIZE = 512 # summaries kept in memory by warm Lambdas
+SUMMARY_CACHE_TTL_DAYS = 30 # durable entries expire after this long
+
+# Article page cache (page_cache.py), disk layer enabled by PAGE_CACHE_DIR (/tmp in Lambda)
+PAGE_CACHE_DIR = os.environ.get('PAGE_CACHE_DIR', '')
+PAGE_CACHE_SIZE = 64 # pages kept in memory during an invocation
+PAGE_CACHE_TTL = 3600 # seconds pages on disk are reused by warm invocations
+
+# Shared HTTP client (http_client.py)
+HTTP_CONNECT_TIMEOUT = 5 # seconds
+HTTP_READ_TIMEOUT = 20 # seconds
+HTTP_MAX_BYTES = 10 * 1024 * 1024 # response size cap
+HTTP_POOL_HOSTS = 32 # hosts kept in the connection pool
+HTTP_POOL_SIZE = 10 # keep-alive connections per host
+HTTP2_ENABLED = os.environ.get('HTTP2_ENABLED', '') == '1' # needs the h2 package
+
+# Seen-URL filter (enabled when the SEEN_FILTER_BUCKET environment variable is set)
+SEEN_FILTER_CAPACITY = 200000 # URLs the filter is sized for
+SEEN_FILTER_FP_RATE = 0.01 # target false-positive rate at capacity
+SEEN_FILTER_MAX_BYTES = 8 * 1024 * 1024 # memory budget for the bit array
+SEEN_FILTER_SCAN_SEGMENTS = 4 # parallel scan segments used to rebuild it
+SEEN_FILTER_KEY = 'seen_filter/v1.bin'
+SEEN_FILTER_LOCAL_PATH = '/tmp/seen_filter.bin'
+
 #DB_TEST_URL = 'sqlite://' # in memory
 DB_TEST_URL = 'sqlite:///home/ubuntu/publishfeed/publishfeed/databases/rss_TechnologyFeeds.db' # file 
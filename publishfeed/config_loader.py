@@ -1,12 +1,47 @@
 import os
-import boto3
 import json
+import threading
+import time
+
+import clients
+import config
 from dynamo_ops import DynamoDBOps
 
+SSM_BATCH_SIZE = 10 # SSM GetParameters limit
+LINKEDIN_PARAMETER = "/rss-feed/global/linkedin_creds"
+OPENAI_PARAMETER = "/rss-feed/global/openai_key"
+
+# Parameter name -> (value or None if it does not exist, time fetched),
+# shared by every ConfigLoader in the process so warm invocations reuse it.
+_secrets = {}
+_secrets_lock = threading.Lock()
+_ssm_calls = {'count': 0}
+
+
+def twitter_parameter(feed_id):
+    return f"/rss-feed/{feed_id}/twitter_creds"
+
+
+def ssm_calls():
+    """
+    SSM round trips made by the secrets cache since the last clear_secrets().
+    """
+    return _ssm_calls['count']
+
+
+def clear_secrets():
+    """
+    Forget every cached secret (tests).
+    """
+    with _secrets_lock:
+        _secrets.clear()
+        _ssm_calls['count'] = 0
+
+
 class ConfigLoader:
-    def __init__(self):
-        self.ssm = boto3.client('ssm')
-        self.db_ops = DynamoDBOps()
+    def __init__(self, db_ops=None):
+        self.ssm = clients.client('ssm')
+        self.db_ops = db_ops or DynamoDBOps()
 
     def load_feed_config(self, feed_id):
         """
@@ -14,36 +49,68 @@ class ConfigLoader:
         """
         return self.db_ops.get_feed_config(feed_id)
 
+    def prefetch_secrets(self, feed_ids):
+        """
+        Fetch the secrets of every feed plus the global LinkedIn and OpenAI
+        ones in batched GetParameters calls, skipping those still cached.
+        """
+        names = [twitter_parameter(feed_id) for feed_id in feed_ids]
+        self._get_parameters(names + [LINKEDIN_PARAMETER, OPENAI_PARAMETER])
+
     def load_secrets(self, feed_id):
         """
         Load secrets (Twitter keys) from SSM Parameter Store.
         Expected path: /rss-feed/{feed_id}/twitter_creds
         """
-        parameter_name = f"/rss-feed/{feed_id}/twitter_creds"
-        try:
-            response = self.ssm.get_parameter(
-                Name=parameter_name,
-                WithDecryption=True
-            )
-            secrets_json = response['Parameter']['Value']
-            return json.loads(secrets_json)
-        except self.ssm.exceptions.ParameterNotFound:
+        parameter_name = twitter_parameter(feed_id)
+        secrets_json = self._get_parameters([parameter_name])[parameter_name]
+        if secrets_json is None:
             print(f"Secrets not found for {feed_id} at {parameter_name}")
             return None
+        return json.loads(secrets_json)
 
     def load_linkedin_secrets(self):
         """
         Load LinkedIn secrets from global SSM path.
         Expected path: /rss-feed/global/linkedin_creds
         """
-        parameter_name = "/rss-feed/global/linkedin_creds"
-        try:
-            response = self.ssm.get_parameter(
-                Name=parameter_name,
-                WithDecryption=True
-            )
-            secrets_json = response['Parameter']['Value']
-            return json.loads(secrets_json)
-        except self.ssm.exceptions.ParameterNotFound:
-            print(f"LinkedIn secrets not found at {parameter_name}")
+        secrets_json = self._get_parameters([LINKEDIN_PARAMETER])[LINKEDIN_PARAMETER]
+        if secrets_json is None:
+            print(f"LinkedIn secrets not found at {LINKEDIN_PARAMETER}")
             return None
+        return json.loads(secrets_json)
+
+    def load_openai_key(self):
+        """
+        Load the OpenAI key from SSM, None if it is not there.
+        """
+        return self._get_parameters([OPENAI_PARAMETER])[OPENAI_PARAMETER]
+
+    def invalidate_secrets(self, *names):
+        """
+        Drop cached parameters (e.g. after an auth failure) so the next
+        lookup reads them from SSM again.
+        """
+        with _secrets_lock:
+            for name in names:
+                _secrets.pop(name, None)
+
+    def _get_parameters(self, names):
+        """
+        Return {name: value or None}, reading expired or missing entries
+        from SSM at most SSM_BATCH_SIZE names per call.
+        """
+        now = time.monotonic()
+        with _secrets_lock:
+            stale = [
+                name for name in dict.fromkeys(names)
+                if name not in _secrets or now - _secrets[name][1] >= config.SECRETS_TTL
+            ]
+            for start in range(0, len(stale), SSM_BATCH_SIZE):
+                batch = stale[start:start + SSM_BATCH_SIZE]
+                _ssm_calls['count'] += 1
+                response = self.ssm.get_parameters(Names=batch, WithDecryption=True)
+                values = {p['Name']: p['Value'] for p in response.get('Parameters', [])}
+                for name in batch:
+                    _secrets[name] = (values.get(name), now)
+            return {name: _secrets[name][0] for name in names}
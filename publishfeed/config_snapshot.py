@@ -0,0 +1,120 @@
+import time
+
+import config
+
+# FeedConfigurations item written by management/sync_feeds.py with a hash of
+# every feed config, so warm Lambdas can tell whether their snapshot is stale.
+META_FEED_ID = '__meta__'
+
+
+class FeedConfig:
+    """
+    FeedConfigurations item wrapper
+    """
+    def __init__(self, data):
+        self.data = dict(data)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    @property
+    def feed_id(self):
+        return self.data['feed_id']
+
+    @property
+    def urls(self):
+        return list(self.data.get('urls') or [])
+
+    @property
+    def hashtags(self):
+        return self.data.get('hashtags') or ''
+
+    @property
+    def min_date(self):
+        return self.data.get('min_date') or None
+
+    @property
+    def selection(self):
+        return self.data.get('selection') or None
+
+    @property
+    def summarizer(self):
+        return self.data.get('summarizer') or None
+
+    @property
+    def hashtag_keywords(self):
+        """The feed's keyword -> hashtag dictionary, None for the default one."""
+        return dict(self.data.get('hashtag_keywords') or {}) or None
+
+    @property
+    def hashtag_version(self):
+        return self.data.get('hashtag_version') or None
+
+    @property
+    def full_scan(self):
+        return bool(self.data.get('full_scan'))
+
+    def __repr__(self):
+        return "<FeedConfig(feed_id='{}', urls={})>".format(self.feed_id, len(self.urls))
+
+
+class ConfigSnapshot:
+    """
+    Every feed config, read from FeedConfigurations in one paginated scan.
+    """
+    def __init__(self, feeds, version=None):
+        self.feeds = feeds
+        self.version = version
+        self.checked_at = time.monotonic()
+
+    def __iter__(self):
+        return iter(self.feeds)
+
+    def __len__(self):
+        return len(self.feeds)
+
+    def get(self, feed_id):
+        return next((feed for feed in self.feeds if feed.feed_id == feed_id), None)
+
+
+_snapshot = None
+
+
+def load_config_snapshot(db_ops, ttl=None, force=False):
+    """
+    Return the config snapshot, cached across warm invocations.
+
+    Within CONFIG_SNAPSHOT_TTL seconds the cached snapshot is returned as is.
+    After that a single GetItem on the version item decides whether it is
+    still current; the table is only scanned again when the version changed
+    (or was never written).
+    """
+    global _snapshot
+    ttl = config.CONFIG_SNAPSHOT_TTL if ttl is None else ttl
+
+    if _snapshot is not None and not force:
+        if time.monotonic() - _snapshot.checked_at < ttl:
+            return _snapshot
+        version = db_ops.get_config_version()
+        if version is not None and version == _snapshot.version:
+            _snapshot.checked_at = time.monotonic()
+            return _snapshot
+
+    items = db_ops.scan_feed_configs()
+    version = next((item.get('version') for item in items if item['feed_id'] == META_FEED_ID), None)
+    feeds = [FeedConfig(item) for item in items if item['feed_id'] != META_FEED_ID]
+    feeds.sort(key=lambda feed: feed.feed_id)
+    _snapshot = ConfigSnapshot(feeds, version)
+    print(f"Config snapshot loaded: {len(feeds)} feeds (version {version})")
+    return _snapshot
+
+
+def clear_config_snapshot():
+    """
+    Drop the cached snapshot (tests, or after a config sync in the same process).
+    """
+    global _snapshot
+    _snapshot = None
@@ -1,84 +1,301 @@
 import os
-import boto3
 from boto3.dynamodb.conditions import Key, Attr
-import random
-from datetime import datetime
+from botocore.exceptions import ClientError
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import clients
+from selection import selection_policy
+
+BATCH_GET_SIZE = 100 # DynamoDB BatchGetItem limit
+BATCH_GET_MAX_ATTEMPTS = 5
+BATCH_GET_BACKOFF = 0.05 # seconds, doubled on every retry
+CONDITIONAL_PUT_WORKERS = 8 # concurrent conditional PutItem calls
+
+# Sparse, keys-only GSI of RSSContent holding only unpublished items:
+# partitioned by queue_feed (the feed_id), sorted by queue_sort (set by the
+# feed's selection policy, see selection.py). Publishing removes both
+# attributes, dropping the item from it.
+QUEUE_INDEX = 'UnpublishedIndex'
+QUEUE_ATTRIBUTES = ('queue_feed', 'queue_sort')
+SELECTION_MAX_ATTEMPTS = 25 # index entries read in full per selection, including those passed over for min_date
+
+# Sparse, keys-only GSI of RSSContent holding the items waiting for
+# enrichment (see enrichment.py): partitioned by enrich_feed (the feed_id),
+# sorted by dateAdded. Saving the enrichment removes enrich_feed.
+ENRICH_INDEX = 'EnrichIndex'
+
+def queue_attributes(item, policy=None):
+    """
+    Index attributes placing an RSSContent item in its feed's queue, empty
+    once it is published.
+    """
+    if item.get('status', 'unpublished') != 'unpublished':
+        return {}
+    return {
+        'queue_feed': item['feed_id'],
+        'queue_sort': (policy or selection_policy()).sort_key(item),
+    }
+
+def enrich_attributes(item):
+    """
+    Attributes placing a new unpublished RSSContent item in its feed's
+    enrichment queue, empty if it needs none.
+    """
+    if item.get('status', 'unpublished') != 'unpublished' or 'enrich_state' in item:
+        return {}
+    return {'enrich_state': 'pending', 'enrich_feed': item['feed_id']}
 
 class DynamoDBOps:
     def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb')
+        self.dynamodb = clients.resource('dynamodb')
         self.rss_table_name = os.environ.get('RSS_TABLE_NAME', 'RSSContent')
         self.config_table_name = os.environ.get('CONFIG_TABLE_NAME', 'FeedConfigurations')
-        self.rss_table = self.dynamodb.Table(self.rss_table_name)
-        self.config_table = self.dynamodb.Table(self.config_table_name)
+        self.fetch_state_table_name = os.environ.get('FETCH_STATE_TABLE_NAME', 'FeedFetchState')
+        self.rss_table = clients.table(self.rss_table_name)
+        self.config_table = clients.table(self.config_table_name)
+        self.fetch_state_table = clients.table(self.fetch_state_table_name)
 
-    def batch_write_rss_items(self, items):
+    def batch_write_rss_items(self, items, policy=None):
         """
         Write multiple RSS items to the database.
-        Items should be a list of dicts.
+        Items should be a list of dicts, queued for the feed's selection policy.
+        Returns True if every item was written.
         """
         if not items:
-            return
+            return True
             
         print(f"DynamoDB: Writing batch of {len(items)} items...")
         try:
             with self.rss_table.batch_writer() as batch:
                 for item in items:
-                    # Ensure status is set
-                    if 'status' not in item:
-                        item['status'] = 'unpublished'
-                    batch.put_item(Item=item)
+                    batch.put_item(Item=self._new_item(item, policy))
             print("DynamoDB: Batch write successful")
+            return True
         except Exception as e:
             print(f"DynamoDB: Error in batch_write_rss_items: {e}")
+            return False
+
+    @staticmethod
+    def _new_item(item, policy=None):
+        # Ensure status is set
+        if 'status' not in item:
+            item['status'] = 'unpublished'
+        if 'feed_id' in item:
+            item.update(queue_attributes(item, policy))
+            item.update(enrich_attributes(item))
+        return item
 
-    def check_rss_item_exists(self, url):
+    def put_new_rss_items(self, items, policy=None):
         """
-        Check if an RSS item already exists by URL.
+        Write RSS items unless an item with the same URL is already stored
+        (one conditional PutItem each), for items no lookup confirmed as new:
+        a stored row, possibly published already, is never overwritten.
+        Returns the set of URLs that already existed, or None on error.
         """
+        if not items:
+            return set()
+
+        def put(item):
+            try:
+                self.rss_table.put_item(Item=self._new_item(item, policy),
+                                        ConditionExpression=Attr('url').not_exists())
+                return None
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                    return item['url']
+                raise
+
+        print(f"DynamoDB: Writing {len(items)} items if new...")
         try:
-            response = self.rss_table.get_item(Key={'url': url})
-            exists = 'Item' in response
-            # print(f"DynamoDB: Check exists {url} -> {exists}") # Verbose
-            return exists
+            with ThreadPoolExecutor(max_workers=min(CONDITIONAL_PUT_WORKERS, len(items))) as executor:
+                existing = {url for url in executor.map(put, items) if url}
+            print(f"DynamoDB: {len(items) - len(existing)} written, {len(existing)} already stored")
+            return existing
         except Exception as e:
-            print(f"DynamoDB: Error checking item existence {url}: {e}")
-            return False
+            print(f"DynamoDB: Error in put_new_rss_items: {e}")
+            return None
 
-    def get_random_unpublished_item(self, min_date=None):
+    def check_rss_items_exist(self, urls):
         """
-        Get a random unpublished item.
-        Using the GSI StatusIndex.
-        If min_date is provided (YYYY-MM-DD), filter items added after that date.
+        Returns the set of URLs (out of `urls`) that are already stored, or
+        None if some of them could not be checked (errors, or keys still
+        unprocessed after the retries).
+        Uses keys-only BatchGetItem calls of up to 100 keys, retrying
+        unprocessed keys with backoff. Duplicate URLs are only looked up once.
         """
-        key_condition = Key('status').eq('unpublished')
-        if min_date:
-            key_condition = key_condition & Key('dateAdded').gt(min_date)
+        unique_urls = list(dict.fromkeys(urls))
+        existing = set()
+        complete = True
+        for start in range(0, len(unique_urls), BATCH_GET_SIZE):
+            chunk = unique_urls[start:start + BATCH_GET_SIZE]
+            request = {
+                self.rss_table_name: {
+                    'Keys': [{'url': url} for url in chunk],
+                    'ProjectionExpression': '#u',
+                    'ExpressionAttributeNames': {'#u': 'url'},
+                }
+            }
+            try:
+                for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+                    response = self.dynamodb.batch_get_item(RequestItems=request)
+                    for item in response.get('Responses', {}).get(self.rss_table_name, []):
+                        existing.add(item['url'])
+                    request = response.get('UnprocessedKeys')
+                    if not request:
+                        break
+                    time.sleep(min(BATCH_GET_BACKOFF * (2 ** attempt), 1))
+                else:
+                    print(f"DynamoDB: Gave up on unprocessed keys after {BATCH_GET_MAX_ATTEMPTS} attempts")
+                    complete = False
+            except Exception as e:
+                print(f"DynamoDB: Error checking items existence: {e}")
+                complete = False
+        return existing if complete else None
 
-        response = self.rss_table.query(
-            IndexName='StatusIndex',
-            KeyConditionExpression=key_condition,
-            Limit=50 # limit to avoid scanning too many if simpler
-        )
-        items = response.get('Items', [])
-        if not items:
-            return None
-        return random.choice(items)
+    def scan_rss_urls(self, total_segments=4):
+        """
+        Return every URL stored in RSSContent, using a parallel scan of
+        `total_segments` segments projected to the key only.
+        """
+        client = self.dynamodb.meta.client
+
+        def scan_segment(segment):
+            urls = []
+            kwargs = {
+                'TableName': self.rss_table_name,
+                'ProjectionExpression': '#u',
+                'ExpressionAttributeNames': {'#u': 'url'},
+                'Segment': segment,
+                'TotalSegments': total_segments,
+            }
+            while True:
+                response = client.scan(**kwargs)
+                urls.extend(item['url']['S'] for item in response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    return urls
+                kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+        with ThreadPoolExecutor(max_workers=total_segments) as executor:
+            segments = executor.map(scan_segment, range(total_segments))
+            return [url for urls in segments for url in urls]
+
+    def select_unpublished_item(self, feed_id, policy=None, min_date=None):
+        """
+        Get the next unpublished item of a feed according to its selection
+        policy. The policy reads one or two entries of the GSI
+        UnpublishedIndex (that feed's partition only) and just the chosen
+        item is read in full.
+        If min_date is provided (YYYY-MM-DD), items added before that date are
+        passed over (and left in the queue).
+        """
+        policy = policy or selection_policy()
+        candidates = policy.candidates(self.rss_table, QUEUE_INDEX, feed_id, min_date)
+        for entry in islice(candidates, SELECTION_MAX_ATTEMPTS):
+            item = self.rss_table.get_item(Key={'url': entry['url']}).get('Item')
+            if not item or item.get('status') != 'unpublished' or item.get('queue_feed') != feed_id:
+                # Published since the index was read
+                continue
+            if min_date and item.get('dateAdded', '') <= min_date:
+                continue
+            return item
+        return None
 
     def mark_as_published(self, url):
         """
-        Update the status of an item to published.
+        Update the status of an item to published, removing it from the
+        unpublished index.
         """
+        self._dequeue(url, 'published')
+
+    def _dequeue(self, url, status):
         self.rss_table.update_item(
             Key={'url': url},
-            UpdateExpression="set #s = :s",
+            UpdateExpression="set #s = :s remove queue_feed, queue_sort, enrich_feed",
             ExpressionAttributeNames={'#s': 'status'},
-            ExpressionAttributeValues={':s': 'published'}
+            ExpressionAttributeValues={':s': status}
         )
 
+    def pending_enrichment(self, feed_id, limit=None):
+        """
+        URLs of a feed's items waiting for enrichment, newest first, from
+        the GSI EnrichIndex.
+        """
+        kwargs = {'Limit': limit} if limit else {}
+        urls = []
+        while True:
+            response = self.rss_table.query(
+                IndexName=ENRICH_INDEX,
+                KeyConditionExpression=Key('enrich_feed').eq(feed_id),
+                ScanIndexForward=False,
+                **kwargs
+            )
+            urls.extend(item['url'] for item in response.get('Items', []))
+            if 'LastEvaluatedKey' not in response or (limit and len(urls) >= limit):
+                return urls[:limit] if limit else urls
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def get_rss_item(self, url):
+        """
+        Get a full RSSContent item, None if it does not exist.
+        """
+        return self.rss_table.get_item(Key={'url': url}).get('Item')
+
+    def save_enrichment(self, url, attributes):
+        """
+        Store the enrichment attributes of an item (see enrichment.py),
+        taking it out of the enrichment queue.
+        """
+        names = {f"#{name}": name for name in attributes}
+        self.rss_table.update_item(
+            Key={'url': url},
+            UpdateExpression="set " + ", ".join(f"#{name} = :{name}" for name in attributes) + " remove enrich_feed",
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues={f":{name}": value for name, value in attributes.items()}
+        )
+
+    def scan_feed_configs(self):
+        """
+        Get every item of FeedConfigurations, following LastEvaluatedKey.
+        """
+        items = []
+        scan_kwargs = {}
+        while True:
+            response = self.config_table.scan(**scan_kwargs)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return items
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def get_config_version(self):
+        """
+        Get the version hash written by sync_feeds, None if there is none.
+        """
+        response = self.config_table.get_item(Key={'feed_id': '__meta__'})
+        return response.get('Item', {}).get('version')
+
     def get_feed_config(self, feed_id):
         """
         Get configuration for a specific feed.
         """
         response = self.config_table.get_item(Key={'feed_id': feed_id})
         return response.get('Item')
+
+    def get_fetch_state(self, feed_url):
+        """
+        Get the stored fetch state (HTTP validators, body hash) of a feed URL.
+        """
+        response = self.fetch_state_table.get_item(Key={'feed_url': feed_url})
+        item = response.get('Item')
+        if item:
+            item.pop('feed_url', None)
+        return item
+
+    def put_fetch_state(self, feed_url, state):
+        """
+        Replace the stored fetch state of a feed URL.
+        """
+        item = {k: v for k, v in state.items() if v is not None}
+        item['feed_url'] = feed_url
+        self.fetch_state_table.put_item(Item=item)
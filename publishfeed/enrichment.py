@@ -0,0 +1,224 @@
+"""
+Enrichment: the slow work on an article (page download and extraction,
+LLM summary, hashtags, OpenGraph thumbnail) and the rendering of each
+platform's post, done once after fetch so that publishing only reads the
+result and posts it.
+
+An enriched RSSContent item carries:
+
+- enrich_state: 'pending' when written by fetch, then 'enriched' (or
+  'failed', in which case publish enriches it inline)
+- text_digest: sha256 of the extracted article text, '' if none was found
+- summary: LLM or local summary, '' when it fell back to title and hashtags
+- summary_source: 'llm', 'local' or ''
+- hashtags: list generated from the title
+- thumbnail_url: OpenGraph image of the article, '' if none
+- posts: rendered post text, {'twitter': ..., 'linkedin': ...}
+- enrich_ms: latency of each stage in milliseconds
+"""
+import hashlib
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import config
+from generate_hashtags_fuzzy import generate_hashtags_batch
+from llm_helpers import extract_article_text, summarize_many
+from ln_post import custom_get_img_from_link
+from local_summarizer import summarize_local
+
+ENRICHED = 'enriched'
+PENDING = 'pending'
+FAILED = 'failed'
+
+SUMMARIZERS = ('llm', 'local', 'fallback', 'race')
+
+
+class StageTimer:
+    """
+    Wall-clock milliseconds spent in each named stage.
+    """
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.timings[name] = self.timings.get(name, 0) + int(round(elapsed))
+
+    def __str__(self):
+        return ", ".join(f"{name} {ms} ms" for name, ms in self.timings.items()) or "-"
+
+
+def add_timings(totals, timings):
+    """
+    Add stage timings into `totals` (per invocation figures).
+    """
+    for name, ms in timings.items():
+        totals[name] = totals.get(name, 0) + ms
+    return totals
+
+
+def text_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest() if text else ''
+
+
+def max_tweet_body_length(hashtags='', include_hashtags=True):
+    """Calculate maximum length for tweet body considering URL and optional hashtags."""
+    available_length = (
+        config.TWEET_MAX_LENGTH - config.TWEET_URL_LENGTH - config.TWEET_IMG_LENGTH
+    )
+    if include_hashtags:
+        available_length -= len(hashtags)
+    return available_length - 2
+
+
+def render_posts(item, feed_config, summary, hashtags):
+    """
+    Post text of each platform: the summary when there is one, the title
+    followed by its hashtags otherwise.
+    """
+    link = item.get('link', item['url'])
+    if summary:
+        max_body_length = max_tweet_body_length(include_hashtags=False)
+        if len(summary) > max_body_length:
+            tweet_body = summary[:max_body_length].rsplit(" ", 1)[0]
+        else:
+            tweet_body = summary
+        return {
+            'twitter': "{} \n\n{} ".format(tweet_body, link),
+            'linkedin': summary,
+        }
+
+    feed_hashtags = feed_config.get('hashtags', '')
+    content = item['title'] + "\n" + " ".join(hashtags)
+    body_length = max_tweet_body_length(feed_hashtags, include_hashtags=True)
+    return {
+        'twitter': "{} {} {}".format(content[:body_length], link, feed_hashtags),
+        'linkedin': content,
+    }
+
+
+def summarizer(feed_config):
+    """
+    Summarizer mode of a feed (`summarizer` in FeedConfigurations).
+    """
+    name = feed_config.get('summarizer') or config.DEFAULT_SUMMARIZER
+    if name not in SUMMARIZERS:
+        print(f"Unknown summarizer '{name}', using '{config.DEFAULT_SUMMARIZER}'")
+        name = config.DEFAULT_SUMMARIZER
+    return name
+
+
+def local_summary(text, title, hashtags):
+    """
+    Extractive summary followed by a few of the item's hashtags, like the
+    LLM writes them.
+    """
+    tags = " ".join(hashtags[:3])
+    summary = summarize_local(text, title, config.LOCAL_SUMMARY_MAX_CHARS - len(tags) - 1)
+    return f"{summary} {tags}".strip() if summary else ''
+
+
+def summarize_texts(texts, titles, hashtags, feed_config, deadline=None):
+    """
+    Summaries of the extracted texts with the feed's summarizer, as a list
+    of (summary, source) pairs.
+    """
+    mode = summarizer(feed_config)
+    results = [('', '')] * len(texts)
+    if mode != 'local':
+        if mode == 'race':
+            race_deadline = time.monotonic() + config.SUMMARY_RACE_DEADLINE
+            deadline = min(deadline, race_deadline) if deadline is not None else race_deadline
+        summaries = summarize_many(texts, titles, deadline=deadline)
+        results = [(summary, 'llm') if summary else ('', '') for summary in summaries]
+    if mode == 'llm':
+        return results
+    return [
+        (summary, source) if summary or not text else (local_summary(text, title, tags), 'local')
+        for (summary, source), text, title, tags in zip(results, texts, titles, hashtags)
+    ]
+
+
+def thumbnail_url(link):
+    try:
+        return custom_get_img_from_link(link) or ''
+    except Exception as e:
+        print(f"Thumbnail lookup failed for {link}: {e}")
+        return ''
+
+
+def enrich_item(item, feed_config, timer=None):
+    """
+    Run every enrichment stage on an RSSContent item and return the
+    attributes to store on it.
+    """
+    return enrich_items([item], feed_config, [timer or StageTimer()])[0]
+
+
+def enrich_items(items, feed_config, timers=None, deadline=None):
+    """
+    Enrich several items of a feed, returning their attributes in order.
+
+    Pages are extracted one after the other, then every summary is
+    requested at once (see llm_helpers.summarize_many), so the LLM stage
+    takes about as long as its slowest call rather than the sum of them.
+    Each item's 'summarize' timing is the time it waited for that batch.
+    Feeds summarizing locally, or falling back to it, are summarized by
+    local_summarizer (see summarize_texts).
+    """
+    timers = timers or [StageTimer() for _ in items]
+    started = time.perf_counter()
+    hashtags = generate_hashtags_batch([item['title'] for item in items], feed_config)
+    # The titles are matched together, each item gets its share
+    share = int(round((time.perf_counter() - started) * 1000 / max(len(items), 1)))
+    texts = []
+    for item, timer in zip(items, timers):
+        timer.timings['hashtags'] = timer.timings.get('hashtags', 0) + share
+        with timer.stage('extract'):
+            texts.append(extract_article_text(item.get('link', item['url']), deadline))
+    return finish_items(items, feed_config, timers, hashtags, texts, deadline=deadline)
+
+
+def finish_items(items, feed_config, timers, hashtags, texts, thumbnails=None, deadline=None):
+    """
+    Summarize the extracted texts of a batch of items and return the
+    attributes of each. `thumbnails` holds the thumbnail URL of each item
+    when it is already known (None to look it up).
+    """
+    thumbnails = thumbnails or [None] * len(items)
+    summaries = [('', '')] * len(items)
+    if any(texts):
+        started = time.perf_counter()
+        summaries = summarize_texts(texts, [item['title'] for item in items], hashtags, feed_config, deadline)
+        elapsed = int(round((time.perf_counter() - started) * 1000))
+        for text, timer in zip(texts, timers):
+            if text:
+                timer.timings['summarize'] = timer.timings.get('summarize', 0) + elapsed
+
+    results = []
+    for item, timer, item_hashtags, text, (summary, source), thumbnail in zip(
+            items, timers, hashtags, texts, summaries, thumbnails):
+        link = item.get('link', item['url'])
+        if thumbnail is None:
+            with timer.stage('thumbnail'):
+                thumbnail = thumbnail_url(link)
+        with timer.stage('render'):
+            posts = render_posts(item, feed_config, summary, item_hashtags)
+        results.append({
+            'enrich_state': ENRICHED,
+            'enriched_at': datetime.now().isoformat(),
+            'text_digest': text_digest(text),
+            'summary': summary,
+            'summary_source': source,
+            'hashtags': item_hashtags,
+            'thumbnail_url': thumbnail,
+            'posts': posts,
+            'enrich_ms': dict(timer.timings),
+        })
+    return results
@@ -0,0 +1,189 @@
+"""
+Per-domain memo of article extraction strategies.
+
+extract_article_text can get the text of an article several ways
+(newspaper, the BeautifulSoup content selectors, a curl-like request). For
+each domain the memo records which strategy last succeeded, and the
+attempts, failures and mean latency of every strategy, so the next article
+from that domain tries the known-good strategy first: a site that only
+works with a fallback stops paying for the failed attempts before it.
+
+Records are kept in memory by warm Lambdas and in the DynamoDB table named
+by EXTRACTION_MEMO_TABLE_NAME (keyed by `domain`), or in a local JSON file
+when EXTRACTION_MEMO_FILE is set (CLI runs).
+"""
+import json
+import os
+import threading
+from urllib.parse import urlparse
+
+import clients
+
+
+def domain_of(url):
+    netloc = urlparse(url).netloc.lower()
+    return netloc[4:] if netloc.startswith('www.') else netloc
+
+
+class DynamoExtractionStore:
+    """
+    One item per domain in the extraction memo table.
+    """
+    def __init__(self, table_name):
+        self.table = clients.table(table_name)
+
+    def get(self, domain):
+        item = self.table.get_item(Key={'domain': domain}).get('Item')
+        if not item:
+            return None
+        # Numbers come back as Decimal
+        return {
+            'last_success': item.get('last_success', ''),
+            'strategies': {
+                name: {key: int(value) for key, value in entry.items()}
+                for name, entry in item.get('strategies', {}).items()
+            },
+        }
+
+    def put(self, domain, record):
+        self.table.put_item(Item=dict(record, domain=domain))
+
+
+class FileExtractionStore:
+    """
+    Every domain's record in a local JSON file, for CLI runs.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.records = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.records = json.load(f)
+
+    def get(self, domain):
+        return self.records.get(domain)
+
+    def put(self, domain, record):
+        self.records[domain] = record
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.records, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class ExtractionMemo:
+    def __init__(self, store=None):
+        self.store = store
+        self.records = {}
+        self.lock = threading.Lock()
+        self.counters = {'articles': 0, 'attempts': 0, 'extracted': 0, 'errors': 0}
+
+    def get(self, domain):
+        """
+        Return the record of `domain`:
+        {'last_success': name, 'strategies': {name: {'attempts', 'failures', 'ms'}}}
+        """
+        with self.lock:
+            if domain in self.records:
+                return self.records[domain]
+        record = None
+        if self.store is not None:
+            try:
+                record = self.store.get(domain)
+            except Exception as e:
+                print(f"Extraction memo: read failed: {e}")
+                self._count('errors')
+        record = record or {'last_success': '', 'strategies': {}}
+        with self.lock:
+            return self.records.setdefault(domain, record)
+
+    def order(self, domain, strategies):
+        """
+        `strategies` (names, in their default order) as they should be tried
+        for `domain`: the one that last succeeded, then the others by
+        increasing failure rate.
+        """
+        record = self.get(domain)
+        stats = record['strategies']
+
+        def failure_rate(name):
+            entry = stats.get(name)
+            return entry['failures'] / entry['attempts'] if entry and entry['attempts'] else 0
+
+        ordered = sorted(strategies, key=failure_rate)
+        if record['last_success'] in ordered:
+            ordered.remove(record['last_success'])
+            ordered.insert(0, record['last_success'])
+        return ordered
+
+    def record(self, domain, attempts):
+        """
+        Record the attempts made for one article of `domain`, a list of
+        (strategy, succeeded, milliseconds).
+        """
+        record = self.get(domain)
+        with self.lock:
+            self.counters['articles'] += 1
+            self.counters['attempts'] += len(attempts)
+            for name, succeeded, ms in attempts:
+                entry = record['strategies'].setdefault(name, {'attempts': 0, 'failures': 0, 'ms': 0})
+                entry['attempts'] += 1
+                entry['ms'] = int(round(entry['ms'] + (ms - entry['ms']) / entry['attempts']))
+                if succeeded:
+                    record['last_success'] = name
+                    self.counters['extracted'] += 1
+                else:
+                    entry['failures'] += 1
+            snapshot = json.loads(json.dumps(record))
+        if self.store is not None and attempts:
+            try:
+                self.store.put(domain, snapshot)
+            except Exception as e:
+                print(f"Extraction memo: write failed: {e}")
+                self._count('errors')
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters, domains=len(self.records))
+        stats['attempts_per_article'] = round(stats['attempts'] / stats['articles'], 2) if stats['articles'] else 0
+        return stats
+
+    def _count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+
+_memo = None
+_memo_lock = threading.Lock()
+
+
+def get_extraction_memo():
+    """
+    Return the process-wide memo, stored in EXTRACTION_MEMO_FILE or
+    EXTRACTION_MEMO_TABLE_NAME when either is set.
+    """
+    global _memo
+    with _memo_lock:
+        if _memo is None:
+            path = os.environ.get('EXTRACTION_MEMO_FILE')
+            table_name = os.environ.get('EXTRACTION_MEMO_TABLE_NAME')
+            if path:
+                store = FileExtractionStore(path)
+            elif table_name:
+                store = DynamoExtractionStore(table_name)
+            else:
+                store = None
+            _memo = ExtractionMemo(store=store)
+        return _memo
+
+
+def clear_extraction_memo():
+    """
+    Drop the process-wide memo and its counters (tests).
+    """
+    global _memo
+    with _memo_lock:
+        _memo = None
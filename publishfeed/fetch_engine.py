@@ -0,0 +1,149 @@
+import asyncio
+import queue
+import threading
+import time
+from urllib.parse import urlparse
+
+import aiohttp
+
+import config
+import http_client
+
+
+class FetchResult:
+    """
+    Outcome of downloading a single feed URL.
+    """
+    def __init__(self, url, status=None, content=b'', headers=None, error=None, elapsed=0.0):
+        self.url = url
+        self.status = status
+        self.content = content
+        self.headers = headers or {}
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return "<FetchResult(url='{}', status={}, error={}, elapsed={:.2f})>".format(
+            self.url, self.status, self.error, self.elapsed)
+
+
+class FeedFetcher:
+    """
+    Download feed URLs concurrently.
+
+    Requests run on a private asyncio loop in a background thread, bounded by a
+    global and a per-host concurrency limit. Results are handed back through
+    `fetch()` as soon as each response arrives, so the caller can parse and
+    store a feed while the slower ones are still downloading.
+    """
+    def __init__(self, max_concurrency=None, per_host_concurrency=None, timeout=None, headers=None,
+                 max_bytes=None):
+        self.max_concurrency = max_concurrency or config.FETCH_MAX_CONCURRENCY
+        self.per_host_concurrency = per_host_concurrency or config.FETCH_PER_HOST_CONCURRENCY
+        self.timeout = timeout or config.FETCH_TIMEOUT
+        self.headers = headers or {"User-Agent": config.FETCH_USER_AGENT}
+        self.max_bytes = max_bytes or config.HTTP_MAX_BYTES
+
+    def fetch(self, urls, request_headers=None):
+        """
+        Yield a FetchResult per URL, in completion order.
+        `request_headers` optionally maps a URL to extra headers for that
+        request (e.g. conditional GET validators).
+        Closing the generator early cancels the downloads still in flight.
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return
+
+        results = queue.Queue()
+        loop = asyncio.new_event_loop()
+        main_task = loop.create_task(self._fetch_all(urls, request_headers or {}, results))
+        thread = threading.Thread(target=self._run_loop, args=(loop, main_task), daemon=True)
+        thread.start()
+
+        pending = len(urls)
+        try:
+            while pending:
+                result = results.get()
+                if result is None:
+                    break
+                pending -= 1
+                yield result
+        finally:
+            if pending:
+                loop.call_soon_threadsafe(main_task.cancel)
+            thread.join()
+            loop.close()
+
+    @staticmethod
+    def _run_loop(loop, main_task):
+        try:
+            loop.run_until_complete(main_task)
+        except asyncio.CancelledError:
+            pass
+
+    async def _fetch_all(self, urls, request_headers, results):
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        host_limits = {}
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.per_host_concurrency,
+        )
+        # Report requests and new connections to the shared HTTP counters
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._count_request)
+        trace.on_connection_create_end.append(self._count_connection)
+        try:
+            async with aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                             trace_configs=[trace]) as session:
+                tasks = []
+                for url in urls:
+                    host = urlparse(url).netloc
+                    if host not in host_limits:
+                        host_limits[host] = asyncio.Semaphore(self.per_host_concurrency)
+                    tasks.append(asyncio.ensure_future(
+                        self._fetch_one(session, url, request_headers.get(url), global_limit,
+                                        host_limits[host], results)))
+                await asyncio.gather(*tasks)
+        finally:
+            # Unblock the consumer even if we were cancelled or crashed.
+            results.put(None)
+
+    @staticmethod
+    async def _count_request(session, context, params):
+        http_client.record(num_requests=1)
+
+    @staticmethod
+    async def _count_connection(session, context, params):
+        http_client.record(num_connections=1)
+
+    async def _fetch_one(self, session, url, headers, global_limit, host_limit, results):
+        async with global_limit, host_limit:
+            started = time.monotonic()
+            try:
+                timeout = aiohttp.ClientTimeout(total=self.timeout)
+                async with session.get(url, headers=headers, timeout=timeout,
+                                       allow_redirects=True) as response:
+                    content = bytearray()
+                    async for chunk in response.content.iter_chunked(http_client.CHUNK_SIZE):
+                        content.extend(chunk)
+                        if len(content) > self.max_bytes:
+                            raise http_client.ResponseTooLarge(
+                                f"body is over the {self.max_bytes} bytes cap")
+                    content = bytes(content)
+                    result = FetchResult(
+                        url,
+                        status=response.status,
+                        content=content,
+                        headers=response.headers.copy(),
+                        elapsed=time.monotonic() - started,
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                result = FetchResult(
+                    url,
+                    error=str(e) or e.__class__.__name__,
+                    elapsed=time.monotonic() - started,
+                )
+        results.put(result)
@@ -0,0 +1,70 @@
+import json
+import os
+
+import config
+
+
+class FetchStateStore:
+    """
+    Per feed URL state kept between fetch runs (HTTP validators, body hash).
+    Subclasses only need to implement `get` and `put`.
+    """
+    def get(self, url):
+        """
+        Return the stored state dict for a feed URL, or {} if there is none.
+        """
+        raise NotImplementedError
+
+    def put(self, url, state):
+        """
+        Replace the stored state for a feed URL.
+        """
+        raise NotImplementedError
+
+
+class DynamoDBFetchStateStore(FetchStateStore):
+    """
+    Fetch state kept in the FeedFetchState table, next to FeedConfigurations.
+    """
+    def __init__(self, db_ops):
+        self.db_ops = db_ops
+
+    def get(self, url):
+        return self.db_ops.get_fetch_state(url) or {}
+
+    def put(self, url, state):
+        self.db_ops.put_fetch_state(url, state)
+
+
+class FileFetchStateStore(FetchStateStore):
+    """
+    Fetch state kept in a local JSON file, for CLI runs.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.states = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.states = json.load(f)
+
+    def get(self, url):
+        return dict(self.states.get(url, {}))
+
+    def put(self, url, state):
+        self.states[url] = dict(state)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.states, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def get_fetch_state_store(db_ops):
+    """
+    Use a local file if FETCH_STATE_FILE is set, DynamoDB otherwise.
+    """
+    if config.FETCH_STATE_FILE:
+        return FileFetchStateStore(config.FETCH_STATE_FILE)
+    return DynamoDBFetchStateStore(db_ops)
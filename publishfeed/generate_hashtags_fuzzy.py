@@ -1,93 +1,227 @@
-from rapidfuzz import fuzz
+"""
+Hashtags for an article title, from a keyword -> hashtag dictionary.
+
+A keyword matches when it appears in the title as a whole phrase, or when
+fuzz.partial_ratio of the keyword and the title reaches FUZZY_THRESHOLD
+(catching typos like "Kubernets"). Titles are lowercased and stripped of
+punctuation first.
+
+HashtagMatcher compiles a dictionary once: a single regex alternation finds
+the exact phrases, and rapidfuzz.process.cdist scores every keyword against
+a whole batch of titles in one call. Exact hits always score 100, so the
+fuzzy pass alone decides the result; the regex is what a matcher without
+fuzzy matching (threshold None) uses.
+
+Feeds can have their own dictionary (`hashtag_keywords` in feeds.yml,
+stored in FeedConfigurations with its `hashtag_version` by
+management/sync_feeds.py); the others use KEYWORDS_TO_HASHTAGS. Compiled
+matchers are kept per process, keyed by dictionary version.
+"""
+import hashlib
+import json
 import re
+import threading
+from collections import OrderedDict
+
+from rapidfuzz import fuzz, process
+
+FUZZY_THRESHOLD = 85 # partial_ratio from which a keyword matches
+MATCHER_CACHE_SIZE = 32 # compiled dictionaries kept per process
+
+KEYWORDS_TO_HASHTAGS = {
+    "ai": "#AI",
+    "algorithm": "#algorithm",
+    "Amazon Web Services": "#AWS",
+    "API": "#API",
+    "artificial intelligence": "#AI",
+    "Aurora": "#Aurora",
+    "AWS": "#AWS",
+    "Azure": "#Azure",
+    "Bedrock": "#Bedrock",
+    "blockchain": "#blockchain",
+    "ChatGPT": "#ChatGPT",
+    "Claude": "#Claude",
+    "cloud computing": "#CloudComputing",
+    "cloud": "#Cloud",
+    "CloudWatch": "#CloudWatch",
+    "CNCF": "#CNCF",
+    "compliance": "#compliance",
+    "containers": "#containers",
+    "data": "#data",
+    "database": "#database",
+    "devops": "#DevOps",
+    "EC2": "#EC2",
+    "Fargate": "#Fargate",
+    "Forrester": "#Forrester",
+    "foundational model": "#FM",
+    "Gartner": "#Gartner",
+    "GCP": "#GCP",
+    "Gemini": "#Gemini",
+    "GitHub": "#GitHub",
+    "Google Cloud Platform": "#GCP",
+    "Google": "#Google",
+    "GPT": "#GPT",
+    "health": "#health",
+    "Inferentia": "#Inferentia",
+    "innovation": "#innovation",
+    "k8s": "#Kubernetes",
+    "Kubernetes": "#Kubernetes",
+    "kubernetes": "#Kubernetes",
+    "large language models": "#LLM",
+    "leadership": "#leadership",
+    "Linux": "#Linux",
+    "LLM": "#LLM",
+    "LLMs": "#LLM",
+    "machine learning": "#ML",
+    "malware": "#malware",
+    "MCP": "#MCP",
+    "microservices": "#microservices",
+    "Microsoft": "#Microsoft",
+    "ml": "#ML",
+    "model context protocol": "#MCP",
+    "open source": "#OpenSource",
+    "OpenAI": "#OpenAI",
+    "Pandas": "#Pandas",
+    "public sector": "#PublicSector",
+    "ransomware": "#ransomware",
+    "RDS": "#RDS",
+    "robot": "#robot",
+    "S3": "#S3",
+    "SageMaker": "#SageMaker",
+    "Scikit": "#Scikit",
+    "serverless": "#serverless",
+    "SQL": "#SQL",
+    "technology": "#technology",
+    "Terraform": "#Terraform",
+    "TOFAG": "#TOGAF",
+    "Trainium": "#Trainium",
+    "transformers": "#transformers",
+}
+
+PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def clean_title(title):
+    return PUNCTUATION.sub("", title.lower())
+
+
+class HashtagMatcher:
+    """
+    A keyword -> hashtag dictionary compiled for matching titles.
+
+    Keywords are matched lowercased, so keywords differing only in case
+    are scored once. Hashtags come back in dictionary order.
+    """
+    def __init__(self, keywords_to_hashtags, threshold=FUZZY_THRESHOLD):
+        self.threshold = threshold
+        self.phrases = []
+        self.hashtags = [] # hashtags of each phrase
+        self.order = {}
+        index = {}
+        for keyword, hashtag in keywords_to_hashtags.items():
+            phrase = keyword.lower()
+            self.order.setdefault(hashtag, len(self.order))
+            if phrase not in index:
+                index[phrase] = len(self.phrases)
+                self.phrases.append(phrase)
+                self.hashtags.append([])
+            if hashtag not in self.hashtags[index[phrase]]:
+                self.hashtags[index[phrase]].append(hashtag)
+        self.index = index
+
+        # Longest first so a phrase wins over its own prefix at a position;
+        # the lookahead lets matches overlap
+        alternatives = sorted(self.phrases, key=len, reverse=True)
+        self.pattern = re.compile(r"\b(?=(" + "|".join(map(re.escape, alternatives)) + r")\b)") if alternatives else None
+        # Phrases that end on a word boundary inside a longer one match with it
+        self.prefixes = {
+            phrase: [other for other in self.phrases if phrase.startswith(other + " ")]
+            for phrase in self.phrases
+        }
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def exact(self, title_clean):
+        """Indexes of the phrases found as whole phrases in a cleaned title."""
+        found = set()
+        if self.pattern is None:
+            return found
+        for match in self.pattern.finditer(title_clean):
+            phrase = match.group(1)
+            found.add(self.index[phrase])
+            found.update(self.index[other] for other in self.prefixes[phrase])
+        return found
+
+    def match_batch(self, titles):
+        """Hashtags of each title, as lists."""
+        cleaned = [clean_title(title) for title in titles]
+        found = [self.exact(title) for title in cleaned]
+        if self.threshold is not None and self.phrases and cleaned:
+            scores = process.cdist(self.phrases, cleaned, scorer=fuzz.partial_ratio,
+                                   score_cutoff=self.threshold, dtype='uint8')
+            for phrase, column in zip(*scores.nonzero()):
+                found[column].add(phrase)
+        return [self._hashtags(phrases) for phrases in found]
+
+    def match(self, title):
+        return self.match_batch([title])[0]
+
+    def _hashtags(self, phrases):
+        hashtags = {hashtag for phrase in phrases for hashtag in self.hashtags[phrase]}
+        return sorted(hashtags, key=self.order.get)
+
+
+def dictionary_version(keywords_to_hashtags):
+    """Hash of a keyword -> hashtag dictionary, independent of key order."""
+    encoded = json.dumps(keywords_to_hashtags, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+DEFAULT_VERSION = dictionary_version(KEYWORDS_TO_HASHTAGS)
+
+_matchers = OrderedDict()
+_matchers_lock = threading.Lock()
+
+
+def get_matcher(keywords_to_hashtags=None, version=None):
+    """
+    Return the compiled matcher of a dictionary (KEYWORDS_TO_HASHTAGS by
+    default), compiling it on first use of its version.
+    """
+    if not keywords_to_hashtags:
+        keywords_to_hashtags, version = KEYWORDS_TO_HASHTAGS, DEFAULT_VERSION
+    version = version or dictionary_version(keywords_to_hashtags)
+    with _matchers_lock:
+        matcher = _matchers.get(version)
+        if matcher is not None:
+            _matchers.move_to_end(version)
+            return matcher
+    matcher = HashtagMatcher(keywords_to_hashtags)
+    with _matchers_lock:
+        _matchers[version] = matcher
+        while len(_matchers) > MATCHER_CACHE_SIZE:
+            _matchers.popitem(last=False)
+    return matcher
+
+
+def feed_matcher(feed_config):
+    """The matcher of a feed's own dictionary, or of the default one."""
+    if not feed_config:
+        return get_matcher()
+    return get_matcher(feed_config.get('hashtag_keywords'), feed_config.get('hashtag_version'))
+
+
+def clear_matchers():
+    """Drop the compiled matchers (tests)."""
+    with _matchers_lock:
+        _matchers.clear()
+
 
-def generate_hashtags_fuzzy(title):
-    keywords_to_hashtags = {
-        "ai": "#AI",
-        "algorithm": "#algorithm",
-        "Amazon Web Services": "#AWS",
-        "API": "#API",
-        "artificial intelligence": "#AI",
-        "Aurora": "#Aurora",
-        "AWS": "#AWS",
-        "Azure": "#Azure",
-        "Bedrock": "#Bedrock",
-        "blockchain": "#blockchain",
-        "ChatGPT": "#ChatGPT",
-        "Claude": "#Claude",
-        "cloud computing": "#CloudComputing",
-        "cloud": "#Cloud",
-        "CloudWatch": "#CloudWatch",
-        "CNCF": "#CNCF",
-        "CNCF": "#CNCF",
-        "compliance": "#compliance",
-        "containers": "#containers",
-        "data": "#data",
-        "database": "#database",
-        "devops": "#DevOps",
-        "EC2": "#EC2",
-        "Fargate": "#Fargate",
-        "Forrester": "#Forrester",
-        "foundational model": "#FM",
-        "Gartner": "#Gartner",
-        "GCP": "#GCP",
-        "Gemini": "#Gemini",
-        "Gemini": "#Gemini",
-        "GitHub": "#GitHub",
-        "Google Cloud Platform": "#GCP",
-        "Google": "#Google",
-        "GPT": "#GPT",
-        "health": "#health",
-        "Inferentia": "#Inferentia",
-        "innovation": "#innovation",
-        "k8s": "#Kubernetes",
-        "Kubernetes": "#Kubernetes",
-        "kubernetes": "#Kubernetes",
-        "large language models": "#LLM",
-        "leadership": "#leadership",
-        "Linux": "#Linux",
-        "LLM": "#LLM",
-        "LLMs": "#LLM",
-        "machine learning": "#ML",
-        "malware": "#malware",
-        "MCP": "#MCP",
-        "microservices": "#microservices",
-        "Microsoft": "#Microsoft",
-        "ml": "#ML",
-        "model context protocol": "#MCP",
-        "open source": "#OpenSource",
-        "OpenAI": "#OpenAI",
-        "Pandas": "#Pandas",
-        "public sector": "#PublicSector",
-        "ransomware": "#ransomware",
-        "RDS": "#RDS",
-        "robot": "#robot",
-        "S3": "#S3",
-        "SageMaker": "#SageMaker",
-        "Scikit": "#Scikit",
-        "serverless": "#serverless",
-        "SQL": "#SQL",
-        "technology": "#technology",
-        "Terraform": "#Terraform",
-        "TOFAG": "#TOGAF",
-        "Trainium": "#Trainium",
-        "transformers": "#transformers",
-    }
-
-    hashtags = set()
-    title_clean = re.sub(r"[^\w\s]", "", title.lower())
-
-    for phrase, hashtag in keywords_to_hashtags.items():
-        # Exact phrase match
-        pattern = r'\b' + re.escape(phrase.lower()) + r'\b'
-        if re.search(pattern, title_clean):
-            hashtags.add(hashtag)
-        else:
-            # Fuzzy fallback
-            score = fuzz.partial_ratio(phrase.lower(), title_clean)
-            if score >= 85:
-                hashtags.add(hashtag)
-
-    return list(hashtags)
+def generate_hashtags_fuzzy(title, feed_config=None):
+    return feed_matcher(feed_config).match(title)
 
 
+def generate_hashtags_batch(titles, feed_config=None):
+    """Hashtags of several titles at once, one list per title."""
+    return feed_matcher(feed_config).match_batch(titles)
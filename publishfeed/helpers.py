@@ -1,104 +1,410 @@
+import calendar
+import hashlib
 import re
-import requests
+import time
 import feedparser
-from datetime import datetime
+import tweepy
+from datetime import datetime, timezone
 from time import mktime
 
+import clients
 import config
 from dynamo_ops import DynamoDBOps
-from config_loader import ConfigLoader
-from generate_hashtags_fuzzy import generate_hashtags_fuzzy
-from llm_helpers import extract_article_text, summarize_text
-from ln_oauth import ln_headers
-from ln_post import ln_user_info, post_2_linkedin_new
-from twitter import Twitter
+from config_loader import LINKEDIN_PARAMETER, ConfigLoader, twitter_parameter
+from canonical import item_aliases, item_identity
+from fetch_engine import FeedFetcher
+from fetch_state import get_fetch_state_store
+from enrichment import ENRICHED, FAILED, StageTimer, add_timings, enrich_item, enrich_items, max_tweet_body_length
+from parallel_enrich import enrich_parallel
+from selection import selection_policy
+from ln_post import LinkedInAuthError
 
 class Helper:
-    def __init__(self, feed_id):
+    def __init__(self, feed_id, feed_config=None, db_ops=None):
         self.feed_id = feed_id
-        self.config_loader = ConfigLoader()
-        self.db_ops = DynamoDBOps()
+        self.db_ops = db_ops or DynamoDBOps()
+        self.config_loader = ConfigLoader(self.db_ops)
         
-        # Load config from DynamoDB
-        self.feed_config = self.config_loader.load_feed_config(feed_id)
+        # Use the config handed over (see config_snapshot.py), or load it from DynamoDB
+        self.feed_config = feed_config or self.config_loader.load_feed_config(feed_id)
         if not self.feed_config:
             print(f"Warning: No configuration found for feed_id: {feed_id}")
             self.feed_config = {'urls': [], 'hashtags': ''}
+        self.selection_policy = selection_policy(self.feed_config)
 
 class FeedSetHelper(Helper):
-    def get_pages_from_feeds(self):
-        urls = self.feed_config.get('urls', [])
-        
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/114.0.0.0 Safari/537.36"
-            )
+    def __init__(self, feed_id, feed_config=None, fetch_state_store=None, seen_filter=None, db_ops=None):
+        super().__init__(feed_id, feed_config, db_ops)
+        self.fetch_state_store = fetch_state_store or get_fetch_state_store(self.db_ops)
+        # Optional BloomFilter of every ingested URL, see seen_filter.py
+        self.seen_filter = seen_filter
+        self.definitely_new = 0
+        self.duplicates = 0
+        # Links the seen filter cleared without a DynamoDB lookup
+        self.unverified = set()
+
+    def get_pages_from_feeds(self, deadline=None, skip_urls=()):
+        """
+        Download every feed URL, store the new entries and return fetch stats.
+
+        `deadline` (a time.monotonic() value) stops the fetch early: URLs not
+        handled by then are counted as `deferred`, and the handled ones are
+        left in `self.done_urls` so a later run can pass them as `skip_urls`.
+
+        URLs are requested with the validators (ETag / Last-Modified) saved by
+        the previous run; a 304 or a body identical to the last one is skipped
+        without parsing or checking its entries against DynamoDB. For feeds
+        listed newest first, entries at or below the newest entry ingested last
+        time (the high-water mark) are not checked either.
+        """
+        urls = [url for url in self.feed_config.get('urls', []) if url not in skip_urls]
+        self.done_urls = []
+        stats = {
+            'urls': len(urls),
+            'not_modified': 0, # 304 responses
+            'unchanged': 0, # 200 responses with the same body as last run
+            'parsed': 0,
+            'below_mark': 0, # entries skipped by the high-water mark
+            'definitely_new': 0, # entries the seen filter cleared without DynamoDB
+            'duplicates': 0, # entries already stored under another alias or seen in another feed
+            'failed': 0,
+            'deferred': 0, # URLs left for the next run when the deadline hit
+            'new_items': 0,
         }
-        
+
+        states = {url: self.fetch_state_store.get(url) for url in urls}
+        request_headers = {url: self._conditional_headers(state) for url, state in states.items()}
+        new_states = {}
         new_items = []
+        self.seen_keys = set()
+        definitely_new = self.definitely_new
+        duplicates = self.duplicates
+
+        fetcher = FeedFetcher()
+        if deadline is not None:
+            fetcher.timeout = max(min(fetcher.timeout, deadline - time.monotonic()), 0.1)
+
+        # Feeds are downloaded concurrently; each one is parsed and filtered
+        # as soon as its response arrives.
+        for result in fetcher.fetch(urls, request_headers=request_headers):
+            if deadline is not None and time.monotonic() > deadline:
+                print("  ! Deadline reached, deferring the remaining URLs")
+                break
+            self.done_urls.append(result.url)
+            print(f"  Fetched URL: {result.url} ({result.elapsed:.2f}s)")
+            if result.error:
+                print(f"    ! Error fetching URL {result.url}: {result.error}")
+                stats['failed'] += 1
+                continue
+            if result.status == 304:
+                print("    - Not modified, skipped")
+                stats['not_modified'] += 1
+                continue
+            if result.status != 200:
+                print(f"    ! Failed to fetch {result.url}. Status: {result.status}")
+                stats['failed'] += 1
+                continue
+
+            state = {
+                'etag': result.headers.get('ETag'),
+                'last_modified': result.headers.get('Last-Modified'),
+                'content_hash': hashlib.sha256(result.content).hexdigest(),
+            }
+            if state['content_hash'] == states[result.url].get('content_hash'):
+                print("    - Body unchanged, skipped")
+                stats['unchanged'] += 1
+                new_states[result.url] = state
+                continue
 
-        for url in urls:
-            print(f"  Fetching URL: {url}")
             try:
-                response = requests.get(url, headers=headers, timeout=10)
-                if response.status_code == 200:
-                    parsed_feed = feedparser.parse(response.content)
-                    print(f"    - Parsed {len(parsed_feed.entries)} entries")
-                    
-                    for entry in parsed_feed.entries:
-                        item_url = entry.link
-                        
-                        # Check if exists in DynamoDB
-                        if self.db_ops.check_rss_item_exists(item_url):
-                            # print(f"      - Skipped (Exists): {item_url}")
-                            continue
-                            
-                        item_title = entry.title
-                        if "squid" in item_title.lower():
-                            print(f"      - Skipped (Filter 'squid'): {item_title}")
-                            continue
-
-                        try:
-                            # Parse date
-                            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                                item_date = datetime.fromtimestamp(mktime(entry.published_parsed))
-                            else:
-                                item_date = datetime.now()
-
-                            item = {
-                                'url': item_url,
-                                'title': item_title,
-                                'dateAdded': item_date.isoformat(), # DynamoDB needs string
-                                'status': 'unpublished',
-                                'feed_id': self.feed_id # Track source feed
-                            }
-                            new_items.append(item)
-                            print(f"      + New Item: {item_title}")
-                            
-                        except AttributeError as e:
-                            print(f"      ! Error parsing entry: {e}")
-                            continue
-                else:
-                    print(f"    ! Failed to fetch {url}. Status: {response.status_code}")
+                parsed_feed = feedparser.parse(result.content)
+                print(f"    - Parsed {len(parsed_feed.entries)} entries")
+                entries, mark = self._entries_above_mark(parsed_feed.entries, states[result.url])
+                stats['below_mark'] += len(parsed_feed.entries) - len(entries)
+                new_items.extend(self._new_items_from_entries(entries))
+                stats['parsed'] += 1
+                new_states[result.url] = {**state, **mark}
             except Exception as e:
-                print(f"    ! Error fetching URL {url}: {e}")
+                print(f"    ! Error processing URL {result.url}: {e}")
+                stats['failed'] += 1
                 continue
 
+        saved = True
         if new_items:
             print(f"  Saving {len(new_items)} new items for {self.feed_id}...")
-            self.db_ops.batch_write_rss_items(new_items)
-            print(f"  Saved {len(new_items)} items.")
+            new_items, saved = self._save_new_items(new_items)
+            if saved:
+                stats['new_items'] = len(new_items)
+                print(f"  Saved {len(new_items)} items.")
+                if self.seen_filter is not None:
+                    for item in new_items:
+                        self.seen_filter.add(item['url'])
         else:
             print(f"  No new items found for {self.feed_id} (or all were filtered/existed).")
 
+        # Only remember validators once the items they cover are stored,
+        # otherwise a failed write would be skipped on the next run too.
+        if saved:
+            for url, state in new_states.items():
+                self.fetch_state_store.put(url, {**states[url], **state})
+
+        stats['deferred'] = len(urls) - len(self.done_urls)
+        stats['definitely_new'] = self.definitely_new - definitely_new
+        stats['duplicates'] = self.duplicates - duplicates
+        print(f"  Skipped {stats['not_modified'] + stats['unchanged']}/{stats['urls']} URLs "
+              f"({stats['not_modified']} not modified, {stats['unchanged']} unchanged)")
+        return stats
+
+    def _save_new_items(self, items):
+        """
+        Store new items, returning (the items written, whether every write
+        succeeded). Items only the seen filter vouched for, or whose lookup
+        failed, are written with a condition, since the filter misses URLs
+        stored by other writers (CLI, migrations, a run that stopped before
+        saving it): those already stored are left untouched and added to
+        the filter.
+        """
+        unverified = [item for item in items if item['url'] in self.unverified]
+        checked = [item for item in items if item['url'] not in self.unverified]
+        saved = self.db_ops.batch_write_rss_items(checked, self.selection_policy)
+        existing = self.db_ops.put_new_rss_items(unverified, self.selection_policy) if unverified else set()
+        if existing is None:
+            return checked, False
+        if existing:
+            print(f"  ! {len(existing)} items were already stored, left as they are")
+            self.duplicates += len(existing)
+            if self.seen_filter is not None:
+                for url in existing:
+                    self.seen_filter.add(url)
+        return [item for item in items if item['url'] not in existing], saved
+
+    @staticmethod
+    def _conditional_headers(state):
+        headers = {}
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+        return headers
+
+    def _entries_above_mark(self, entries, state):
+        """
+        Return the entries newer than the feed's high-water mark, and the
+        new mark to save (the newest entry's link and date).
+
+        Only feeds whose entries all carry dates in newest-first order are
+        cut at the mark; anything else (or `full_scan` in the feed config)
+        falls back to a full scan and relies on the existence checks.
+        """
+        dated = [(entry, self._entry_date(entry)) for entry in entries]
+        if not dated or any(date is None for _, date in dated):
+            return entries, {}
+
+        newest_entry, newest_date = max(dated, key=lambda pair: pair[1])
+        mark = {'hwm_id': item_identity(newest_entry), 'hwm_date': newest_date}
+
+        ordered = all(dated[i][1] >= dated[i + 1][1] for i in range(len(dated) - 1))
+        if not ordered or self.feed_config.get('full_scan'):
+            print("    - Unordered feed, full scan")
+            return entries, mark
+
+        hwm_id, hwm_date = state.get('hwm_id'), state.get('hwm_date')
+        if not hwm_date:
+            return entries, mark
+
+        above = []
+        for entry, date in dated:
+            # Entries sharing the mark's timestamp are kept, the existence
+            # check sorts them out.
+            if item_identity(entry) == hwm_id or date < hwm_date:
+                break
+            above.append(entry)
+        return above, mark
+
+    @staticmethod
+    def _entry_date(entry):
+        """
+        Entry publish (or update) date as an ISO UTC string, None if missing.
+        """
+        parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+        if not parsed:
+            return None
+        return datetime.fromtimestamp(calendar.timegm(parsed), tz=timezone.utc).isoformat()
+
+    def _existing_links(self, links):
+        """
+        Return the links (item keys) already stored. With a seen filter only the "maybe
+        seen" links are looked up in DynamoDB, the rest are definitely new.
+        Links the lookup could not confirm are treated like filter misses:
+        written only if still absent (see _save_new_items).
+        """
+        if self.seen_filter is not None:
+            maybe_seen = [link for link in links if link in self.seen_filter]
+            self.definitely_new += len(links) - len(maybe_seen)
+            self.unverified.update(link for link in links if link not in self.seen_filter)
+            links = maybe_seen
+        if not links:
+            return set()
+        existing = self.db_ops.check_rss_items_exist(links)
+        if existing is None:
+            print(f"  ! Existence check incomplete, {len(links)} links will be written only if new")
+            self.unverified.update(links)
+            return set()
+        return existing
+
+    def _new_items_from_entries(self, entries):
+        """
+        Turn parsed feed entries into RSSContent items, skipping the ones
+        already stored and the ones caught by the title filter.
+        """
+        # Entries are keyed by their canonical identity (see canonical.py). One
+        # bulk existence check per feed covers every alias an entry may already
+        # be stored under; keys already picked up from another URL in this run
+        # are dropped too.
+        keyed = []
+        for entry in entries:
+            if not entry.get('link'):
+                print("      ! Error parsing entry: no link")
+                continue
+            key = item_identity(entry)
+            if key in self.seen_keys:
+                self.duplicates += 1
+                continue
+            keyed.append((entry, key, item_aliases(entry)))
+        existing = self._existing_links([alias for _, _, aliases in keyed for alias in aliases])
+
+        new_items = []
+        for entry, key, aliases in keyed:
+            if key in self.seen_keys or any(alias in existing for alias in aliases):
+                # print(f"      - Skipped (Exists): {key}")
+                if key in self.seen_keys or key not in existing:
+                    # Same article under another link or from another feed
+                    self.duplicates += 1
+                continue
+            self.seen_keys.add(key)
+                
+            item_title = entry.title
+            if "squid" in item_title.lower():
+                print(f"      - Skipped (Filter 'squid'): {item_title}")
+                continue
+
+            try:
+                # Parse date
+                if hasattr(entry, 'published_parsed') and entry.published_parsed:
+                    item_date = datetime.fromtimestamp(mktime(entry.published_parsed))
+                else:
+                    item_date = datetime.now()
+
+                item = {
+                    'url': key, # canonical identity, the table key
+                    'link': entry.link, # original link, used for publishing
+                    'title': item_title,
+                    'dateAdded': item_date.isoformat(), # DynamoDB needs string
+                    'status': 'unpublished',
+                    'feed_id': self.feed_id # Track source feed
+                }
+                new_items.append(item)
+                print(f"      + New Item: {item_title}")
+                
+            except AttributeError as e:
+                print(f"      ! Error parsing entry: {e}")
+                continue
+        return new_items
+
+
+class EnrichmentHelper(Helper):
+    def enrich_pending(self, deadline=None, limit=None, workers=None):
+        """
+        Enrich the feed's items waiting in the EnrichIndex, newest first, in
+        batches of ENRICH_BATCH_SIZE, and return stats plus the summed stage
+        timings (ms) in `self.timings`.
+
+        No batch is started past `deadline` (a time.monotonic() value); the
+        items left stay queued for the next run. An item whose enrichment
+        raises is marked 'failed' and left to publish, which enriches it
+        inline. With more than one worker (ENRICH_WORKERS by default) pages
+        are parsed by worker processes, see parallel_enrich.py.
+        """
+        stats = {'pending': 0, 'enriched': 0, 'failed': 0, 'deferred': 0}
+        self.timings = {}
+        urls = self.db_ops.pending_enrichment(self.feed_id, limit)
+        stats['pending'] = len(urls)
+        workers = workers or config.ENRICH_WORKERS
+        if workers > 1 and urls:
+            self._enrich_parallel(urls, deadline, stats, workers)
+            return stats
+        for start in range(0, len(urls), config.ENRICH_BATCH_SIZE):
+            if deadline is not None and time.monotonic() > deadline:
+                print("  ! Deadline reached, leaving the remaining items queued")
+                stats['deferred'] = len(urls) - start
+                break
+            items = [self.db_ops.get_rss_item(url) for url in urls[start:start + config.ENRICH_BATCH_SIZE]]
+            items = [item for item in items if item and item.get('enrich_state') != ENRICHED]
+            saved = set()
+            try:
+                self._enrich_batch(items, deadline, stats, saved)
+            except Exception as e:
+                # Find the culprit one item at a time, among those not saved yet
+                print(f"  ! Error enriching a batch of {len(items)} items: {e}")
+                for item in items:
+                    if item['url'] in saved:
+                        continue
+                    try:
+                        self._enrich_batch([item], deadline, stats, saved)
+                    except Exception as e:
+                        print(f"  ! Error enriching {item['url']}: {e}")
+                        self.db_ops.save_enrichment(item['url'], {'enrich_state': FAILED})
+                        stats['failed'] += 1
+        return stats
+
+    def _enrich_parallel(self, urls, deadline, stats, workers):
+        items = [self.db_ops.get_rss_item(url) for url in urls]
+        items = [item for item in items if item and item.get('enrich_state') != ENRICHED]
+        done = 0
+        try:
+            for item, attributes in enrich_parallel(items, self.feed_config, workers, deadline):
+                self.db_ops.save_enrichment(item['url'], attributes)
+                done += 1
+                stats['enriched'] += 1
+                add_timings(self.timings, attributes['enrich_ms'])
+                print(f"  Enriched: {item['title']} ({attributes['enrich_ms']})")
+        except Exception as e:
+            # Whatever was not written stays queued for the next run
+            print(f"  ! Error in parallel enrichment: {e}")
+        if done < len(items):
+            stats['deferred'] += len(items) - done
+
+    def _enrich_batch(self, items, deadline, stats, saved):
+        """
+        Enrich and save a batch of items, adding the URL of each item saved
+        to `saved`.
+        """
+        timers = [StageTimer() for _ in items]
+        results = enrich_items(items, self.feed_config, timers, deadline)
+        for item, timer, attributes in zip(items, timers, results):
+            self.db_ops.save_enrichment(item['url'], attributes)
+            saved.add(item['url'])
+            stats['enriched'] += 1
+            add_timings(self.timings, timer.timings)
+            print(f"  Enriched: {item['title']} ({timer})")
+
 
 class RSSContentHelper(Helper):
     def tweet_rsscontent(self):
-        # 1. Get a random unpublished item
+        """
+        Post the feed's next unpublished item to LinkedIn and Twitter.
+
+        Enriched items (see enrichment.py) are posted as stored; any other
+        item is enriched inline first. Stage timings (ms) are left in
+        `self.timings`.
+        """
+        timer = StageTimer()
+        self.timings = timer.timings
+
+        # 1. Get the next unpublished item
         min_date = self.feed_config.get('min_date')
-        rsscontent = self.db_ops.get_random_unpublished_item(min_date)
+        with timer.stage('select'):
+            rsscontent = self.db_ops.select_unpublished_item(self.feed_id, self.selection_policy, min_date)
         if not rsscontent:
             print("No unpublished items found.")
             return
@@ -106,130 +412,72 @@ class RSSContentHelper(Helper):
         print(f"Processing: {rsscontent['title']}")
 
         # 2. Get Secrets (Twitter Keys)
-        secrets = self.config_loader.load_secrets(self.feed_id)
+        with timer.stage('secrets'):
+            secrets = self.config_loader.load_secrets(self.feed_id)
         if not secrets:
             print(f"No secrets found for {self.feed_id}. Cannot post.")
             return
-            
-        # LinkedIn Token (Assume needed? The old code used ln_credentials.json)
-        # For this migration, we are focusing on migrating the 'feeds.yml' secrets (Twitter).
-        # But the code uses LinkedIn too. 
-        # Ideally, we should store LinkedIn Token in SSM too. 
-        # For now, let's assume the user has migrated LinkedIn logic effectively or we skip it if missing.
-        # Actually, let's look at `ln_auth` again. It reads from file. 
-        # We need to adapt this. 
-        # For simplistic migration, I'll comment out LinkedIn part or assume token is passed.
-        # Let's try to get LinkedIn token from SSM as well if we saved it there?
-        # The current plan didn't explicitly say "migrate LinkedIn token to SSM" but it implied strict separation.
-        # I'll stick to Twitter for now to match `feeds.yml` migration which was the request.
-        # But wait, `tweet_rsscontent` in original files DOES post to LinkedIn.
-        # I'll try to keep it functioning if I can.
-        
-        # ... (Continuing with Twitter logic) ...
-        
-        twitter = Twitter(**secrets)
 
-        tweet_url = rsscontent['url']
-        tweet_hashtag = self.feed_config.get('hashtags', '')
-        
-        # Generate hashtags
-        the_hashtags = generate_hashtags_fuzzy(rsscontent['title'])
-        content = rsscontent['title'] + "\n" + " ".join(list(the_hashtags))
+        twitter = clients.twitter(self.feed_id, secrets)
 
-        # OpenAI Summary
-        article_text = extract_article_text(rsscontent['url'])
-        tweet_text = ""
-        
-        if article_text:
-            summary = summarize_text(article_text)
-            
-            # Post to LinkedIn 
-            ln_secrets = self.config_loader.load_linkedin_secrets()
-            if ln_secrets:
-                try:
-                    # We expect ln_secrets to have 'access_token'
-                    # Or we might need to adapt ln_headers to accept the token directly
-                    # The original ln_headers took access_token as arg.
-                    access_token = ln_secrets.get('access_token')
-                    if access_token:
-                        linkedin_headers = ln_headers(access_token)
-                        user_info = ln_user_info(linkedin_headers)
-                        urn = user_info['id']
-                        author = f"urn:li:person:{urn}"
-                        api_url = "https://api.linkedin.com/rest/posts"
-                        
-                        post_2_linkedin_new(
-                            rsscontent['title'],
-                            rsscontent['url'],
-                            summary,
-                            author,
-                            api_url,
-                            linkedin_headers
-                        )
-                        print("Posted to LinkedIn.")
-                    else:
-                        print("LinkedIn access_token not found in secrets.")
-                except Exception as e:
-                    print(f"Error posting to LinkedIn: {e}")
-            
-            max_body_length = self._calculate_max_tweet_body_length(include_hashtags=False)
-            if len(summary) > max_body_length:
-                tweet_body = summary[:max_body_length].rsplit(" ", 1)[0]
-            else:
-                tweet_body = summary
-            
-            tweet_text = "{} \n\n{} ".format(tweet_body, tweet_url)
-        else:
-            # Fallback
-            
-            # Post to LinkedIn (Fallback content)
-            ln_secrets = self.config_loader.load_linkedin_secrets()
-            if ln_secrets:
-                try:
-                    access_token = ln_secrets.get('access_token')
-                    if access_token:
-                        linkedin_headers = ln_headers(access_token)
-                        user_info = ln_user_info(linkedin_headers)
-                        urn = user_info['id']
-                        author = f"urn:li:person:{urn}"
-                        api_url = "https://api.linkedin.com/rest/posts"
-                        
-                        post_2_linkedin_new(
-                            rsscontent['title'],
-                            rsscontent['url'],
-                            content,
-                            author,
-                            api_url,
-                            linkedin_headers
-                        )
-                        print("Posted to LinkedIn (Fallback).")
-                except Exception as e:
-                    print(f"Error posting to LinkedIn: {e}")
-
-            body_length = self._calculate_max_tweet_body_length(include_hashtags=True)
-            tweet_body = content[:body_length]
-            tweet_text = "{} {} {}".format(tweet_body, tweet_url, tweet_hashtag)
+        # 3. Summary, hashtags and post text, normally prepared by the enrichment stage
+        if rsscontent.get('enrich_state') != ENRICHED:
+            print("Item not enriched yet, enriching inline")
+            attributes = enrich_item(rsscontent, self.feed_config, timer)
+            # Kept even if posting fails below, so a retry does not redo it
+            self.db_ops.save_enrichment(rsscontent['url'], attributes)
+            rsscontent.update(attributes)
+
+        # Items keyed by a canonical identity keep the original link apart
+        tweet_url = rsscontent.get('link', rsscontent['url'])
+        posts = rsscontent['posts']
+
+        # Post to LinkedIn
+        with timer.stage('linkedin'):
+            self._post_to_linkedin(rsscontent['title'], tweet_url, posts['linkedin'],
+                                   "" if rsscontent.get('summary') else "(Fallback)",
+                                   rsscontent.get('thumbnail_url', ''))
 
         # Post to Twitter
         try:
-            twitter.update_status(tweet_text)
+            with timer.stage('twitter'):
+                twitter.update_status(posts['twitter'])
             print("Posted to Twitter.")
             
             # Mark as published
-            self.db_ops.mark_as_published(rsscontent['url'])
+            with timer.stage('mark_published'):
+                self.db_ops.mark_as_published(rsscontent['url'])
             
+        except tweepy.errors.Unauthorized as e:
+            # Credentials probably rotated, read them again next time
+            print(f"Twitter rejected the credentials of {self.feed_id}: {e}")
+            self.config_loader.invalidate_secrets(twitter_parameter(self.feed_id))
+            clients.forget(f'twitter:{self.feed_id}:')
         except Exception as e:
             print(f"Error posting to Twitter: {e}")
+        finally:
+            print(f"Publish timings: {timer}")
+
+    def _post_to_linkedin(self, title, link, text, label="", thumbnail_url=None):
+        """Post to LinkedIn with the global access token, if there is one."""
+        ln_secrets = self.config_loader.load_linkedin_secrets()
+        if not ln_secrets:
+            return
+        access_token = ln_secrets.get('access_token')
+        if not access_token:
+            print("LinkedIn access_token not found in secrets.")
+            return
+        try:
+            clients.linkedin(access_token).post(title, link, text, thumbnail_url)
+            print(f"Posted to LinkedIn{' ' + label if label else ''}.")
+        except LinkedInAuthError as e:
+            # Token probably rotated, read it again next time
+            print(f"LinkedIn rejected the access token: {e}")
+            self.config_loader.invalidate_secrets(LINKEDIN_PARAMETER)
+            clients.forget('linkedin:')
+        except Exception as e:
+            print(f"Error posting to LinkedIn: {e}")
 
     def _calculate_max_tweet_body_length(self, include_hashtags=True):
         """Calculate maximum length for tweet body considering URL and optional hashtags."""
-        available_length = (
-            config.TWEET_MAX_LENGTH - config.TWEET_URL_LENGTH - config.TWEET_IMG_LENGTH
-        )
-        if include_hashtags:
-            # In new logic, hashtags is a string, not list? Old: len(self.data["hashtags"])
-            # self.feed_config['hashtags'] is likely a string or list.
-            ht = self.feed_config.get('hashtags', '')
-            hashtag_length = len(ht)
-            available_length -= hashtag_length
-        return available_length - 2
+        return max_tweet_body_length(self.feed_config.get('hashtags', ''), include_hashtags)
@@ -0,0 +1,144 @@
+"""
+Article text from HTML with a single lxml parse.
+
+Boilerplate is removed first: script, style, navigation, header, footer,
+aside, form and similar elements, and elements whose class or id looks
+like comments, sharing buttons, related links, ads or cookie banners.
+One walk of the remaining tree then splits the page into text blocks
+(paragraphs, list items, headings...) and scores each block's parent by
+the amount of prose in it, mostly-link blocks not counting. The text is
+the blocks of the best scoring element, one per line.
+"""
+import re
+
+import lxml.html
+from lxml import etree
+
+BOILERPLATE_TAGS = (
+    'script', 'style', 'noscript', 'iframe', 'nav', 'header', 'footer', 'aside',
+    'form', 'button', 'select', 'svg', 'canvas', 'template', 'object', 'embed',
+)
+BOILERPLATE_PATTERN = (
+    'comment|sidebar|footer|navbar|menu|share|social|related|promo|advert|sponsor|'
+    'cookie|newsletter|subscribe|banner|popup|modal|breadcrumb|pagination'
+)
+BOILERPLATE_XPATH = etree.XPath(
+    "//*[not(self::html or self::body or self::article or self::main)]"
+    "[re:test(concat(@class, ' ', @id), $pattern, 'i')]",
+    namespaces={'re': 'http://exslt.org/regular-expressions'},
+)
+BLOCK_TAGS = frozenset(
+    'address article blockquote dd div dl dt figcaption figure h1 h2 h3 h4 h5 h6 '
+    'li main ol p pre section table tbody td th thead tr ul body'.split()
+)
+PARAGRAPH_TAGS = frozenset('p pre blockquote li td dd'.split())
+HEADING_TAGS = frozenset('h1 h2 h3 h4 h5 h6'.split())
+MIN_BLOCK_CHARS = 25 # blocks shorter than this do not score
+MAX_LINK_DENSITY = 0.5 # blocks with more of their text in links are navigation
+WHITESPACE = re.compile(r'\s+')
+
+
+class _Block:
+    __slots__ = ('element', 'order', 'parts', 'link_chars')
+
+    def __init__(self, element, order):
+        self.element = element
+        self.order = order
+        self.parts = []
+        self.link_chars = 0
+
+    def add(self, text, in_link):
+        self.parts.append(text)
+        if in_link:
+            self.link_chars += len(text)
+
+
+def _blocks(root):
+    """
+    Text blocks of the tree in document order, as (element, text, link
+    density): the text directly inside each block element and its inline
+    children, without that of nested blocks.
+    """
+    blocks = []
+    stack = [_Block(root, 0)]
+    links = 0
+    order = 0
+    for event, element in etree.iterwalk(root, events=('start', 'end')):
+        tag = element.tag
+        if not isinstance(tag, str):
+            # Comments and processing instructions, only their tail is text
+            if event == 'end' and element.tail:
+                stack[-1].add(element.tail, links)
+            continue
+        if event == 'start':
+            if tag in BLOCK_TAGS and element is not root:
+                order += 1
+                stack.append(_Block(element, order))
+            if tag == 'a':
+                links += 1
+            if element.text:
+                stack[-1].add(element.text, links)
+            continue
+
+        if tag == 'a':
+            links -= 1
+        if tag in BLOCK_TAGS and element is not root:
+            blocks.append(stack.pop())
+        elif tag == 'br':
+            stack[-1].add(' ', False)
+        if element.tail:
+            stack[-1].add(element.tail, links)
+    blocks.append(stack.pop())
+
+    result = []
+    for block in sorted(blocks, key=lambda b: b.order):
+        text = WHITESPACE.sub(' ', ''.join(block.parts)).strip()
+        if text:
+            result.append((block.element, text, block.link_chars / len(text)))
+    return result
+
+
+def extract_text(html):
+    """
+    Main text of an HTML page (bytes or str), '' if none was found.
+    """
+    try:
+        document = lxml.html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        return ''
+    etree.strip_elements(document, *BOILERPLATE_TAGS, with_tail=False)
+    for element in BOILERPLATE_XPATH(document, pattern=BOILERPLATE_PATTERN):
+        element.drop_tree()
+    root = document.find('body')
+    if root is None:
+        root = document
+
+    blocks = _blocks(root)
+    scores = {}
+    for element, text, link_density in blocks:
+        if len(text) < MIN_BLOCK_CHARS or link_density > MAX_LINK_DENSITY:
+            continue
+        score = (1 + text.count(',') + min(len(text) / 100, 3)) * (1 - link_density)
+        if element.tag in PARAGRAPH_TAGS and element is not root:
+            container = element.getparent()
+        else:
+            # Text directly in a container counts for the container itself
+            container = element
+        scores[container] = scores.get(container, 0) + score
+        outer = container.getparent()
+        if outer is not None:
+            scores[outer] = scores.get(outer, 0) + score / 2
+    if not scores:
+        return ''
+    best = max(scores, key=scores.get)
+
+    lines = []
+    for element, text, link_density in blocks:
+        if link_density > MAX_LINK_DENSITY:
+            continue
+        if element is not best and best not in element.iterancestors():
+            continue
+        if element.tag not in HEADING_TAGS and len(text.split()) < 3:
+            continue
+        lines.append(text)
+    return '\n'.join(lines)
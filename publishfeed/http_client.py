@@ -0,0 +1,241 @@
+"""
+Shared HTTP client for every outbound call (feeds, article pages, LinkedIn,
+OpenAI).
+
+One pooled session is kept per process, so connections (and TLS sessions)
+to the same host are reused across calls and across warm Lambda
+invocations. Requests get default timeouts and a response size cap.
+HTTP/2 is used when HTTP2_ENABLED is set and the `h2` package is installed.
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import config
+
+try:
+    import httpx
+except ImportError: # pragma: no cover
+    httpx = None
+
+# Errors of every request, the HTTP/2 path's included (mapped to requests')
+REQUEST_ERRORS = (requests.RequestException,)
+
+DEFAULT_TIMEOUT = (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+CHUNK_SIZE = 64 * 1024
+
+
+class ResponseTooLarge(requests.RequestException):
+    """
+    Raised when a response body goes over the size cap.
+    """
+
+
+_lock = threading.Lock()
+_session = None
+_http2_client = None
+_counters = {'requests': 0, 'connections': 0}
+_http2_streams = set()
+
+
+def _count(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+class CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        _count('connections')
+        super().connect()
+
+
+class CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        _count('connections')
+        super().connect()
+
+
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = CountingHTTPConnection
+
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = CountingHTTPSConnection
+
+
+class CountingAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose pools count every connection they open.
+    """
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CountingHTTPConnectionPool,
+            'https': CountingHTTPSConnectionPool,
+        }
+
+
+def get_session():
+    """
+    Return the process-wide requests.Session.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = CountingAdapter(
+                pool_connections=config.HTTP_POOL_HOSTS,
+                pool_maxsize=config.HTTP_POOL_SIZE,
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+
+def _get_http2_client():
+    global _http2_client
+    with _lock:
+        if _http2_client is None:
+            _http2_client = httpx.Client(
+                http2=True,
+                timeout=httpx.Timeout(config.HTTP_READ_TIMEOUT, connect=config.HTTP_CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_keepalive_connections=config.HTTP_POOL_SIZE),
+            )
+        return _http2_client
+
+
+def _use_http2():
+    if not config.HTTP2_ENABLED or httpx is None:
+        return False
+    try:
+        import h2 # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def request(method, url, max_bytes=None, **kwargs):
+    """
+    Send a request through the shared session.
+
+    Accepts the usual requests keyword arguments. `timeout` defaults to
+    (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT) and the body is read up to
+    `max_bytes` (HTTP_MAX_BYTES by default), raising ResponseTooLarge past it.
+    """
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    max_bytes = max_bytes or config.HTTP_MAX_BYTES
+    if _use_http2() and 'files' not in kwargs:
+        return _request_http2(method, url, max_bytes, **kwargs)
+
+    response = get_session().request(method, url, stream=True, **kwargs)
+    _count('requests')
+    try:
+        declared = int(response.headers.get('Content-Length') or 0)
+        if declared > max_bytes:
+            raise ResponseTooLarge(f"{url}: {declared} bytes is over the {max_bytes} bytes cap")
+        body = bytearray()
+        for chunk in response.iter_content(CHUNK_SIZE):
+            body.extend(chunk)
+            if len(body) > max_bytes:
+                raise ResponseTooLarge(f"{url}: body is over the {max_bytes} bytes cap")
+        response._content = bytes(body)
+    finally:
+        response.close()
+    return response
+
+
+def _request_http2(method, url, max_bytes, timeout=None, allow_redirects=True, data=None, **kwargs):
+    """
+    Send a request through the HTTP/2 client, returning a requests.Response
+    and raising requests exceptions, so callers need not tell the paths
+    apart.
+    """
+    client = _get_http2_client()
+    if isinstance(timeout, tuple):
+        timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+    if isinstance(data, (bytes, str)):
+        kwargs['content'] = data
+    elif data is not None:
+        kwargs['data'] = data
+    try:
+        with client.stream(method, url, timeout=timeout, follow_redirects=allow_redirects, **kwargs) as response:
+            _count('requests')
+            stream = response.extensions.get('network_stream')
+            with _lock:
+                if stream is not None and id(stream) not in _http2_streams:
+                    _http2_streams.add(id(stream))
+                    _counters['connections'] += 1
+            body = bytearray()
+            for chunk in response.iter_bytes(CHUNK_SIZE):
+                body.extend(chunk)
+                if len(body) > max_bytes:
+                    raise ResponseTooLarge(f"{url}: body is over the {max_bytes} bytes cap")
+    except httpx.TimeoutException as e:
+        raise requests.Timeout(str(e)) from e
+    except httpx.TooManyRedirects as e:
+        raise requests.TooManyRedirects(str(e)) from e
+    except httpx.ConnectError as e:
+        raise requests.ConnectionError(str(e)) from e
+    except httpx.HTTPError as e:
+        raise requests.RequestException(str(e)) from e
+    return _as_requests_response(response, bytes(body))
+
+
+def _as_requests_response(response, body):
+    converted = requests.Response()
+    converted.status_code = response.status_code
+    converted.reason = response.reason_phrase
+    converted.headers = CaseInsensitiveDict(response.headers)
+    converted.url = str(response.url)
+    converted.encoding = get_encoding_from_headers(converted.headers)
+    converted.elapsed = response.elapsed
+    converted._content = body
+    return converted
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def put(url, **kwargs):
+    return request('PUT', url, **kwargs)
+
+
+def record(num_requests=0, num_connections=0):
+    """
+    Add requests made outside the shared session (e.g. the async feed
+    fetcher) to the counters.
+    """
+    with _lock:
+        _counters['requests'] += num_requests
+        _counters['connections'] += num_connections
+
+
+def stats():
+    """
+    Requests sent, connections opened and connections reused since the last
+    reset_stats().
+    """
+    with _lock:
+        totals = dict(_counters)
+    totals['reused'] = max(totals['requests'] - totals['connections'], 0)
+    return totals
+
+
+def reset_stats():
+    """
+    Start counting from zero, e.g. at the start of a Lambda invocation.
+    """
+    with _lock:
+        _counters['requests'] = 0
+        _counters['connections'] = 0
@@ -0,0 +1,64 @@
+import time
+
+import clients
+import config
+import http_client
+from config_snapshot import load_config_snapshot
+from dynamo_ops import DynamoDBOps
+from enrichment import add_timings
+from extraction_memo import get_extraction_memo
+from helpers import EnrichmentHelper
+from page_cache import get_page_cache, reset_page_cache
+from summary_cache import get_summary_cache
+
+import logging
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+def handler(event, context):
+    logger.info("Starting EnrichFunction")
+    http_client.reset_stats()
+    reset_page_cache()
+    db_ops = DynamoDBOps()
+
+    # All feed configs, paged through once and cached across warm invocations
+    feeds = load_config_snapshot(db_ops)
+
+    totals, timings = enrich_feeds(feeds, context, db_ops)
+
+    logger.info(f"Enrich stats: {totals}")
+    logger.info(f"Stage timings (ms): {timings}")
+    logger.info(f"Summary cache: {get_summary_cache().stats()}")
+    logger.info(f"Page cache: {get_page_cache().stats()}")
+    logger.info(f"Extraction: {get_extraction_memo().stats()}")
+    logger.info(f"LLM requests: {clients.llm().stats()}")
+    logger.info(f"HTTP stats: {http_client.stats()}")
+    logger.info("EnrichFunction complete")
+    return {"statusCode": 200, "body": "Enrich complete", "stats": totals, "timings": timings}
+
+def enrich_feeds(feeds, context, db_ops=None):
+    """
+    Enrich up to ENRICH_MAX_ITEMS_PER_FEED pending items of every feed
+    (FeedConfig), stopping ENRICH_DEADLINE_MARGIN seconds before the Lambda
+    timeout. Items left over stay in the EnrichIndex for the next run.
+    Returns (stats totals, summed stage timings in ms).
+    """
+    deadline = time.monotonic() + context.get_remaining_time_in_millis() / 1000 - config.ENRICH_DEADLINE_MARGIN
+    totals = {}
+    timings = {}
+    for feed in feeds:
+        if time.monotonic() > deadline:
+            logger.warning(f"Stopping before the Lambda deadline, {feed.feed_id} and later feeds deferred")
+            break
+        logger.info(f"Enriching feed_id: {feed.feed_id}")
+        try:
+            helper = EnrichmentHelper(feed.feed_id, feed_config=feed, db_ops=db_ops)
+            stats = helper.enrich_pending(deadline=deadline, limit=config.ENRICH_MAX_ITEMS_PER_FEED)
+            for key, value in stats.items():
+                totals[key] = totals.get(key, 0) + value
+            add_timings(timings, helper.timings)
+        except Exception as e:
+            logger.error(f"Error enriching feed {feed.feed_id}: {e}", exc_info=True)
+    return totals, timings
@@ -1,6 +1,16 @@
-import boto3
+import json
 import os
+import time
+from datetime import datetime
+
+import clients
+import config
+import http_client
+from config_snapshot import load_config_snapshot
 from helpers import FeedSetHelper
+from dynamo_ops import DynamoDBOps
+from fetch_state import get_fetch_state_store
+from seen_filter import SeenFilterStore
 
 import logging
 
@@ -8,27 +18,172 @@ import logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Fetch state key holding the resume cursor of an unfinished fetch run
+CURSOR_KEY = 'cursor#fetch'
+
 def handler(event, context):
     logger.info("Starting FetchFeedFunction")
-    dynamodb = boto3.resource('dynamodb')
-    config_table_name = os.environ.get('CONFIG_TABLE_NAME', 'FeedConfigurations')
-    config_table = dynamodb.Table(config_table_name)
-    
-    # Scan all feeds
-    logger.info(f"Scanning config table: {config_table_name}")
-    response = config_table.scan()
-    feeds = response.get('Items', [])
-    
+    http_client.reset_stats()
+    db_ops = DynamoDBOps()
+
+    # All feed configs, paged through once and cached across warm invocations
+    feeds = load_config_snapshot(db_ops)
+
     logger.info(f"Found {len(feeds)} feeds to process.")
 
+    seen_filter_store = None
+    seen_filter = None
+    if os.environ.get('SEEN_FILTER_BUCKET'):
+        seen_filter_store = SeenFilterStore(db_ops)
+        seen_filter = seen_filter_store.load()
+
+    totals, complete = fetch_feeds(feeds, context, get_fetch_state_store(db_ops), seen_filter, db_ops,
+                                   seen_filter_store)
+
+    if not complete:
+        continue_in_new_invocation(event or {}, context)
+    if totals.get('new_items'):
+        if os.environ.get('FETCH_ENRICH_INLINE') == '1':
+            enrich_new_items(feeds, context, db_ops)
+        else:
+            start_enrichment()
+
+    logger.info(f"Fetch stats: {totals}")
+    logger.info(f"HTTP stats: {http_client.stats()}")
+    logger.info("FetchFeedFunction complete")
+    return {"statusCode": 200, "body": "Fetch complete" if complete else "Fetch paused",
+            "stats": totals}
+
+def fetch_feeds(feeds, context, cursor_store, seen_filter=None, db_ops=None, seen_filter_store=None):
+    """
+    Fetch every feed (FeedConfig) not yet done in the current run, within
+    the Lambda's remaining time.
+
+    Each feed gets at most FETCH_FEED_TIME_BUDGET seconds, and nothing new is
+    started once less than FETCH_DEADLINE_MARGIN seconds remain. Progress is
+    saved after each feed as a cursor (feeds done, URLs done in unfinished
+    feeds), which the next invocation resumes from unless the run started
+    more than FETCH_CURSOR_MAX_AGE seconds ago. An abandoned run's
+    leftover feeds go first in the new run, so feeds at the end of the
+    list are not starved by runs that never finish. So is the seen
+    filter when `seen_filter_store` is given and the feed added URLs to it.
+    Returns (stats totals, whether every feed is done).
+    """
+    cursor = cursor_store.get(CURSOR_KEY)
+    if cursor_expired(cursor):
+        leftover = [feed.feed_id for feed in feeds if feed.feed_id not in cursor.get('done_feeds', [])]
+        logger.warning(f"Abandoning the fetch run started at {cursor['started_at']}, "
+                       f"starting a new one with its {len(leftover)} leftover feeds first")
+        cursor = {'first_feeds': leftover}
+    done_feeds = list(cursor.get('done_feeds', []))
+    partial = dict(cursor.get('partial', {}))
+    first_feeds = list(cursor.get('first_feeds', []))
+    if done_feeds or partial:
+        logger.info(f"Resuming fetch run started at {cursor.get('started_at')}: "
+                    f"{len(done_feeds)} feeds already done")
+    started_at = cursor.get('started_at') or datetime.now().isoformat()
+    if first_feeds:
+        feeds = sorted(feeds, key=lambda feed: feed.feed_id not in first_feeds)
+
+    totals = {}
+    complete = True
+    filter_count = seen_filter.count if seen_filter is not None else 0
     for feed in feeds:
-        feed_id = feed['feed_id']
+        feed_id = feed.feed_id
+        if feed_id in done_feeds:
+            continue
+
+        remaining = context.get_remaining_time_in_millis() / 1000 - config.FETCH_DEADLINE_MARGIN
+        if remaining < config.FETCH_MIN_FEED_TIME:
+            logger.warning(f"Stopping before the Lambda deadline, {feed_id} and later feeds deferred")
+            complete = False
+            break
+
         logger.info(f"Processing feed_id: {feed_id}")
+        deadline = time.monotonic() + min(remaining, config.FETCH_FEED_TIME_BUDGET)
+        skip_urls = partial.get(feed_id, [])
         try:
-            helper = FeedSetHelper(feed_id)
-            helper.get_pages_from_feeds()
+            helper = FeedSetHelper(feed_id, feed_config=feed, seen_filter=seen_filter, db_ops=db_ops)
+            stats = helper.get_pages_from_feeds(deadline=deadline, skip_urls=skip_urls)
+            for key, value in stats.items():
+                totals[key] = totals.get(key, 0) + value
         except Exception as e:
             logger.error(f"Error processing feed {feed_id}: {e}", exc_info=True)
-            
-    logger.info("FetchFeedFunction complete")
-    return {"statusCode": 200, "body": "Fetch complete"}
+            stats = {'deferred': 0}
+
+        if stats['deferred']:
+            # Out of time for this feed, its remaining URLs go first next time
+            partial[feed_id] = list(skip_urls) + helper.done_urls
+            complete = False
+        else:
+            partial.pop(feed_id, None)
+            done_feeds.append(feed_id)
+        if seen_filter_store is not None and seen_filter.count != filter_count:
+            seen_filter_store.save(seen_filter)
+            filter_count = seen_filter.count
+        cursor_store.put(CURSOR_KEY, {'started_at': started_at, 'done_feeds': done_feeds,
+                                      'partial': partial, 'first_feeds': first_feeds})
+
+    if complete:
+        # Run finished, the next invocation starts from scratch
+        cursor_store.put(CURSOR_KEY, {})
+    return totals, complete
+
+def cursor_expired(cursor, now=None):
+    """
+    Whether a resume cursor belongs to a run older than FETCH_CURSOR_MAX_AGE.
+    """
+    started_at = cursor.get('started_at')
+    if not started_at:
+        return False
+    try:
+        age = ((now or datetime.now()) - datetime.fromisoformat(started_at)).total_seconds()
+    except ValueError:
+        return True
+    return age > config.FETCH_CURSOR_MAX_AGE
+
+def continue_in_new_invocation(event, context):
+    """
+    Invoke this function again asynchronously to resume from the cursor,
+    up to FETCH_MAX_CONTINUATIONS times in a row.
+    """
+    continuation = event.get('continuation', 0) + 1
+    if os.environ.get('FETCH_SELF_CONTINUE') != '1' or continuation > config.FETCH_MAX_CONTINUATIONS:
+        logger.info("Fetch run paused until the next scheduled invocation")
+        return
+    logger.info(f"Fetch run paused, starting continuation {continuation}")
+    clients.client('lambda').invoke(
+        FunctionName=context.invoked_function_arn,
+        InvocationType='Event',
+        Payload=json.dumps({'continuation': continuation}),
+    )
+
+def enrich_new_items(feeds, context, db_ops):
+    """
+    Enrich the items just stored in this invocation (FETCH_ENRICH_INLINE),
+    with ENRICH_WORKERS worker processes, instead of invoking the enrichment
+    function.
+    """
+    from extraction_memo import get_extraction_memo
+    from lambda_enrich import enrich_feeds
+    from page_cache import get_page_cache, reset_page_cache
+    from summary_cache import get_summary_cache
+    logger.info(f"Enriching new items with {config.ENRICH_WORKERS} workers")
+    reset_page_cache()
+    totals, timings = enrich_feeds(feeds, context, db_ops)
+    logger.info(f"Enrich stats: {totals}")
+    logger.info(f"Stage timings (ms): {timings}")
+    logger.info(f"Summary cache: {get_summary_cache().stats()}")
+    logger.info(f"Page cache: {get_page_cache().stats()}")
+    logger.info(f"Extraction: {get_extraction_memo().stats()}")
+
+def start_enrichment():
+    """
+    Invoke the enrichment function asynchronously over the items just
+    stored, when ENRICH_FUNCTION_NAME is set.
+    """
+    function_name = os.environ.get('ENRICH_FUNCTION_NAME')
+    if not function_name:
+        return
+    logger.info(f"Starting enrichment ({function_name})")
+    clients.client('lambda').invoke(FunctionName=function_name, InvocationType='Event', Payload=json.dumps({}))
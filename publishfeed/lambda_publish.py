@@ -1,24 +1,41 @@
-import boto3
-import os
+import http_client
+from config_loader import ConfigLoader, ssm_calls
+from config_snapshot import load_config_snapshot
+from dynamo_ops import DynamoDBOps
+from enrichment import add_timings
+from extraction_memo import get_extraction_memo
 from helpers import RSSContentHelper
+from page_cache import get_page_cache, reset_page_cache
+from summary_cache import get_summary_cache
 
 def handler(event, context):
-    dynamodb = boto3.resource('dynamodb')
-    config_table_name = os.environ.get('CONFIG_TABLE_NAME', 'FeedConfigurations')
-    config_table = dynamodb.Table(config_table_name)
-    
-    response = config_table.scan()
-    feeds = response.get('Items', [])
+    http_client.reset_stats()
+    reset_page_cache()
+    # All feed configs, paged through once and cached across warm invocations
+    db_ops = DynamoDBOps()
+    feeds = load_config_snapshot(db_ops)
     
     print(f"Found {len(feeds)} feeds to process.")
 
+    # Every secret the run needs, in a few batched SSM calls (none while cached)
+    ssm_calls_before = ssm_calls()
+    ConfigLoader(db_ops).prefetch_secrets([feed.feed_id for feed in feeds])
+
+    timings = {}
     for feed in feeds:
-        feed_id = feed['feed_id']
+        feed_id = feed.feed_id
         print(f"Publishing feed: {feed_id}")
         try:
-            helper = RSSContentHelper(feed_id)
+            helper = RSSContentHelper(feed_id, feed_config=feed, db_ops=db_ops)
             helper.tweet_rsscontent()
+            add_timings(timings, helper.timings)
         except Exception as e:
             print(f"Error publishing feed {feed_id}: {e}")
         
+    print(f"Stage timings (ms): {timings}")
+    print(f"Summary cache: {get_summary_cache().stats()}")
+    print(f"Page cache: {get_page_cache().stats()}")
+    print(f"Extraction: {get_extraction_memo().stats()}")
+    print(f"HTTP stats: {http_client.stats()}")
+    print(f"SSM calls: {ssm_calls() - ssm_calls_before}")
     return {"statusCode": 200, "body": "Publish complete"}
@@ -0,0 +1,212 @@
+"""
+LLM client: chat completions sent concurrently under requests-per-minute
+and tokens-per-minute limits, with a deadline per request and retries
+with jittered exponential backoff.
+
+The provider does the actual call and is pluggable: OpenAIChatProvider
+posts to an OpenAI compatible /chat/completions endpoint (LLM_API_BASE)
+through the shared HTTP client, so a local stub server is enough to test
+it. Summarization on top of it lives in llm_helpers.summarize_many.
+"""
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import config
+import http_client
+from condense import estimate_tokens
+
+
+class LLMError(Exception):
+    """
+    Raised when a completion fails. `retryable` tells transient errors
+    (timeouts, 429, 5xx) from permanent ones.
+    """
+    def __init__(self, message, retryable=False, retry_after=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class LLMAuthError(LLMError):
+    """
+    Raised when the provider rejects the API key.
+    """
+
+
+class DeadlineExceeded(LLMError):
+    """
+    Raised when a request cannot complete before its deadline.
+    """
+
+
+def parse_retry_after(value):
+    """
+    Seconds to wait from a Retry-After header, given either as seconds or as
+    an HTTP-date. None when the header is missing or unparseable.
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+        return max(seconds, 0.0) if math.isfinite(seconds) else None
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class OpenAIChatProvider:
+    """
+    Chat completions over HTTP. `api_key` is a callable returning the key,
+    so it can be read lazily and again after a rejection.
+    """
+    def __init__(self, api_key, model=None, api_base=None):
+        self.api_key = api_key
+        self.model = model or config.LLM_MODEL
+        self.api_base = (api_base or config.LLM_API_BASE).rstrip('/')
+
+    def complete(self, prompt, max_tokens, timeout, temperature=0.8):
+        key = self.api_key()
+        if not key:
+            raise LLMAuthError("No API key")
+        try:
+            response = http_client.post(
+                f"{self.api_base}/chat/completions",
+                headers={"Authorization": f"Bearer {key}"},
+                json={
+                    "model": self.model,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                },
+                timeout=(min(config.HTTP_CONNECT_TIMEOUT, timeout), timeout),
+            )
+        except http_client.REQUEST_ERRORS as e:
+            raise LLMError(f"Request failed: {e}", retryable=True)
+
+        if response.status_code == 401:
+            raise LLMAuthError(f"API key rejected: {response.text[:200]}")
+        if response.status_code == 429 or response.status_code >= 500:
+            raise LLMError(f"HTTP {response.status_code}: {response.text[:200]}", retryable=True,
+                           retry_after=parse_retry_after(response.headers.get('Retry-After')))
+        if response.status_code != 200:
+            raise LLMError(f"HTTP {response.status_code}: {response.text[:200]}")
+        try:
+            return response.json()["choices"][0]["message"]["content"].strip()
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise LLMError(f"Unexpected response: {e}")
+
+
+class RateLimiter:
+    """
+    Token buckets for requests and tokens per minute, each starting full
+    and refilling continuously.
+    """
+    def __init__(self, rpm, tpm):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = float(rpm)
+        self.tokens = float(tpm)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens, deadline=None):
+        """
+        Wait until a request of `tokens` tokens is allowed, raising
+        DeadlineExceeded if that would be after `deadline`.
+        """
+        tokens = min(tokens, self.tpm)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                elapsed = now - self.updated
+                self.updated = now
+                self.requests = min(self.rpm, self.requests + elapsed * self.rpm / 60)
+                self.tokens = min(self.tpm, self.tokens + elapsed * self.tpm / 60)
+                if self.requests >= 1 and self.tokens >= tokens:
+                    self.requests -= 1
+                    self.tokens -= tokens
+                    return
+                wait = max((1 - self.requests) * 60 / self.rpm, (tokens - self.tokens) * 60 / self.tpm, 0.001)
+            if deadline is not None and now + wait > deadline:
+                raise DeadlineExceeded(f"Rate limit wait of {wait:.1f}s is past the deadline")
+            time.sleep(wait)
+
+
+class LLMClient:
+    def __init__(self, provider, rpm=None, tpm=None, max_concurrency=None,
+                 request_deadline=None, max_attempts=None):
+        self.provider = provider
+        self.limiter = RateLimiter(rpm or config.LLM_RPM, tpm or config.LLM_TPM)
+        self.max_concurrency = max_concurrency or config.LLM_MAX_CONCURRENCY
+        self.request_deadline = request_deadline or config.LLM_REQUEST_DEADLINE
+        self.max_attempts = max_attempts or config.LLM_MAX_ATTEMPTS
+        self.lock = threading.Lock()
+        self.counters = {'requests': 0, 'retries': 0, 'failures': 0}
+
+    def complete(self, prompt, max_tokens=250, deadline=None):
+        """
+        Return the completion of `prompt`, retrying transient errors until
+        LLM_REQUEST_DEADLINE seconds have passed (or `deadline`, a
+        time.monotonic() value, if sooner).
+        """
+        request_deadline = time.monotonic() + self.request_deadline
+        deadline = min(deadline, request_deadline) if deadline is not None else request_deadline
+        tokens = estimate_tokens(prompt) + max_tokens
+        for attempt in range(self.max_attempts):
+            self.limiter.acquire(tokens, deadline)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded("Deadline passed before the request was sent")
+            self._count('requests')
+            try:
+                return self.provider.complete(prompt, max_tokens, timeout=remaining)
+            except LLMError as e:
+                if not e.retryable or attempt == self.max_attempts - 1:
+                    self._count('failures')
+                    raise
+                # Full jitter, unless the provider said how long to wait
+                backoff = e.retry_after or random.uniform(0, min(config.LLM_BACKOFF_CAP, config.LLM_BACKOFF_BASE * 2 ** attempt))
+                if time.monotonic() + backoff > deadline:
+                    self._count('failures')
+                    raise DeadlineExceeded(f"No time left to retry: {e}")
+                self._count('retries')
+                time.sleep(backoff)
+            except Exception as e:
+                self._count('failures')
+                raise LLMError(f"Provider error: {e}") from e
+
+    def complete_many(self, prompts, max_tokens=250, deadline=None):
+        """
+        Complete every prompt concurrently (up to LLM_MAX_CONCURRENCY at a
+        time). Returns a list, in order, of completions or the LLMError
+        each one failed with.
+        """
+        def run(prompt):
+            try:
+                return self.complete(prompt, max_tokens, deadline)
+            except LLMError as e:
+                return e
+
+        if len(prompts) <= 1:
+            return [run(prompt) for prompt in prompts]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(prompts))) as executor:
+            return list(executor.map(run, prompts))
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters)
+
+    def _count(self, name):
+        with self.lock:
+            self.counters[name] += 1
@@ -1,15 +1,44 @@
 import logging
 import os
-import random
 import time
 from urllib.parse import urlparse
 
 import newspaper
 import openai
-import requests
 from bs4 import BeautifulSoup
 from newspaper import Config, settings
 
+import clients
+import config
+import http_client
+from condense import condense
+from extraction_memo import domain_of, get_extraction_memo
+from html_text import extract_text
+from llm_client import LLMAuthError
+from page_cache import fetch_page, get_page_cache
+from summary_cache import get_summary_cache, summary_key
+
+# Bump whenever SUMMARY_PROMPT changes, so cached summaries of the old prompt are not reused
+SUMMARY_PROMPT_VERSION = "1"
+SUMMARY_PROMPT = """Create a concise, engaging social media post (max 250 characters) summarizing the key insight of this article.
+
+CRITICAL INSTRUCTIONS:
+- START IMMEDIATELY with the insight or fact.
+- BANNED STARTING PHRASES: "Exciting news!", "Just announced", "Check this out", "Thrilled to share".
+- NO MARKETING FLUFF. Go straight to the point.
+- STRICTLY FORBIDDEN: First-person pronouns (I, we, my, our, mine, us).
+- Tone: Casual but professional/technical.
+- HARD LIMIT: Under 250 characters total.
+
+INCLUDES:
+- 2-4 relevant emojis.
+- Relevant hashtags (e.g., #AI, #Tech, #Cloud, #DevOps, etc.).
+
+FORMAT: [Summary] [Emojis] [Hashtags]
+
+Article content:
+{text}"""
+
 
 def load_openai_key():
     """Load OpenAI API key from file or environment variable."""
@@ -24,22 +53,53 @@ def load_openai_key():
     if env_key:
         return env_key
 
-    # Last resort: Try SSM Parameter Store (for Lambda)
+    # Last resort: Try SSM Parameter Store (for Lambda), through the secrets cache
     try:
-        import boto3
-        ssm = boto3.client('ssm')
-        parameter_name = "/rss-feed/global/openai_key"
-        response = ssm.get_parameter(Name=parameter_name, WithDecryption=True)
-        return response['Parameter']['Value']
+        from config_loader import ConfigLoader
+        return ConfigLoader().load_openai_key()
     except Exception as e:
         # logging.warning(f"Could not load OpenAI key from SSM: {e}")
         return None
 
 
-openai.api_key = load_openai_key()
+def _ensure_openai_key():
+    """Load the OpenAI key on first use rather than at import time."""
+    if not openai.api_key:
+        openai.api_key = load_openai_key()
+    return openai.api_key
+
+
+def _invalidate_openai_key():
+    """Forget a rejected key so the next call reads it again."""
+    from config_loader import OPENAI_PARAMETER, ConfigLoader
+    openai.api_key = None
+    ConfigLoader().invalidate_secrets(OPENAI_PARAMETER)
+
+
+def _download_article(url, config):
+    """
+    Parse a newspaper Article from the page cache (downloaded on first use).
+    """
+    page = fetch_page(
+        url,
+        headers={"User-Agent": config.browser_user_agent},
+        timeout=config.request_timeout,
+    )
+    page.raise_for_status()
+    article = newspaper.Article(url, config=config)
+    article.download(input_html=page.text)
+    article.parse()
+    return article
+
 
+def _timeout(deadline, limit):
+    """Seconds a request may take: `limit`, or less if the deadline is closer."""
+    if deadline is None:
+        return limit
+    return max(min(limit, deadline - time.monotonic()), 0.1)
 
-def _extract_with_advanced_requests(url):
+
+def _extract_with_advanced_requests(url, deadline=None):
     """Advanced fallback extraction with sophisticated bot evasion."""
     strategies = [
         # Strategy 1: Simulate coming from Google
@@ -60,7 +120,6 @@ def _extract_with_advanced_requests(url):
                 "Upgrade-Insecure-Requests": "1",
                 "Cache-Control": "max-age=0",
             },
-            "delay": random.uniform(2, 4),
         },
         # Strategy 2: Simulate coming from social media
         {
@@ -75,7 +134,6 @@ def _extract_with_advanced_requests(url):
                 "Sec-Fetch-Site": "cross-site",
                 "Upgrade-Insecure-Requests": "1",
             },
-            "delay": random.uniform(1, 3),
         },
         # Strategy 3: Mobile browser simulation
         {
@@ -89,7 +147,6 @@ def _extract_with_advanced_requests(url):
                 "Sec-Fetch-Mode": "navigate",
                 "Sec-Fetch-Site": "cross-site",
             },
-            "delay": random.uniform(1.5, 3.5),
         },
         # Strategy 4: Firefox with different approach
         {
@@ -104,91 +161,41 @@ def _extract_with_advanced_requests(url):
                 "Sec-Fetch-Site": "cross-site",
                 "Upgrade-Insecure-Requests": "1",
             },
-            "delay": random.uniform(2, 5),
         },
     ]
 
+    visited_homepage = False
     for i, strategy in enumerate(strategies):
+        if deadline is not None and time.monotonic() >= deadline:
+            break
         try:
             logging.info("Trying advanced request strategy %d", i + 1)
 
-            # Random delay to appear human
-            time.sleep(strategy["delay"])
-
-            session = requests.Session()
-
-            # First, visit the homepage to get cookies
-            parsed_url = urlparse(url)
-            homepage = f"{parsed_url.scheme}://{parsed_url.netloc}"
+            # A page already downloaded (e.g. by newspaper) is parsed as is
+            cached = get_page_cache().get(url)
+            if cached is None and not visited_homepage:
+                # First, visit the homepage to get cookies (kept by the shared session)
+                visited_homepage = True
+                parsed_url = urlparse(url)
+                homepage = f"{parsed_url.scheme}://{parsed_url.netloc}"
 
-            try:
-                session.get(homepage, headers=strategy["headers"], timeout=10)
-                time.sleep(random.uniform(0.5, 1.5))
-            except:
-                pass  # Continue even if homepage visit fails
+                try:
+                    http_client.get(homepage, headers=strategy["headers"], timeout=_timeout(deadline, 10))
+                except:
+                    pass  # Continue even if homepage visit fails
 
             # Now get the actual page
-            response = session.get(
-                url, headers=strategy["headers"], timeout=20, allow_redirects=True
-            )
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            # Remove unwanted elements
-            for element in soup(
-                [
-                    "script",
-                    "style",
-                    "nav",
-                    "header",
-                    "footer",
-                    "aside",
-                    "iframe",
-                    "noscript",
-                ]
-            ):
-                element.decompose()
-
-            # Try to find main content areas
-            content_selectors = [
-                "article",
-                '[role="main"]',
-                "main",
-                ".content",
-                ".post-content",
-                ".entry-content",
-                ".article-content",
-                ".post-body",
-                ".story-body",
-                ".post",
-                ".entry",
-                ".article",
-                ".blog-post",
-                ".single-post",
-            ]
+            page = cached or fetch_page(url, headers=strategy["headers"], timeout=_timeout(deadline, 20))
+            page.raise_for_status()
 
-            text = ""
-            for selector in content_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    text = " ".join([elem.get_text(strip=True) for elem in elements])
-                    if len(text) > 200:
-                        break
-
-            # Fallback to body if no specific content found
-            if not text or len(text) < 200:
-                body = soup.find("body")
-                if body:
-                    text = body.get_text(strip=True)
-
-            # Clean up the text
-            lines = [line.strip() for line in text.split("\n") if line.strip()]
-            text = " ".join(lines)
+            text = extract_text(page.content)
 
             if len(text) > 100:
                 logging.info("Successfully extracted with advanced strategy %d", i + 1)
                 return text
+            if cached is not None:
+                # The other strategies would parse the same page
+                break
 
         except Exception as e:
             logging.warning("Advanced strategy %d failed: %s", i + 1, str(e))
@@ -197,74 +204,122 @@ def _extract_with_advanced_requests(url):
     return ""
 
 
-def _extract_with_requests(url):
-    """Fallback extraction using requests and BeautifulSoup."""
-    return _extract_with_advanced_requests(url)
-
-
-def extract_article_text(url):
-    """Extract article text from URL with multiple fallback strategies."""
-    user_agents = [
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/121.0",
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15",
-    ]
+def _extract_with_requests(url, deadline=None):
+    """Fallback extraction using requests and the lxml extractor."""
+    return _extract_with_advanced_requests(url, deadline)
 
-    # First try newspaper with different user agents
-    for i, user_agent in enumerate(user_agents):
-        try:
-            config = Config()
-            config.browser_user_agent = user_agent
-            config.request_timeout = 10
-            config.number_threads = 1
 
-            article = newspaper.Article(url, config=config)
-            article.download()
-            article.parse()
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15",
+]
 
-            if article.text and len(article.text.strip()) > 100:
-                logging.info(
-                    "Successfully extracted article with newspaper (user agent %d)",
-                    i + 1,
-                )
-                return article.text
 
-            logging.warning("Article text too short or empty with user agent %d", i + 1)
+def _extract_with_newspaper(url, deadline=None):
+    """Extract article text with newspaper, trying other user agents while the download fails."""
+    for i, user_agent in enumerate(USER_AGENTS):
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        try:
+            newspaper_config = Config()
+            newspaper_config.browser_user_agent = user_agent
+            newspaper_config.request_timeout = _timeout(deadline, 10)
+            newspaper_config.number_threads = 1
 
+            article = _download_article(url, newspaper_config)
         except Exception as e:
             logging.warning(
                 "Failed to extract article with user agent %d: %s", i + 1, str(e)
             )
             continue
 
-    # Fallback to advanced requests + BeautifulSoup
-    logging.info("Trying advanced requests fallback for URL: %s", url)
-    text = _extract_with_requests(url)
-    if text:
-        logging.info("Successfully extracted article with advanced requests fallback")
-        return text
+        if article.text and len(article.text.strip()) > 100:
+            logging.info(
+                "Successfully extracted article with newspaper (user agent %d)",
+                i + 1,
+            )
+            return article.text
+
+        # The page was downloaded, other user agents would parse the same bytes
+        logging.warning("Article text too short or empty with user agent %d", i + 1)
+        break
+    return ""
+
+
+BROWSER_HEADERS = {
+    "User-Agent": USER_AGENTS[0],
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def _extract_with_lxml(url, deadline=None):
+    """Extract article text with a single lxml parse of the page (see html_text.py)."""
+    page = fetch_page(url, headers=BROWSER_HEADERS, timeout=_timeout(deadline, 10))
+    page.raise_for_status()
+    text = extract_text(page.content)
+    return text if len(text) > 100 else ""
 
-    # Final fallback: Try with minimal curl-like request
-    logging.info("Trying minimal curl-like request for URL: %s", url)
-    try:
-        response = requests.get(
-            url, headers={"User-Agent": "curl/7.68.0"}, timeout=10, allow_redirects=True
-        )
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, "html.parser")
-            text = soup.get_text(strip=True)
-            if len(text) > 100:
-                logging.info("Successfully extracted with curl-like request")
-                return text
-    except Exception as e:
-        logging.warning("Curl-like request failed: %s", str(e))
 
-    logging.error("All extraction attempts failed for URL: %s", url)
+def _extract_with_curl(url, deadline=None):
+    """Minimal curl-like request, keeping all the text of the page."""
+    page = fetch_page(url, headers={"User-Agent": "curl/7.68.0"}, timeout=_timeout(deadline, 10))
+    if page.ok:
+        soup = BeautifulSoup(page.content, "html.parser")
+        text = soup.get_text(strip=True)
+        if len(text) > 100:
+            return text
     return ""
 
 
+# Default order; each domain tries the one that last worked for it first (see extraction_memo.py)
+EXTRACTION_STRATEGIES = {
+    "lxml": _extract_with_lxml,
+    "newspaper": _extract_with_newspaper,
+    "advanced": _extract_with_advanced_requests,
+    "curl": _extract_with_curl,
+}
+
+
+def extract_article_text(url, deadline=None):
+    """Extract article text from URL with multiple fallback strategies.
+
+    Strategies are tried in the order the extraction memo gives for the
+    URL's domain, within EXTRACT_DEADLINE seconds (or `deadline`, a
+    time.monotonic() value, if sooner). Returns "" if none worked.
+    """
+    article_deadline = time.monotonic() + config.EXTRACT_DEADLINE
+    deadline = min(deadline, article_deadline) if deadline is not None else article_deadline
+    memo = get_extraction_memo()
+    domain = domain_of(url)
+
+    attempts = []
+    text = ""
+    for name in memo.order(domain, list(EXTRACTION_STRATEGIES)):
+        if time.monotonic() >= deadline:
+            logging.warning("Extraction deadline reached for URL: %s", url)
+            break
+        logging.info("Trying %s extraction for URL: %s", name, url)
+        started = time.perf_counter()
+        try:
+            text = EXTRACTION_STRATEGIES[name](url, deadline)
+        except Exception as e:
+            logging.warning("%s extraction failed: %s", name, str(e))
+            text = ""
+        attempts.append((name, bool(text), (time.perf_counter() - started) * 1000))
+        if text:
+            logging.info("Successfully extracted article with %s", name)
+            break
+    memo.record(domain, attempts)
+
+    if not text:
+        logging.error("All extraction attempts failed for URL: %s", url)
+    return text
+
+
 def extract_article_summary(url):
     """Extract article summary from URL with multiple fallback strategies."""
     user_agents = [
@@ -283,9 +338,7 @@ def extract_article_summary(url):
             config.request_timeout = 10
             config.number_threads = 1
 
-            article = newspaper.Article(url, config=config)
-            article.download()
-            article.parse()
+            article = _download_article(url, config)
             article.nlp()
 
             if article.summary and len(article.summary.strip()) > 50:
@@ -296,6 +349,8 @@ def extract_article_summary(url):
                 return article.summary
 
             logging.warning("Summary too short or empty with user agent %d", i + 1)
+            # The page was downloaded, other user agents would parse the same bytes
+            break
 
         except Exception as e:
             logging.warning(
@@ -304,8 +359,13 @@ def extract_article_summary(url):
             continue
 
     # Fallback: extract full text and create summary from first few sentences
-    logging.info("Trying advanced text extraction fallback for summary")
-    text = _extract_with_requests(url)
+    logging.info("Trying lxml and advanced text extraction fallback for summary")
+    try:
+        text = _extract_with_lxml(url)
+    except Exception as e:
+        logging.warning("lxml extraction for summary failed: %s", str(e))
+        text = ""
+    text = text or _extract_with_requests(url)
     if text:
         # Create a simple summary from first 3 sentences
         sentences = text.split(". ")[:3]
@@ -317,18 +377,13 @@ def extract_article_summary(url):
     # Final fallback for summary
     logging.info("Trying minimal request for summary")
     try:
-        response = requests.get(
-            url, headers={"User-Agent": "curl/7.68.0"}, timeout=10, allow_redirects=True
-        )
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, "html.parser")
-            text = soup.get_text(strip=True)
-            if len(text) > 100:
-                sentences = text.split(". ")[:3]
-                summary = ". ".join(sentences)
-                if len(summary) > 50:
-                    logging.info("Successfully created summary with minimal request")
-                    return summary
+        text = _extract_with_curl(url)
+        if text:
+            sentences = text.split(". ")[:3]
+            summary = ". ".join(sentences)
+            if len(summary) > 50:
+                logging.info("Successfully created summary with minimal request")
+                return summary
     except Exception as e:
         logging.warning("Minimal request for summary failed: %s", str(e))
 
@@ -336,43 +391,59 @@ def extract_article_summary(url):
     return ""
 
 
-def summarize_text(text, max_tokens=250):
+def summarize_text(text, max_tokens=250, title=""):
     """Summarize article text for social media with CTAs, emojis, and hashtags."""
-    if not text:
-        return ""
-
-    try:
-        prompt = """Create a concise, engaging social media post (max 250 characters) summarizing the key insight of this article.
-
-CRITICAL INSTRUCTIONS:
-- START IMMEDIATELY with the insight or fact.
-- BANNED STARTING PHRASES: "Exciting news!", "Just announced", "Check this out", "Thrilled to share".
-- NO MARKETING FLUFF. Go straight to the point.
-- STRICTLY FORBIDDEN: First-person pronouns (I, we, my, our, mine, us).
-- Tone: Casual but professional/technical.
-- HARD LIMIT: Under 250 characters total.
-
-INCLUDES:
-- 2-4 relevant emojis.
-- Relevant hashtags (e.g., #AI, #Tech, #Cloud, #DevOps, etc.).
-
-FORMAT: [Summary] [Emojis] [Hashtags]
-
-Article content:
-{text}"""
-
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt.format(text=text),
-                }
-            ],
-            temperature=0.8,
-            max_tokens=max_tokens,
-        )
-        return response["choices"][0]["message"]["content"].strip()
-    except Exception as e:
-        logging.error("LLM summarization failed: %s", str(e))
-        return ""
+    return summarize_many([text], [title], max_tokens)[0]
+
+
+def summarize_many(texts, titles=None, max_tokens=250, deadline=None):
+    """Summarize several articles at once, returning the summaries in order.
+
+    Summaries are cached by the full text and title (see summary_cache.py).
+    Only the misses are condensed to LLM_INPUT_TOKEN_BUDGET tokens, favouring
+    the lead, headings and sentences close to the title (see condense.py),
+    and sent to the LLM client concurrently, within its rate limits and
+    `deadline` (a time.monotonic() value). Failed summaries are '' and not
+    cached.
+    """
+    titles = titles or [""] * len(texts)
+    client = clients.llm()
+    model = client.provider.model
+    # The condensing budget changes the prompt as much as the prompt text
+    prompt_version = f"{SUMMARY_PROMPT_VERSION}/{config.LLM_INPUT_TOKEN_BUDGET}"
+    cache = get_summary_cache()
+
+    summaries = [""] * len(texts)
+    misses = {} # cache key -> (prompt, indexes of the texts it summarizes)
+    for index, (text, title) in enumerate(zip(texts, titles)):
+        if not text:
+            continue
+        key = summary_key(text, prompt_version, model, title)
+        if key in misses:
+            misses[key][1].append(index)
+            continue
+        summary = cache.get(key)
+        if summary is not None:
+            summaries[index] = summary
+        else:
+            misses[key] = (SUMMARY_PROMPT.format(text=condense(text, title)), [index])
+    if not misses:
+        return summaries
+
+    results = client.complete_many([prompt for prompt, _ in misses.values()], max_tokens, deadline)
+    rejected = False
+    for (key, (_, indexes)), result in zip(misses.items(), results):
+        if isinstance(result, LLMAuthError):
+            rejected = True
+            continue
+        if isinstance(result, Exception):
+            logging.error("LLM summarization failed: %s", str(result))
+            continue
+        if result:
+            cache.put(key, result, model, prompt_version)
+        for index in indexes:
+            summaries[index] = result
+    if rejected:
+        logging.error("LLM summarization failed: no OpenAI key, or the key was rejected")
+        _invalidate_openai_key()
+    return summaries
@@ -1,10 +1,10 @@
-import os
-import urllib.request
 from urllib.parse import urljoin, urlparse
 
 import opengraph_py3
-import requests
+
+import http_client
 from ln_oauth import ln_auth, ln_headers
+from page_cache import fetch_page
 
 # credentials = '/home/ubuntu/publishfeed/publishfeed/ln_credentials.json'
 # access_token = ln_auth(credentials)  # Authenticate the API
@@ -15,11 +15,45 @@ def ln_user_info(headers):
     '''
     Get user information from Linkedin
     '''
-    response = requests.get('https://api.linkedin.com/v2/me', headers=headers)
+    response = http_client.get('https://api.linkedin.com/v2/me', headers=headers)
     user_info = response.json()
     return user_info
 
 
+class LinkedInAuthError(Exception):
+    """
+    Raised when LinkedIn rejects the access token.
+    """
+
+
+class LinkedIn:
+    """
+    LinkedIn member client: headers and author URN for one access token.
+    The author is looked up once, on the first post.
+    """
+    api_url = "https://api.linkedin.com/rest/posts"
+
+    def __init__(self, access_token):
+        self.headers = ln_headers(access_token)
+        self._author = None
+
+    @property
+    def author(self):
+        if self._author is None:
+            user_info = ln_user_info(self.headers)
+            if 'id' not in user_info:
+                raise LinkedInAuthError(f"User info lookup failed: {user_info}")
+            self._author = f"urn:li:person:{user_info['id']}"
+        return self._author
+
+    def post(self, title, link, text, thumbnail_url=None):
+        response = post_2_linkedin_new(title, link, text, self.author, self.api_url, dict(self.headers),
+                                       thumbnail_url)
+        if response.status_code == 401:
+            raise LinkedInAuthError(f"Post rejected: {response.text}")
+        return response
+
+
 def post_2_linkedin(message, link, link_text, author, api_url, headers):
     #asset = upload_image_linkdin(link, author, headers)
     #print(asset)
@@ -52,7 +86,7 @@ def post_2_linkedin(message, link, link_text, author, api_url, headers):
         }
     }
     print(post_data)
-    r = requests.post(api_url, headers=headers, json=post_data)
+    r = http_client.post(api_url, headers=headers, json=post_data)
     r.json()
     print(r)
 
@@ -83,12 +117,14 @@ def post_2_linkedin_legacy(message, link, link_text, author, api_url, headers):
             'text': link_text
         }
     }
-    r = requests.post(api_url, headers=headers, json=payload)
+    r = http_client.post(api_url, headers=headers, json=payload)
     r.json()
     print(r)
 
-def post_2_linkedin_new(message, link, link_text, author, api_url, headers):
-    thumbnail_url = custom_get_img_from_link(link)
+def post_2_linkedin_new(message, link, link_text, author, api_url, headers, thumbnail_url=None):
+    # The enrichment stage looks the thumbnail up beforehand ('' when there is none)
+    if thumbnail_url is None:
+        thumbnail_url = custom_get_img_from_link(link)
     image_urn = None
 
     if thumbnail_url:
@@ -123,7 +159,7 @@ def post_2_linkedin_new(message, link, link_text, author, api_url, headers):
 
     headers["Linkedin-Version"] = "202505"
 
-    response = requests.post(
+    response = http_client.post(
             api_url, 
             headers=headers, 
             json=post_data
@@ -131,10 +167,12 @@ def post_2_linkedin_new(message, link, link_text, author, api_url, headers):
 
     print("LinkedIn post status:", response.status_code)
     print(response.text)
+    return response
 
 def get_image_url_from_link(link):
     image_url = ""
-    og_link = opengraph_py3.OpenGraph(url=link)
+    r = fetch_page(link)
+    og_link = opengraph_py3.OpenGraph(html=r.content)
 
     for key, value in og_link.items():
         if key == "image":
@@ -146,12 +184,19 @@ def custom_get_img_from_link(link):
     
     #headers = {"User-Agent":get_random_UA()}
     headers = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/104.0.0.0 Safari/537.36"}
-    r = requests.get(link, headers=headers)
-
+    # Usually already downloaded for the article text
+    r = fetch_page(link, headers=headers)
+    return og_image_from_html(link, r.content)
+
+def og_image_from_html(link, html):
+    """
+    OpenGraph image of a downloaded page, made absolute against `link`;
+    None if the page has no valid OpenGraph data.
+    """
     parsed_uri = urlparse(link)
     domain = '{uri.scheme}://{uri.netloc}/'.format(uri=parsed_uri)
 
-    page = opengraph_py3.OpenGraph(html=r.content)
+    page = opengraph_py3.OpenGraph(html=html)
 
     if page.is_valid():
 
@@ -170,7 +215,7 @@ def upload_image_and_get_urn(image_url, author_urn, headers):
         }
     }
 
-    init_resp = requests.post(
+    init_resp = http_client.post(
         "https://api.linkedin.com/rest/images?action=initializeUpload",
         headers={**headers, "LinkedIn-Version": "202505", "Content-Type": "application/json"},
         json=init_payload
@@ -185,13 +230,13 @@ def upload_image_and_get_urn(image_url, author_urn, headers):
     image_urn = upload_info["value"]["image"]
 
     # 2. Step: Download image from source
-    img_resp = requests.get(image_url)
+    img_resp = http_client.get(image_url)
     if img_resp.status_code != 200:
         print("Failed to download image:", image_url)
         return None
 
     # 3. Step: Upload image bytes to LinkedIn
-    put_resp = requests.put(
+    put_resp = http_client.put(
         upload_url,
         headers={"Content-Type": "image/jpeg"},
         data=img_resp.content
@@ -224,24 +269,21 @@ def upload_image_linkdin(link, author, headers):
             ]
         }
     }
-    register_upload_response = requests.post(register_upload_url, headers=headers, json=register_upload_data, timeout=30)
+    register_upload_response = http_client.post(register_upload_url, headers=headers, json=register_upload_data, timeout=30)
     response = register_upload_response.json()
 
     uploadurl = response['value']['uploadMechanism']['com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest']['uploadUrl']
     asset = response['value']['asset']
 
-    og_link = opengraph_py3.OpenGraph(url=link)
+    og_link = opengraph_py3.OpenGraph(html=http_client.get(link).content)
 
     for key, value in og_link.items():
         if key == "image":
             image_url = value
 
-    image_filename = image_url.split('/')[-1]
-    local_image_filename = "/tmp/"+image_filename
-    urllib.request.urlretrieve(image_url, local_image_filename)
-
-    upload_response = requests.put(uploadurl, headers=headers, data=open(local_image_filename, 'rb').read())
+    image = http_client.get(image_url)
+    image.raise_for_status()
 
-    os.remove(local_image_filename)
+    upload_response = http_client.put(uploadurl, headers=headers, data=image.content)
 
     return asset
@@ -0,0 +1,137 @@
+"""
+Offline extractive summarizer: TextRank over the sentences of the
+extracted article text, no network needed.
+
+Sentences are split with NLTK's Punkt tokenizer (the trained English
+model when the punkt data is installed, an untrained one otherwise) and
+compared on their Porter stems without stopwords. Each sentence's
+PageRank score over that similarity graph is boosted for overlap with
+the title and for coming early in the article; the best sentences (at
+least half the top score) that fit in `max_chars` are returned in their
+original order.
+"""
+import functools
+import math
+import re
+
+import nltk
+from nltk.stem import PorterStemmer
+from nltk.tokenize.punkt import PunktSentenceTokenizer
+
+import config
+from condense import STOPWORDS, condense
+
+try:
+    nltk.data.find('tokenizers/punkt')
+    _tokenizer = nltk.data.load('tokenizers/punkt/english.pickle')
+except (LookupError, OSError, ValueError):
+    _tokenizer = PunktSentenceTokenizer()
+
+try:
+    from nltk.corpus import stopwords
+    _stopwords = frozenset(stopwords.words('english')) | STOPWORDS
+except LookupError:
+    _stopwords = STOPWORDS
+
+_stemmer = PorterStemmer()
+WORD = re.compile(r"[a-z0-9][a-z0-9'-]*")
+MAX_SENTENCES = 40 # sentences ranked per article
+DAMPING = 0.85
+ITERATIONS = 30 # at most, stopping once scores move less than TOLERANCE
+TOLERANCE = 1e-4
+MIN_RELATIVE_SCORE = 0.5 # sentences scoring below this share of the best one are left out
+
+
+def sentences(text):
+    """
+    Sentences of at least four words; headings and other lines without
+    final punctuation are left out unless there is nothing else.
+    """
+    found = []
+    for paragraph in re.split(r'\n+', text):
+        found.extend(s.strip() for s in _tokenizer.tokenize(paragraph) if len(s.split()) >= 4)
+    complete = [s for s in found if s.rstrip('"\')”’').endswith(('.', '!', '?'))]
+    return complete or found
+
+
+@functools.lru_cache(maxsize=50000)
+def _stem(word):
+    return _stemmer.stem(word)
+
+
+def _terms(sentence):
+    return {_stem(word) for word in WORD.findall(sentence.lower()) if word not in _stopwords}
+
+
+def _pagerank(terms):
+    """
+    TextRank scores: similarity is the shared terms over the log of both
+    sentence lengths.
+    """
+    count = len(terms)
+    logs = [math.log(len(t)) if len(t) > 1 else 0.0 for t in terms]
+    neighbours = [[] for _ in range(count)]
+    for i in range(count):
+        if not logs[i]:
+            continue
+        for j in range(i + 1, count):
+            if logs[j]:
+                shared = len(terms[i] & terms[j])
+                if shared:
+                    weight = shared / (logs[i] + logs[j])
+                    neighbours[i].append((j, weight))
+                    neighbours[j].append((i, weight))
+    # Incoming edges with weights normalized by the source's total
+    totals = [sum(weight for _, weight in edges) or 1.0 for edges in neighbours]
+    incoming = [[(j, weight / totals[j]) for j, weight in edges] for edges in neighbours]
+    scores = [1.0 / count] * count
+    for _ in range(ITERATIONS):
+        previous = scores
+        scores = [
+            (1 - DAMPING) / count + DAMPING * sum(weight * previous[j] for j, weight in edges)
+            for edges in incoming
+        ]
+        if sum(abs(a - b) for a, b in zip(scores, previous)) < TOLERANCE:
+            break
+    return scores
+
+
+def summarize_local(text, title='', max_chars=None):
+    """
+    Extractive summary of `text` of at most `max_chars` characters
+    (LOCAL_SUMMARY_MAX_CHARS by default), '' if it has no usable sentence.
+    """
+    max_chars = max_chars or config.LOCAL_SUMMARY_MAX_CHARS
+    if not text:
+        return ''
+    candidates = list(dict.fromkeys(sentences(condense(text, title))))[:MAX_SENTENCES]
+    if not candidates:
+        return ''
+
+    terms = [_terms(sentence) for sentence in candidates]
+    ranks = _pagerank(terms) if len(candidates) > 1 else [1.0]
+    top = max(ranks)
+    title_terms = _terms(title)
+    scored = []
+    for position, (sentence, sentence_terms, rank) in enumerate(zip(candidates, terms, ranks)):
+        score = rank / top
+        if title_terms:
+            score += len(sentence_terms & title_terms) / len(title_terms)
+        score += 0.5 / (position + 1)
+        scored.append((score, position, sentence))
+
+    kept = []
+    length = 0
+    ranked = sorted(scored, key=lambda s: (-s[0], s[1]))
+    for score, position, sentence in ranked:
+        if score < ranked[0][0] * MIN_RELATIVE_SCORE:
+            break
+        if length + len(sentence) + 1 > max_chars:
+            continue
+        kept.append((position, sentence))
+        length += len(sentence) + 1
+    if not kept:
+        # Even the best sentence is too long, cut it at a word boundary
+        best = ranked[0][2]
+        return best[:max_chars - 1].rsplit(' ', 1)[0] + '…'
+    return ' '.join(sentence for position, sentence in sorted(kept))
@@ -3,8 +3,10 @@
 
 import config
 import argparse
+import os
 
 from helpers import RSSContentHelper, FeedSetHelper
+from fetch_state import FileFetchStateStore
 from twitter import Twitter
 from models import FeedSet, create_tables
 from contextlib import contextmanager
@@ -41,12 +43,13 @@ def db_session(account):
 
 def getfeeds(account):
     """
-    Download and save articles from feeds
+    Download and save articles from feeds. Fetch state is kept in
+    FETCH_STATE_FILE, or in databases/fetch_state_<account>.json.
     """
-    create_tables(account)
-    with session_scope(account) as session:
-        helper = FeedSetHelper(session, account)
-        helper.get_pages_from_feeds()
+    state_path = config.FETCH_STATE_FILE or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'databases', 'fetch_state_{}.json'.format(account))
+    helper = FeedSetHelper(account, fetch_state_store=FileFetchStateStore(state_path))
+    helper.get_pages_from_feeds()
 
 
 def tweet(account):
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+import sys
+import os
+import boto3
+import argparse
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dynamo_ops import QUEUE_ATTRIBUTES, QUEUE_INDEX, queue_attributes
+from selection import selection_policy
+
+# Attribute of the earlier FeedQueueIndex, removed along the way
+OBSOLETE_ATTRIBUTES = ('feed_status',)
+
+def backfill_table(table, dry_run=False, policies=None):
+    """
+    Put every unpublished RSSContent item in the UnpublishedIndex (set
+    queue_feed, queue_sort) and take every published one out of it (remove
+    them), so the index only holds the backlog.
+    `policies` maps feed IDs to their selection policy; queue_sort values
+    written by another policy are recomputed.
+    Returns (scanned, updated, unpublished items without a feed_id).
+    """
+    policies = policies or {}
+    scanned = updated = orphaned = 0
+    scan_kwargs = {}
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            scanned += 1
+            unpublished = item.get('status', 'unpublished') == 'unpublished'
+            if unpublished and 'feed_id' not in item:
+                # Not reachable through any feed's queue
+                orphaned += 1
+                print(f"No feed_id, skipping {item['url']}")
+                continue
+
+            if unpublished:
+                policy = policies.get(item['feed_id']) or selection_policy()
+                queued = item.get('queue_feed') == item['feed_id'] and policy.is_current(item)
+                attributes = {} if queued else queue_attributes(item, policy)
+                stale = [name for name in OBSOLETE_ATTRIBUTES if name in item]
+            else:
+                attributes = {}
+                stale = [name for name in QUEUE_ATTRIBUTES + OBSOLETE_ATTRIBUTES if name in item]
+            if not attributes and not stale:
+                continue
+            updated += 1
+            if not dry_run:
+                update = []
+                kwargs = {}
+                if attributes:
+                    update.append("set " + ", ".join(f"{name} = :{name}" for name in attributes))
+                    kwargs['ExpressionAttributeValues'] = {f":{name}": value for name, value in attributes.items()}
+                if stale:
+                    update.append("remove " + ", ".join(stale))
+                table.update_item(Key={'url': item['url']}, UpdateExpression=" ".join(update), **kwargs)
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return scanned, updated, orphaned
+
+def backfill_queue_index(region, table_name, config_table_name=None, dry_run=False):
+    if region:
+        dynamodb = boto3.resource('dynamodb', region_name=region)
+    else:
+        dynamodb = boto3.resource('dynamodb')
+
+    table = dynamodb.Table(table_name)
+
+    try:
+        table.load()
+    except Exception as e:
+        print(f"Error: Could not load table '{table_name}'. Make sure it exists and region is correct.")
+        print(e)
+        return
+
+    policies = {}
+    if config_table_name:
+        # Selection policy of each feed, for its queue_sort values
+        scan_kwargs = {}
+        while True:
+            response = dynamodb.Table(config_table_name).scan(**scan_kwargs)
+            for feed in response.get('Items', []):
+                policies[feed['feed_id']] = selection_policy(feed)
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    else:
+        print("No --config-table-name, every feed gets the default selection policy.")
+
+    print(f"Backfilling {QUEUE_INDEX} attributes in DynamoDB Table: {table_name}")
+    scanned, updated, orphaned = backfill_table(table, dry_run, policies)
+
+    prefix = "[Dry Run] " if dry_run else ""
+    print(f"{prefix}Scanned {scanned} items: {updated} updated, {orphaned} without a feed_id.")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backfill the per-feed queue index of RSSContent')
+    parser.add_argument('--region', help='AWS Region', default='us-east-1')
+    parser.add_argument('--table-name', help='DynamoDB RSSContent Table Name', required=True)
+    parser.add_argument('--config-table-name', help='DynamoDB FeedConfigurations Table Name (for selection policies)')
+    parser.add_argument('--dry-run', action='store_true', help='Preview changes without writing')
+
+    args = parser.parse_args()
+
+    backfill_queue_index(args.region, args.table_name, args.config_table_name, args.dry_run)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+import sys
+import os
+import boto3
+import argparse
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from canonical import canonicalize_url, guid_key, link_host
+
+def scoped_guid_key(item):
+    """
+    Key of a row keyed by an unscoped "guid:<id>" (written before ids were
+    scoped by the host of their link), None if it needs no re-keying.
+    """
+    url = item['url']
+    host = link_host(item.get('link'))
+    if not url.startswith('guid:') or not host or url.startswith(f'guid:{host}:'):
+        return None
+    return guid_key(url[len('guid:'):], item['link'])
+
+def move_item(table, item, key, link, dry_run):
+    """
+    Move a row to `key`, or merge it into the row already there, which
+    stays published if either was. Returns True when it was merged.
+    """
+    url = item['url']
+    existing = table.get_item(Key={'url': key}).get('Item')
+    if existing:
+        print(f"Merging {url} into {key}")
+        if not dry_run:
+            if item.get('status') == 'published' and existing.get('status') != 'published':
+                # Also drops the item from the unpublished index
+                table.update_item(
+                    Key={'url': key},
+                    UpdateExpression="set #s = :s remove queue_feed, queue_sort",
+                    ExpressionAttributeNames={'#s': 'status'},
+                    ExpressionAttributeValues={':s': 'published'}
+                )
+            table.delete_item(Key={'url': url})
+        return True
+    print(f"Re-keying {url} -> {key}")
+    if not dry_run:
+        table.put_item(Item={**item, 'url': key, 'link': link})
+        table.delete_item(Key={'url': url})
+    return False
+
+def canonicalize_table(table, dry_run=False):
+    """
+    Re-key RSSContent rows written before URL canonicalization.
+    Each row without a `link` attribute is moved to its canonical URL, keeping
+    the original URL in `link`. Rows keyed by an entry id that is not a URL
+    ("guid:<id>") are moved to the id scoped by the host of their link
+    ("guid:<host>:<id>", see canonical.guid_key). When the new key already
+    exists the rows are merged, and the merged item stays published if
+    either was. Returns (scanned, re-keyed, merged).
+    """
+    scanned = rekeyed = merged = 0
+    scan_kwargs = {}
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            scanned += 1
+            url = item['url']
+            if 'link' in item:
+                key = scoped_guid_key(item)
+                if key is None:
+                    continue
+                link = item['link']
+            else:
+                key = canonicalize_url(url)
+                link = url
+                if key == url:
+                    if not dry_run:
+                        table.update_item(
+                            Key={'url': url},
+                            UpdateExpression="set #l = :l",
+                            ExpressionAttributeNames={'#l': 'link'},
+                            ExpressionAttributeValues={':l': url}
+                        )
+                    continue
+
+            if move_item(table, item, key, link, dry_run):
+                merged += 1
+            else:
+                rekeyed += 1
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return scanned, rekeyed, merged
+
+def canonicalize_urls(region, table_name, dry_run=False):
+    """
+    Re-key the rows of an RSSContent table, see canonicalize_table.
+    """
+    if region:
+        dynamodb = boto3.resource('dynamodb', region_name=region)
+    else:
+        dynamodb = boto3.resource('dynamodb')
+
+    table = dynamodb.Table(table_name)
+
+    try:
+        table.load()
+    except Exception as e:
+        print(f"Error: Could not load table '{table_name}'. Make sure it exists and region is correct.")
+        print(e)
+        return
+
+    print(f"Canonicalizing URLs in DynamoDB Table: {table_name}")
+    scanned, rekeyed, merged = canonicalize_table(table, dry_run)
+
+    prefix = "[Dry Run] " if dry_run else ""
+    print(f"{prefix}Scanned {scanned} items: {rekeyed} re-keyed, {merged} merged into an existing key.")
+    print("Rebuild the seen-URL filter (management/rebuild_seen_filter.py) afterwards.")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Re-key RSSContent items by canonical URL')
+    parser.add_argument('--region', help='AWS Region', default='us-east-1')
+    parser.add_argument('--table-name', help='DynamoDB RSSContent Table Name', required=True)
+    parser.add_argument('--dry-run', action='store_true', help='Preview changes without writing')
+
+    args = parser.parse_args()
+
+    canonicalize_urls(args.region, args.table_name, args.dry_run)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+import os
+import sys
+import argparse
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+def enrich_batch(region, table_name, config_table_name, feed_ids, workers, limit):
+    """
+    Enrich the items waiting in the EnrichIndex of RSSContent, parsing
+    pages with `workers` processes (see parallel_enrich.py), e.g. to work
+    through a large backlog outside Lambda.
+    """
+    # DynamoDBOps reads its table names and region from the environment
+    os.environ['RSS_TABLE_NAME'] = table_name
+    os.environ['CONFIG_TABLE_NAME'] = config_table_name
+    if region:
+        os.environ['AWS_DEFAULT_REGION'] = region
+
+    from config_snapshot import load_config_snapshot
+    from dynamo_ops import DynamoDBOps
+    from enrichment import add_timings
+    from helpers import EnrichmentHelper
+
+    db_ops = DynamoDBOps()
+    feeds = [feed for feed in load_config_snapshot(db_ops) if not feed_ids or feed.feed_id in feed_ids]
+    print(f"Enriching {len(feeds)} feeds from {table_name} with {workers} workers...")
+
+    started = time.monotonic()
+    totals = {}
+    timings = {}
+    for feed in feeds:
+        print(f"Feed {feed.feed_id}")
+        helper = EnrichmentHelper(feed.feed_id, feed_config=feed, db_ops=db_ops)
+        stats = helper.enrich_pending(limit=limit, workers=workers)
+        for key, value in stats.items():
+            totals[key] = totals.get(key, 0) + value
+        add_timings(timings, helper.timings)
+
+    elapsed = time.monotonic() - started
+    print(f"Stats: {totals}")
+    print(f"Stage timings (ms): {timings}")
+    print(f"Enriched {totals.get('enriched', 0)} items in {elapsed:.1f}s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Enrich pending RSSContent items with worker processes')
+    parser.add_argument('--region', help='AWS Region', default='us-east-1')
+    parser.add_argument('--table-name', help='DynamoDB RSSContent Table Name', required=True)
+    parser.add_argument('--config-table-name', help='DynamoDB FeedConfigurations Table Name', required=True)
+    parser.add_argument('--feed-id', action='append', help='Only this feed (repeatable), every feed by default')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+    parser.add_argument('--limit', type=int, default=500, help='Items enriched per feed')
+    args = parser.parse_args()
+
+    enrich_batch(args.region, args.table_name, args.config_table_name, args.feed_id or [],
+                 args.workers, args.limit)
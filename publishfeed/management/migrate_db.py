@@ -9,6 +9,8 @@ from datetime import datetime
 # Add parent directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from dynamo_ops import queue_attributes
+
 def migrate_db(sqlite_path, feed_id, region, table_name, dry_run=False):
     if not os.path.exists(sqlite_path):
         print(f"Error: Database file {sqlite_path} not found.")
@@ -68,6 +70,7 @@ def migrate_db(sqlite_path, feed_id, region, table_name, dry_run=False):
                 'status': status,
                 'feed_id': feed_id
             }
+            item.update(queue_attributes(item))
             
             if dry_run:
                 print(f"[Dry Run] would write: {title} ({status})")
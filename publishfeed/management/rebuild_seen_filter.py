@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+import os
+import sys
+import argparse
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+def rebuild_seen_filter(region, table_name, bucket, capacity, fp_rate, max_bytes, segments):
+    """
+    Rebuild the seen-URL filter from a parallel scan of RSSContent and
+    upload it to S3, replacing the copy used by the fetch Lambda.
+    """
+    # DynamoDBOps reads its table name and region from the environment
+    os.environ['RSS_TABLE_NAME'] = table_name
+    if region:
+        os.environ['AWS_DEFAULT_REGION'] = region
+
+    import config
+    from dynamo_ops import DynamoDBOps
+    from seen_filter import SeenFilterStore
+
+    config.SEEN_FILTER_FP_RATE = fp_rate
+    config.SEEN_FILTER_MAX_BYTES = max_bytes
+
+    print(f"Rebuilding seen filter from {table_name} in region {region}...")
+    print(f"Target: s3://{bucket}/{config.SEEN_FILTER_KEY}")
+
+    store = SeenFilterStore(DynamoDBOps(), bucket=bucket)
+    bloom = store.rebuild(capacity, total_segments=segments)
+
+    print(f"Filter holds {bloom.count} URLs for a capacity of {bloom.capacity}.")
+    print("Rebuild complete!")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild the seen-URL filter from RSSContent')
+    parser.add_argument('--region', help='AWS Region', default='us-east-1')
+    parser.add_argument('--table-name', help='DynamoDB RSSContent Table Name', required=True)
+    parser.add_argument('--bucket', help='S3 bucket holding the filter (SEEN_FILTER_BUCKET)', required=True)
+    parser.add_argument('--capacity', type=int, default=200000, help='URLs to size the filter for')
+    parser.add_argument('--fp-rate', type=float, default=0.01, help='Target false-positive rate')
+    parser.add_argument('--max-bytes', type=int, default=8 * 1024 * 1024, help='Memory budget for the filter')
+    parser.add_argument('--segments', type=int, default=4, help='Parallel scan segments')
+    args = parser.parse_args()
+
+    rebuild_seen_filter(args.region, args.table_name, args.bucket, args.capacity,
+                        args.fp_rate, args.max_bytes, args.segments)
@@ -3,13 +3,18 @@ import os
 import sys
 import yaml
 import boto3
+import hashlib
 import json
+from datetime import datetime
 
 # Add parent directory to path to import local modules if needed
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 import argparse
 
+from config_snapshot import META_FEED_ID
+from generate_hashtags_fuzzy import dictionary_version
+
 def sync_feeds(region, table_name):
     """
     Reads feeds.yml and syncs config to DynamoDB and secrets to SSM.
@@ -43,19 +48,29 @@ def sync_feeds(region, table_name):
     print(f"Syncing feeds from {feeds_path} to region {region if region else 'default'}...")
     print(f"Targeting DynamoDB Table: {table_name}")
 
+    config_items = []
     for feed_id, data in feeds_data.items():
         print(f"Processing {feed_id}...")
         
+        # Optional keyword -> hashtag dictionary of the feed, the default one when empty
+        hashtag_keywords = {str(keyword): str(hashtag) for keyword, hashtag in (data.get('hashtag_keywords') or {}).items()}
+
         # 1. Update Config in DynamoDB
         # Exclude 'twitter' key from config stored in DB (it contains secrets)
         config_item = {
             'feed_id': feed_id,
             'urls': data.get('urls', []),
             'hashtags': data.get('hashtags', ''),
-            'min_date': data.get('min_date', '') # Optional date filter
+            'min_date': data.get('min_date', ''), # Optional date filter
+            'selection': data.get('selection', ''), # Optional selection policy (see selection.py)
+            'score_keywords': data.get('score_keywords', []), # Keywords for the 'score' policy
+            'summarizer': data.get('summarizer', ''), # Optional: llm, local, fallback or race
+            'hashtag_keywords': hashtag_keywords,
+            'hashtag_version': dictionary_version(hashtag_keywords) if hashtag_keywords else ''
         }
         
         config_table.put_item(Item=config_item)
+        config_items.append(config_item)
         print(f"  - Config updated in DynamoDB table '{table_name}'")
 
         # 2. Update Secrets in SSM
@@ -71,6 +86,15 @@ def sync_feeds(region, table_name):
             )
             print(f"  - Secrets updated in SSM at '{parameter_name}'")
 
+    # Version of the whole config set, warm Lambdas reload their snapshot when it changes
+    version = hashlib.sha256(json.dumps(config_items, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    config_table.put_item(Item={
+        'feed_id': META_FEED_ID,
+        'version': version,
+        'updated_at': datetime.now().isoformat()
+    })
+    print(f"Config version {version[:12]} written to '{table_name}'")
+
     # 3. Update LinkedIn Secrets in SSM
     ln_creds_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../ln_credentials.json'))
     if os.path.exists(ln_creds_path):
@@ -0,0 +1,208 @@
+"""
+Fetch-once cache of article pages.
+
+The same article is read by newspaper, the BeautifulSoup fallbacks of
+llm_helpers and the OpenGraph thumbnail lookup of ln_post. They all get it
+through fetch_page(), so a URL is downloaded once and the cached bytes are
+parsed by every reader.
+
+Two layers: an in-process LRU cleared at the start of every invocation
+(reset_page_cache), and an optional directory on disk (PAGE_CACHE_DIR, /tmp
+in Lambda) whose pages warm invocations reuse for PAGE_CACHE_TTL seconds.
+
+Only successful (2xx) pages are shared. A failed fetch is remembered for
+the User-Agent it was sent with, so a fallback trying another one still
+can, but the same request is never sent twice.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+import config
+import http_client
+
+
+class Page:
+    """
+    A downloaded page: final status code and body bytes.
+    """
+    def __init__(self, url, status_code, content, encoding=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 300
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"HTTP {self.status_code} for {self.url}")
+
+
+class DiskPageStore:
+    """
+    Pages as files named after the sha256 of their URL: a JSON header line
+    followed by the body. Files older than `ttl` seconds are ignored and
+    removed.
+    """
+    def __init__(self, directory, ttl=None):
+        self.directory = directory
+        self.ttl = ttl or config.PAGE_CACHE_TTL
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.page')
+
+    def get(self, url):
+        path = self._path(url)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        if header.get('url') != url:
+            return None
+        return Page(url, header['status_code'], content, header.get('encoding'))
+
+    def put(self, page):
+        path = self._path(page.url)
+        header = {'url': page.url, 'status_code': page.status_code, 'encoding': page.encoding}
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}"
+        with open(temporary, 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            f.write(page.content)
+        os.replace(temporary, path)
+
+
+class PageCache:
+    def __init__(self, capacity=None, store=None):
+        self.capacity = capacity or config.PAGE_CACHE_SIZE
+        self.store = store
+        self.pages = OrderedDict()
+        self.failures = {} # (url, user agent) -> failed Page or exception
+        self.lock = threading.Lock()
+        self.counters = {'fetches': 0, 'hits': 0, 'disk_hits': 0, 'errors': 0}
+
+    def get(self, url):
+        """
+        Return the cached page of `url`, None if it was not fetched yet.
+        """
+        with self.lock:
+            if url in self.pages:
+                self.pages.move_to_end(url)
+                self.counters['hits'] += 1
+                return self.pages[url]
+
+        page = None
+        if self.store is not None:
+            try:
+                page = self.store.get(url)
+            except Exception as e:
+                print(f"Page cache: disk read failed: {e}")
+                self._count('errors')
+        if page is not None:
+            self._count('disk_hits')
+            self._remember(page)
+        return page
+
+    def fetch(self, url, headers=None, timeout=None):
+        """
+        Return the page of `url`, downloading it only if it is not cached.
+        Non-2xx pages are returned (check `ok`); request errors are raised.
+        """
+        page = self.get(url)
+        if page is not None:
+            return page
+
+        agent = (headers or {}).get('User-Agent', '')
+        with self.lock:
+            failure = self.failures.get((url, agent))
+        if failure is not None:
+            self._count('hits')
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+
+        self._count('fetches')
+        kwargs = {'timeout': timeout} if timeout else {}
+        try:
+            response = http_client.get(url, headers=headers, allow_redirects=True, **kwargs)
+        except http_client.REQUEST_ERRORS as e:
+            with self.lock:
+                self.failures[(url, agent)] = e
+            raise
+        page = Page(url, response.status_code, response.content, response.encoding)
+        if not page.ok:
+            with self.lock:
+                self.failures[(url, agent)] = page
+            return page
+
+        self._remember(page)
+        if self.store is not None:
+            try:
+                self.store.put(page)
+            except Exception as e:
+                print(f"Page cache: disk write failed: {e}")
+                self._count('errors')
+        return page
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, size=len(self.pages))
+
+    def _remember(self, page):
+        with self.lock:
+            self.pages[page.url] = page
+            self.pages.move_to_end(page.url)
+            while len(self.pages) > self.capacity:
+                self.pages.popitem(last=False)
+
+    def _count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_page_cache():
+    """
+    Return the page cache of this invocation, with the disk layer when
+    PAGE_CACHE_DIR is set.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            directory = config.PAGE_CACHE_DIR
+            _cache = PageCache(store=DiskPageStore(directory) if directory else None)
+        return _cache
+
+
+def reset_page_cache():
+    """
+    Start a new invocation: drop the in-process pages, failures and
+    counters (the disk layer is kept).
+    """
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def fetch_page(url, headers=None, timeout=None):
+    return get_page_cache().fetch(url, headers, timeout)
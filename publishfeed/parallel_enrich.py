@@ -0,0 +1,276 @@
+"""
+Batch enrichment with the CPU-bound work spread over worker processes.
+
+Parsing a page (text extraction, OpenGraph thumbnail) and fuzzy hashtag
+matching hold the GIL, so threads do not make them any faster. Here the
+pages are downloaded concurrently through the page cache (page_cache.py,
+with the headers of the lxml extraction strategy) and each body is handed
+to one of ENRICH_WORKERS worker processes, which does all of that work and
+sends back only the small result. Domains whose extraction memo prefers a
+strategy the workers do not run (extraction_memo.py) are left to
+extract_article_text, as are pages the workers got no text from; those
+find the downloaded page, or its failure, in the cache. Results are
+summarized in batches of ENRICH_BATCH_SIZE (see enrichment.finish_items)
+and handed to the caller as soon as each batch is done, so they can be
+written while the next pages are parsed.
+
+Workers are plain processes with a Pipe each: Lambda has no /dev/shm, which
+multiprocessing.Pool and Queue need for their semaphores. They are started
+by a fork server (spawned where there is none), never forked from this
+process, whose download threads and HTTP session could be caught holding a
+lock. Pages are downloaded a window of one per worker at a time and a
+worker is only given a page once it has returned the previous one, so at
+most one page body per worker is held at any time, besides the one each
+worker is parsing.
+"""
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import wait
+
+import newspaper
+
+import config
+import http_client
+from enrichment import StageTimer, finish_items, thumbnail_url
+from extraction_memo import domain_of, get_extraction_memo
+from generate_hashtags_fuzzy import generate_hashtags_fuzzy
+from html_text import extract_text
+from llm_helpers import BROWSER_HEADERS, EXTRACTION_STRATEGIES, extract_article_text
+from ln_post import og_image_from_html
+from page_cache import fetch_page
+
+# Extraction strategies parse_page runs on the downloaded page
+WORKER_STRATEGIES = ('lxml', 'newspaper')
+
+
+def parse_page(url, title, content, feed_config=None):
+    """
+    Worker side: hashtags of the title (with the feed's dictionary), and the
+    text and thumbnail of the downloaded page (b'' if there is none), with
+    their timings in ms and the extraction attempts, as (strategy,
+    succeeded, ms), for the extraction memo.
+    """
+    timer = StageTimer()
+    with timer.stage('hashtags'):
+        hashtags = generate_hashtags_fuzzy(title, feed_config)
+    text = ''
+    thumbnail = None
+    attempts = []
+    if content:
+        with timer.stage('extract'):
+            started = time.perf_counter()
+            text = extract_text(content)
+            if len(text) <= 100:
+                text = ''
+            attempts.append(('lxml', bool(text), (time.perf_counter() - started) * 1000))
+            if not text:
+                started = time.perf_counter()
+                article = newspaper.Article(url)
+                article.download(input_html=content)
+                article.parse()
+                text = article.text if len(article.text.strip()) > 100 else ''
+                attempts.append(('newspaper', bool(text), (time.perf_counter() - started) * 1000))
+        with timer.stage('thumbnail'):
+            try:
+                thumbnail = og_image_from_html(url, content) or ''
+            except Exception as e:
+                print(f"Thumbnail lookup failed for {url}: {e}")
+                thumbnail = ''
+    return {'text': text, 'hashtags': hashtags, 'thumbnail': thumbnail, 'timings': timer.timings,
+            'attempts': attempts}
+
+
+def _work(connection, parser):
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        index, url, title, content, feed_config = job
+        try:
+            result = parser(url, title, content, feed_config)
+        except Exception as e:
+            result = {'error': f"{type(e).__name__}: {e}"}
+        result['index'] = index
+        connection.send(result)
+
+
+class WorkerPool:
+    """
+    Worker processes running `parser` (parse_page), each fed through its
+    own Pipe.
+    """
+    def __init__(self, workers=None, parser=None):
+        self.workers = workers or config.ENRICH_WORKERS
+        self.parser = parser or parse_page
+        methods = multiprocessing.get_all_start_methods()
+        self.context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        self.processes = {}
+        self.idle = []
+        self.busy = {} # connection -> job
+        for _ in range(self.workers):
+            self._spawn()
+
+    def _spawn(self):
+        connection, child = self.context.Pipe()
+        process = self.context.Process(target=_work, args=(child, self.parser), daemon=True)
+        process.start()
+        child.close()
+        self.processes[connection] = process
+        self.idle.append(connection)
+
+    def submit(self, job):
+        connection = self.idle.pop()
+        connection.send(job)
+        self.busy[connection] = job
+
+    def collect(self):
+        """
+        Wait for at least one busy worker and return the results that are
+        ready.
+        """
+        results = []
+        for connection in wait(list(self.busy)):
+            job = self.busy.pop(connection)
+            try:
+                results.append(connection.recv())
+                self.idle.append(connection)
+            except EOFError:
+                # The worker died (e.g. out of memory), replace it
+                print(f"  ! Worker exited while parsing {job[1]}")
+                results.append({'index': job[0], 'error': 'worker exited'})
+                self.processes.pop(connection).join(1)
+                connection.close()
+                self._spawn()
+        return results
+
+    def close(self):
+        for connection in self.processes:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for connection, process in self.processes.items():
+            process.join(5)
+            if process.is_alive():
+                process.terminate()
+            connection.close()
+        self.processes = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _downloads(items, feed_config, window, deadline, timers):
+    """
+    Yield (index, url, title, body, feed_config) jobs, downloading `window`
+    pages at a time through the page cache, and stopping at `deadline`.
+    The body is b'' when the download failed, or when the domain's
+    extraction memo prefers a strategy the workers do not run.
+    """
+    memo = get_extraction_memo()
+    links = [item.get('link', item['url']) for item in items]
+
+    def download(link):
+        if memo.order(domain_of(link), list(EXTRACTION_STRATEGIES))[0] not in WORKER_STRATEGIES:
+            return b'', 0
+        timeout = config.FETCH_TIMEOUT
+        if deadline is not None:
+            timeout = max(min(timeout, deadline - time.monotonic()), 0.1)
+        started = time.perf_counter()
+        try:
+            page = fetch_page(link, headers=BROWSER_HEADERS, timeout=timeout)
+            content = page.content if page.ok else b''
+        except http_client.REQUEST_ERRORS as e:
+            print(f"  ! Download failed for {link}: {e}")
+            content = b''
+        return content, int(round((time.perf_counter() - started) * 1000))
+
+    with ThreadPoolExecutor(max_workers=window) as executor:
+        for start in range(0, len(items), window):
+            if deadline is not None and time.monotonic() > deadline:
+                return
+            indexes = {}
+            for index in range(start, min(start + window, len(items))):
+                indexes.setdefault(links[index], []).append(index)
+            for link, (content, ms) in zip(indexes, executor.map(download, indexes)):
+                for index in indexes[link]:
+                    timers[index].timings['download'] = ms
+                    yield index, link, items[index]['title'], content, feed_config
+
+
+def _parse(pool, jobs):
+    """
+    Yield the parse results of `jobs` as the workers finish them.
+    """
+    for job in jobs:
+        while not pool.idle:
+            yield from pool.collect()
+        pool.submit(job)
+    while pool.busy:
+        yield from pool.collect()
+
+
+def enrich_parallel(items, feed_config, workers=None, deadline=None):
+    """
+    Enrich RSSContent items of a feed, yielding (item, attributes) pairs
+    batch by batch, in completion order.
+
+    Items whose page could not be downloaded or parsed by the workers go
+    through the usual extraction strategies (extract_article_text) in this
+    process. Nothing new is downloaded past `deadline` (a time.monotonic()
+    value); the items not yielded are left to the caller.
+    """
+    workers = workers or config.ENRICH_WORKERS
+    timers = [StageTimer() for _ in items]
+    with WorkerPool(workers) as pool:
+        batch = []
+        for result in _parse(pool, _downloads(items, feed_config, workers, deadline, timers)):
+            batch.append(result)
+            if len(batch) == config.ENRICH_BATCH_SIZE:
+                yield from _finish(items, feed_config, timers, batch, deadline)
+                batch = []
+        if batch:
+            yield from _finish(items, feed_config, timers, batch, deadline)
+
+
+def _finish(items, feed_config, timers, results, deadline):
+    batch_items = []
+    batch_timers = []
+    hashtags = []
+    texts = []
+    thumbnails = []
+    for result in results:
+        index = result['index']
+        item, timer = items[index], timers[index]
+        if 'error' in result:
+            print(f"  ! Error parsing {item['url']}: {result['error']}")
+            result = {'text': '', 'hashtags': generate_hashtags_fuzzy(item['title'], feed_config), 'thumbnail': None,
+                      'timings': {}, 'attempts': []}
+        for name, ms in result['timings'].items():
+            timer.timings[name] = timer.timings.get(name, 0) + ms
+        text = result['text']
+        thumbnail = result['thumbnail']
+        link = item.get('link', item['url'])
+        if text:
+            get_extraction_memo().record(domain_of(link), result['attempts'])
+        else:
+            # extract_article_text records its own attempts
+            with timer.stage('extract'):
+                text = extract_article_text(link, deadline)
+            if thumbnail is None:
+                with timer.stage('thumbnail'):
+                    thumbnail = thumbnail_url(link)
+        batch_items.append(item)
+        batch_timers.append(timer)
+        hashtags.append(result['hashtags'])
+        texts.append(text)
+        thumbnails.append(thumbnail)
+    attributes = finish_items(batch_items, feed_config, batch_timers, hashtags, texts, thumbnails, deadline)
+    return list(zip(batch_items, attributes))
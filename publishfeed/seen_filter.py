@@ -0,0 +1,187 @@
+import hashlib
+import math
+import os
+import struct
+
+import config
+
+MAGIC = b'PFBF'
+FORMAT_VERSION = 1
+# magic, format version, number of hash functions, capacity, number of bits, items added
+HEADER = struct.Struct('>4sHHQQQ')
+
+
+class BloomFilter:
+    """
+    Probabilistic set of every ingested URL.
+
+    `url in bloom` answers False only for URLs that were never added
+    ("definitely new"); True means "maybe seen" and has to be confirmed
+    against DynamoDB.
+    """
+    def __init__(self, num_bits, num_hashes, capacity=0, count=0, bits=None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.capacity = capacity
+        self.count = count
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity, fp_rate=None, max_bytes=None):
+        """
+        Size a filter for `capacity` URLs at `fp_rate` false positives,
+        without going over `max_bytes` of memory (the false-positive rate
+        rises instead).
+        """
+        fp_rate = fp_rate or config.SEEN_FILTER_FP_RATE
+        max_bytes = max_bytes or config.SEEN_FILTER_MAX_BYTES
+        capacity = max(capacity, 1)
+        num_bits = math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))
+        num_bits = max(8, min(num_bits, max_bytes * 8))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes, capacity=capacity)
+
+    def _positions(self, url):
+        digest = hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, url):
+        for position in self._positions(url):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, url):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(url))
+
+    @property
+    def expected_fp_rate(self):
+        """
+        False-positive rate expected for the number of URLs added so far.
+        """
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    @property
+    def is_full(self):
+        return self.count > self.capacity
+
+    def to_bytes(self):
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, self.num_hashes, self.capacity,
+                             self.num_bits, self.count)
+        return header + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, num_hashes, capacity, num_bits, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported seen filter blob (magic={magic!r}, version={version})")
+        bits = bytearray(data[HEADER.size:])
+        if len(bits) != (num_bits + 7) // 8:
+            raise ValueError("Truncated seen filter blob")
+        return cls(num_bits, num_hashes, capacity=capacity, count=count, bits=bits)
+
+
+class SeenFilterStore:
+    """
+    Keeps the seen-URL filter in /tmp for warm Lambdas, with a durable copy
+    in S3. When neither copy is usable the filter is rebuilt from a parallel
+    scan of the RSSContent table.
+    """
+    def __init__(self, db_ops, bucket=None, key=None, local_path=None):
+        self.db_ops = db_ops
+        self.bucket = bucket or os.environ.get('SEEN_FILTER_BUCKET')
+        self.key = key or config.SEEN_FILTER_KEY
+        self.local_path = local_path or config.SEEN_FILTER_LOCAL_PATH
+        self._s3 = None
+
+    @property
+    def s3(self):
+        if self._s3 is None:
+            import clients
+            self._s3 = clients.client('s3')
+        return self._s3
+
+    def load(self):
+        """
+        Return the current filter, rebuilding it if no copy is usable or the
+        stored one is over capacity.
+        """
+        bloom = self._load_local() or self._load_durable()
+        if bloom is None or bloom.is_full:
+            capacity = config.SEEN_FILTER_CAPACITY
+            if bloom is not None:
+                capacity = max(capacity, bloom.count * 2)
+                print(f"SeenFilter: {bloom.count} URLs over capacity {bloom.capacity}, rebuilding")
+            bloom = self.rebuild(capacity)
+        return bloom
+
+    def rebuild(self, capacity=None, total_segments=None):
+        """
+        Build a fresh filter from every URL in RSSContent and save it.
+        """
+        urls = self.db_ops.scan_rss_urls(total_segments or config.SEEN_FILTER_SCAN_SEGMENTS)
+        bloom = BloomFilter.for_capacity(max(capacity or config.SEEN_FILTER_CAPACITY, len(urls) * 2))
+        for url in urls:
+            bloom.add(url)
+        print(f"SeenFilter: rebuilt from {len(urls)} URLs "
+              f"({len(bloom.bits)} bytes, {bloom.num_hashes} hashes, "
+              f"expected fp rate {bloom.expected_fp_rate:.4%})")
+        self.save(bloom)
+        return bloom
+
+    def save(self, bloom):
+        data = bloom.to_bytes()
+        etag = None
+        if self.bucket:
+            response = self.s3.put_object(Bucket=self.bucket, Key=self.key, Body=data)
+            etag = response.get('ETag')
+        self._write_local(data, etag)
+
+    def _load_local(self):
+        if not os.path.exists(self.local_path):
+            return None
+        # The /tmp copy is only trusted while it matches the durable copy,
+        # another container (or the rebuild command) may have replaced it.
+        if self.bucket:
+            try:
+                etag = self.s3.head_object(Bucket=self.bucket, Key=self.key)['ETag']
+            except Exception:
+                return None
+            if etag != self._read_local_etag():
+                return None
+        try:
+            with open(self.local_path, 'rb') as f:
+                return BloomFilter.from_bytes(f.read())
+        except (OSError, ValueError, struct.error) as e:
+            print(f"SeenFilter: ignoring local copy: {e}")
+            return None
+
+    def _load_durable(self):
+        if not self.bucket:
+            return None
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=self.key)
+            data = response['Body'].read()
+            bloom = BloomFilter.from_bytes(data)
+        except Exception as e:
+            print(f"SeenFilter: no usable durable copy: {e}")
+            return None
+        self._write_local(data, response.get('ETag'))
+        return bloom
+
+    def _read_local_etag(self):
+        try:
+            with open(self.local_path + '.etag', 'r') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def _write_local(self, data, etag):
+        tmp_path = self.local_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self.local_path)
+        with open(self.local_path + '.etag', 'w') as f:
+            f.write(etag or '')
@@ -0,0 +1,161 @@
+"""
+Selection policies: which unpublished item a feed publishes next.
+
+Each policy decides the queue_sort value an item gets in the
+UnpublishedIndex when it is written, and reads one or two index entries
+per selection, however long the backlog is:
+
+- oldest: oldest item first (queue_sort is the date added)
+- freshest: newest item first
+- uniform: any item of the backlog (queue_sort is a random token, a random
+  pivot picks the entry at or after it, so each item's chance is the gap
+  before its token: equal in expectation)
+- score: highest scoring item first, oldest first among equal scores
+
+A feed picks its policy with `selection` in FeedConfigurations
+(DEFAULT_SELECTION_POLICY otherwise). Items keep the queue_sort they were
+written with, so run management/backfill_queue_index.py after changing it.
+"""
+import random
+import re
+
+from boto3.dynamodb.conditions import Key
+
+import config
+
+TOKEN_PATTERN = re.compile(r'^[0-9a-f]{16}$')
+SCORE_MAX = 999999
+CANDIDATE_PAGE_SIZE = 10 # index entries per query after the first candidate
+
+
+class SelectionPolicy:
+    name = None
+
+    def sort_key(self, item):
+        """
+        queue_sort value of an item.
+        """
+        raise NotImplementedError
+
+    def is_current(self, item):
+        """
+        Whether the item's queue_sort was computed by this policy.
+        """
+        return item.get('queue_sort') == self.sort_key(item)
+
+    def candidates(self, table, index_name, feed_id, min_date=None):
+        """
+        Index entries (keys only) of the feed's queue in the order this
+        policy picks them, read lazily: one entry, then pages of
+        CANDIDATE_PAGE_SIZE. Items added before min_date may be yielded by
+        policies not ordered by date; the caller skips them.
+        """
+        return self._entries(table, index_name, Key('queue_feed').eq(feed_id))
+
+    def select(self, table, index_name, feed_id, min_date=None):
+        """
+        Return the index entry (keys only) of the next item, None when the
+        feed's queue is empty.
+        """
+        return next(iter(self.candidates(table, index_name, feed_id, min_date)), None)
+
+    def _entries(self, table, index_name, key_condition, forward=True):
+        kwargs = {'Limit': 1}
+        while True:
+            response = table.query(
+                IndexName=index_name,
+                KeyConditionExpression=key_condition,
+                ScanIndexForward=forward,
+                **kwargs
+            )
+            yield from response.get('Items', [])
+            if 'LastEvaluatedKey' not in response:
+                return
+            kwargs = {'Limit': CANDIDATE_PAGE_SIZE, 'ExclusiveStartKey': response['LastEvaluatedKey']}
+
+
+class OldestFirst(SelectionPolicy):
+    name = 'oldest'
+    forward = True
+
+    def sort_key(self, item):
+        return item.get('dateAdded', '')
+
+    def candidates(self, table, index_name, feed_id, min_date=None):
+        key_condition = Key('queue_feed').eq(feed_id)
+        if min_date:
+            key_condition = key_condition & Key('queue_sort').gt(min_date)
+        return self._entries(table, index_name, key_condition, self.forward)
+
+
+class FreshestFirst(OldestFirst):
+    name = 'freshest'
+    forward = False
+
+
+class Uniform(SelectionPolicy):
+    name = 'uniform'
+
+    def sort_key(self, item):
+        return random_token()
+
+    def is_current(self, item):
+        return bool(TOKEN_PATTERN.match(item.get('queue_sort', '')))
+
+    def candidates(self, table, index_name, feed_id, min_date=None):
+        # Entries at or after a random pivot, wrapping around to the start
+        key_condition = Key('queue_feed').eq(feed_id)
+        pivot = random_token()
+        yield from self._entries(table, index_name, key_condition & Key('queue_sort').gte(pivot))
+        yield from self._entries(table, index_name, key_condition & Key('queue_sort').lt(pivot))
+
+
+class ScoreFirst(SelectionPolicy):
+    """
+    Scores an item by how many of the feed's `score_keywords` its title
+    contains, unless the item already carries a `score`.
+    """
+    name = 'score'
+
+    def __init__(self, keywords=()):
+        self.keywords = [keyword.lower() for keyword in keywords]
+
+    def score(self, item):
+        if 'score' in item:
+            return int(item['score'])
+        title = item.get('title', '').lower()
+        return sum(1 for keyword in self.keywords if keyword in title)
+
+    def sort_key(self, item):
+        # Inverted so that an ascending query returns the highest score first
+        score = min(max(self.score(item), 0), SCORE_MAX)
+        return f"{SCORE_MAX - score:06d}#{item.get('dateAdded', '')}"
+
+    def candidates(self, table, index_name, feed_id, min_date=None):
+        # queue_sort ends with the date added, so old items are skipped
+        # without reading them
+        for entry in self._entries(table, index_name, Key('queue_feed').eq(feed_id)):
+            date = entry['queue_sort'].partition('#')[2]
+            if not min_date or not date or date > min_date:
+                yield entry
+
+
+POLICIES = {policy.name: policy for policy in (OldestFirst, FreshestFirst, Uniform, ScoreFirst)}
+
+
+def random_token():
+    return f"{random.getrandbits(64):016x}"
+
+
+def selection_policy(feed_config=None):
+    """
+    Return the selection policy configured for a feed.
+    """
+    feed_config = feed_config or {}
+    name = feed_config.get('selection') or config.DEFAULT_SELECTION_POLICY
+    if name not in POLICIES:
+        print(f"Unknown selection policy '{name}', using '{config.DEFAULT_SELECTION_POLICY}'")
+        name = config.DEFAULT_SELECTION_POLICY
+    if name == 'score':
+        return ScoreFirst(feed_config.get('score_keywords') or ())
+    return POLICIES[name]()
@@ -0,0 +1,144 @@
+"""
+Content-addressed cache of LLM summaries.
+
+A summary is keyed by the sha256 of the normalized full article text (not
+the condensed input sent to the LLM, which is only built on a miss), its
+title, the prompt version and the model, so the same article (retried
+after a failed post, or syndicated by several feeds) is only summarized
+once, while a prompt or model change gets fresh summaries.
+
+Two layers: an in-process LRU shared across warm invocations, and a
+durable DynamoDB table (SUMMARY_CACHE_TABLE_NAME, items expire through
+its TTL attribute) when that variable is set.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import clients
+import config
+
+
+def normalize_text(text):
+    """
+    Text as hashed for the cache key: NFC, whitespace collapsed.
+    """
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def summary_key(text, prompt_version, model, title=''):
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, normalize_text(title), normalize_text(text)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class DynamoSummaryStore:
+    """
+    Durable layer: one item per summary in the summary cache table, keyed
+    by `digest`.
+    """
+    def __init__(self, table_name):
+        self.table = clients.table(table_name)
+
+    def get(self, key):
+        item = self.table.get_item(Key={'digest': key}).get('Item')
+        return item['summary'] if item else None
+
+    def put(self, key, summary, model, prompt_version):
+        self.table.put_item(Item={
+            'digest': key,
+            'summary': summary,
+            'model': model,
+            'prompt_version': prompt_version,
+            'expires_at': int(time.time()) + config.SUMMARY_CACHE_TTL_DAYS * 86400,
+        })
+
+
+class SummaryCache:
+    def __init__(self, capacity=None, store=None):
+        self.capacity = capacity or config.SUMMARY_CACHE_SIZE
+        self.store = store
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {'local_hits': 0, 'durable_hits': 0, 'misses': 0, 'errors': 0}
+
+    def get(self, key):
+        """
+        Return the cached summary, None on a miss. Durable hits are kept in
+        the local layer too.
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.counters['local_hits'] += 1
+                return self.entries[key]
+
+        summary = None
+        if self.store is not None:
+            try:
+                summary = self.store.get(key)
+            except Exception as e:
+                print(f"Summary cache: durable read failed: {e}")
+                self._count('errors')
+        if summary is None:
+            self._count('misses')
+            return None
+        self._count('durable_hits')
+        self._remember(key, summary)
+        return summary
+
+    def put(self, key, summary, model='', prompt_version=''):
+        self._remember(key, summary)
+        if self.store is not None:
+            try:
+                self.store.put(key, summary, model, prompt_version)
+            except Exception as e:
+                print(f"Summary cache: durable write failed: {e}")
+                self._count('errors')
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, size=len(self.entries))
+
+    def _remember(self, key, summary):
+        with self.lock:
+            self.entries[key] = summary
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def _count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_summary_cache():
+    """
+    Return the process-wide summary cache, with the durable layer when
+    SUMMARY_CACHE_TABLE_NAME is set.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            table_name = os.environ.get('SUMMARY_CACHE_TABLE_NAME')
+            _cache = SummaryCache(store=DynamoSummaryStore(table_name) if table_name else None)
+        return _cache
+
+
+def clear_summary_cache():
+    """
+    Drop the process-wide cache and its counters (tests).
+    """
+    global _cache
+    with _cache_lock:
+        _cache = None
@@ -0,0 +1,43 @@
+"""
+Article pages for the extraction tests and benchmarks, served by FeedServer.
+
+Each kind of site works with different extraction strategies:
+
+- 'newspaper': plain paragraphs, every strategy extracts them
+- 'list': the article is a list, newspaper finds no text and only the
+  lxml extractor (html_text.py) does
+- 'blocked': answers 403 to browser user agents, only the curl-like
+  request gets the page
+"""
+SENTENCES = (
+    'Serverless functions now start in under fifty milliseconds after the runtime update, the team said.',
+    'The new release of the database adds vector search next to the regular indexes.',
+    'Engineers who tested the preview reported that tail latency dropped while costs stayed the same.',
+    'The change is available in every region and needs no migration from existing users.',
+)
+
+SITE_KINDS = ('newspaper', 'list', 'blocked')
+
+
+def article_page(title, kind='newspaper', paragraphs=4):
+    if kind == 'list':
+        body = '<ul>{}</ul>'.format(''.join(f'<li>{sentence}</li>' for sentence in SENTENCES * (paragraphs // 2 or 1)))
+    else:
+        body = ''.join(f'<p>{" ".join(SENTENCES)}</p>' for _ in range(paragraphs))
+    return (
+        f'<html><head><title>{title}</title></head>'
+        f'<body><nav><a href="/">Home</a></nav><article><h1>{title}</h1>{body}</article></body></html>'
+    ).encode('utf-8')
+
+
+def site_routes(kind, articles):
+    """
+    FeedServer routes of a site of `articles` articles at /article0...
+    """
+    routes = {}
+    for index in range(articles):
+        route = {'body': article_page(f'Article {index}', kind)}
+        if kind == 'blocked':
+            route['agent'] = 'curl'
+        routes[f'/article{index}'] = route
+    return routes
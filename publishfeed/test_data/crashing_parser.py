@@ -0,0 +1,14 @@
+"""
+parse_page stand-in for the parallel_enrich tests: the worker given
+/article1 exits, as if it was killed (e.g. out of memory). Defined here so
+that spawned workers can import it.
+"""
+import os
+
+from parallel_enrich import parse_page
+
+
+def parse_or_exit(url, title, content, feed_config=None):
+    if url.endswith('/article1'):
+        os._exit(1)
+    return parse_page(url, title, content, feed_config)
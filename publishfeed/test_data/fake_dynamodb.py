@@ -0,0 +1,244 @@
+import copy
+import math
+import re
+import zlib
+from types import SimpleNamespace
+
+from botocore.exceptions import ClientError
+
+
+class FakeBatchWriter:
+    def __init__(self, table):
+        self.table = table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def put_item(self, Item):
+        self.table.put_item(Item=Item)
+
+    def delete_item(self, Key):
+        self.table.delete_item(Key=Key)
+
+
+# Key condition operators understood by FakeTable.query
+CONDITIONS = {
+    '=': lambda value, args: value == args[0],
+    '<': lambda value, args: value < args[0],
+    '<=': lambda value, args: value <= args[0],
+    '>': lambda value, args: value > args[0],
+    '>=': lambda value, args: value >= args[0],
+    'BETWEEN': lambda value, args: args[0] <= value <= args[1],
+    'begins_with': lambda value, args: value.startswith(args[0]),
+}
+
+
+def item_size(item):
+    """
+    Approximate DynamoDB item size in bytes: attribute names plus values.
+    """
+    return sum(len(name) + len(str(value).encode('utf-8')) for name, value in item.items())
+
+
+def read_units(items):
+    """
+    Eventually consistent read units for reading `items` in one request
+    (0.5 per started 4 KB).
+    """
+    return max(math.ceil(sum(item_size(item) for item in items) / 4096), 1) * 0.5
+
+
+def _key_conditions(condition):
+    """
+    Flatten a boto3 key condition into [(attribute, operator, args)].
+    """
+    expression = condition.get_expression()
+    if expression['operator'] == 'AND':
+        return [c for part in expression['values'] for c in _key_conditions(part)]
+    key, *args = expression['values']
+    return [(key.name, expression['operator'], args)]
+
+
+class FakeTable:
+    """
+    In-memory stand-in for a boto3 DynamoDB Table, keyed by a single
+    partition key. `calls` counts the round trips made per operation,
+    `read_units` the read capacity gets and queries would consume, and
+    `page_size` (when set) limits the items returned per scan call.
+    `indexes` maps GSI names to their (partition key, sort key[, projected
+    attributes]): items without the partition key attribute are left out,
+    as in a sparse index, and when projected attributes are given (() for
+    KEYS_ONLY) queries return only those plus the keys.
+    """
+    def __init__(self, name, key='url', indexes=None):
+        self.name = name
+        self.key = key
+        self.indexes = indexes or {}
+        self.items = {}
+        self.calls = {}
+        self.read_units = 0.0
+        self.page_size = None
+
+    def _count(self, operation):
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+
+    def load(self):
+        pass
+
+    def get_item(self, Key, **kwargs):
+        self._count('get_item')
+        item = self.items.get(Key[self.key])
+        self.read_units += read_units([item] if item else [])
+        return {'Item': copy.deepcopy(item)} if item else {}
+
+    def put_item(self, Item, ConditionExpression=None, **kwargs):
+        # Only attribute_not_exists conditions on the key are supported
+        self._count('put_item')
+        if ConditionExpression is not None and Item[self.key] in self.items:
+            expression = ConditionExpression.get_expression()
+            assert expression['operator'] == 'attribute_not_exists'
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException',
+                                         'Message': 'The conditional request failed'}}, 'PutItem')
+        self.items[Item[self.key]] = copy.deepcopy(Item)
+        return {}
+
+    def delete_item(self, Key, **kwargs):
+        self._count('delete_item')
+        self.items.pop(Key[self.key], None)
+        return {}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeNames=None,
+                    ExpressionAttributeValues=None, **kwargs):
+        # Only "SET a = :v, ..." and "REMOVE a, ..." clauses are supported
+        self._count('update_item')
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        item = self.items.setdefault(Key[self.key], dict(Key))
+        for clause in re.split(r'\s+(?=(?:set|remove)\s)', UpdateExpression.strip(), flags=re.I):
+            action, _, body = clause.partition(' ')
+            for part in body.split(','):
+                if action.lower() == 'set':
+                    name, value = (token.strip() for token in part.split('='))
+                    item[names.get(name, name)] = copy.deepcopy(values[value])
+                else:
+                    item.pop(names.get(part.strip(), part.strip()), None)
+        return {}
+
+    def query(self, KeyConditionExpression, IndexName=None, Limit=None, ScanIndexForward=True,
+              ExclusiveStartKey=None, **kwargs):
+        """
+        Query the table or an index. `ScannedCount` is the number of items
+        read, to check a query stays within its partition; the last response
+        is kept in `last_query`.
+        """
+        self._count('query')
+        partition_key, sort_key, *projection = self.indexes[IndexName] if IndexName else (self.key, None)
+        conditions = _key_conditions(KeyConditionExpression)
+        matches = [
+            item for item in self.items.values()
+            if partition_key in item and all(
+                name in item and CONDITIONS[operator](item[name], args)
+                for name, operator, args in conditions
+            )
+        ]
+        if sort_key:
+            matches.sort(key=lambda item: (item.get(sort_key, ''), item[self.key]), reverse=not ScanIndexForward)
+        if ExclusiveStartKey:
+            keys = [item[self.key] for item in matches]
+            matches = matches[keys.index(ExclusiveStartKey[self.key]) + 1:]
+        page = matches[:Limit] if Limit else matches
+        if projection:
+            names = {self.key, partition_key, sort_key, *projection[0]}
+            page = [{name: value for name, value in item.items() if name in names} for item in page]
+        self.read_units += read_units(page)
+        response = {'Items': [copy.deepcopy(item) for item in page], 'Count': len(page),
+                    'ScannedCount': len(page)}
+        if Limit and len(matches) > Limit:
+            response['LastEvaluatedKey'] = {self.key: page[-1][self.key]}
+        self.last_query = response
+        return response
+
+    def index_size(self, index_name):
+        """
+        Number of items in a GSI.
+        """
+        return sum(1 for item in self.items.values() if self.indexes[index_name][0] in item)
+
+    def batch_writer(self, overwrite_by_pkeys=None):
+        return FakeBatchWriter(self)
+
+    def scan(self, ExclusiveStartKey=None, **kwargs):
+        # Pages of `page_size` items, like DynamoDB's 1 MB scan limit
+        self._count('scan')
+        keys = sorted(self.items)
+        start = keys.index(ExclusiveStartKey[self.key]) + 1 if ExclusiveStartKey else 0
+        page = keys[start:start + self.page_size] if self.page_size else keys[start:]
+        response = {'Items': [copy.deepcopy(self.items[key]) for key in page]}
+        if self.page_size and start + self.page_size < len(keys):
+            response['LastEvaluatedKey'] = {self.key: page[-1]}
+        return response
+
+
+class FakeDynamoDBClient:
+    """
+    Low-level client view of a FakeDynamoDBResource (resource.meta.client).
+    Only string attributes are serialized.
+    """
+    def __init__(self, resource):
+        self.resource = resource
+
+    def scan(self, TableName, Segment=0, TotalSegments=1, **kwargs):
+        self.resource.calls['scan'] = self.resource.calls.get('scan', 0) + 1
+        table = self.resource.Table(TableName)
+        items = [
+            {table.key: {'S': key}} for key in table.items
+            if zlib.crc32(key.encode('utf-8')) % TotalSegments == Segment
+        ]
+        return {'Items': items}
+
+
+class FakeDynamoDBResource:
+    """
+    In-memory stand-in for boto3.resource('dynamodb').
+
+    `batch_get_limit` caps how many keys a single batch_get_item call will
+    process; the rest come back as UnprocessedKeys, like a throttled table.
+    """
+    def __init__(self, keys=None, batch_get_limit=100, indexes=None):
+        self.keys = keys or {}
+        self.indexes = indexes or {}
+        self.tables = {}
+        self.batch_get_limit = batch_get_limit
+        self.calls = {}
+        self.meta = SimpleNamespace(client=FakeDynamoDBClient(self))
+
+    def Table(self, name):
+        if name not in self.tables:
+            self.tables[name] = FakeTable(name, key=self.keys.get(name, 'url'),
+                                          indexes=self.indexes.get(name))
+        return self.tables[name]
+
+    def batch_get_item(self, RequestItems, **kwargs):
+        self.calls['batch_get_item'] = self.calls.get('batch_get_item', 0) + 1
+        responses = {}
+        unprocessed = {}
+        budget = self.batch_get_limit
+        for table_name, request in RequestItems.items():
+            table = self.Table(table_name)
+            keys = request['Keys']
+            if len(keys) > 100:
+                raise ValueError('Too many items requested for the BatchGetItem call')
+            if len({key[table.key] for key in keys}) != len(keys):
+                raise ValueError('Provided list of item keys contains duplicates')
+            processed, rest = keys[:budget], keys[budget:]
+            budget -= len(processed)
+            responses[table_name] = [
+                {table.key: table.items[key[table.key]][table.key]}
+                for key in processed if key[table.key] in table.items
+            ]
+            if rest:
+                unprocessed[table_name] = dict(request, Keys=rest)
+        return {'Responses': responses, 'UnprocessedKeys': unprocessed}
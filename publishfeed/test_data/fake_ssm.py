@@ -0,0 +1,20 @@
+class FakeSSMClient:
+    """
+    In-memory stand-in for boto3.client('ssm'). `calls` counts the round
+    trips made per operation.
+    """
+    def __init__(self, parameters=None):
+        self.parameters = dict(parameters or {})
+        self.calls = {}
+
+    def get_parameters(self, Names, WithDecryption=False):
+        self.calls['get_parameters'] = self.calls.get('get_parameters', 0) + 1
+        if len(Names) > 10:
+            raise ValueError('Member must have length less than or equal to 10')
+        return {
+            'Parameters': [
+                {'Name': name, 'Value': self.parameters[name]}
+                for name in Names if name in self.parameters
+            ],
+            'InvalidParameters': [name for name in Names if name not in self.parameters],
+        }
@@ -0,0 +1,104 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RSS_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+<channel>
+<title>{name}</title>
+<link>http://example.com/{name}</link>
+<description>Test feed {name}</description>
+{items}
+</channel>
+</rss>
+"""
+
+ITEM_TEMPLATE = """<item>
+<title>{title}</title>
+<link>{link}</link>
+<pubDate>{date}</pubDate>
+</item>"""
+
+
+def rss_feed(name, entries):
+    """
+    Build an RSS document from a list of (title, link, rfc822 date) tuples.
+    """
+    items = "\n".join(
+        ITEM_TEMPLATE.format(title=title, link=link, date=date)
+        for title, link, date in entries
+    )
+    return RSS_TEMPLATE.format(name=name, items=items).encode('utf-8')
+
+
+class FeedServer:
+    """
+    Local HTTP server for tests.
+
+    `routes` maps a path to a dict with `body` (bytes), and optionally
+    `delay` (seconds), `status`, `headers`, `etag` (answered with a 304
+    when the client sends it back in If-None-Match) and `agent` (answered
+    with a 403 unless the User-Agent contains it). Every request is recorded in
+    `self.requests` as (path, headers) so tests can count network fetches.
+    """
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so tests can observe connection reuse
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                route = server.routes.get(self.path)
+                if route is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if route.get('delay'):
+                    time.sleep(route['delay'])
+                if route.get('agent') and route['agent'] not in self.headers.get('User-Agent', ''):
+                    self.send_response(403)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                etag = route.get('etag')
+                if etag and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                body = route.get('body', b'')
+                self.send_response(route.get('status', 200))
+                if etag:
+                    self.send_header('ETag', etag)
+                for name, value in route.get('headers', {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            # The default backlog of 5 drops concurrent connects (retried after 1s)
+            request_queue_size = 128
+
+        self.httpd = Server(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, path):
+        return "http://127.0.0.1:{}{}".format(self.httpd.server_address[1], path)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,150 @@
+"""
+Titles and the hashtags generate_hashtags_fuzzy gave them before it was
+rewritten around HashtagMatcher (the output of the per-phrase regex and
+fuzz.partial_ratio loop), as sorted lists.
+"""
+TITLES = [
+    "AWS announces new Graviton instances for EC2",
+    "Amazon Web Services expands Bedrock with Claude models",
+    "How to run Kubernetes on Fargate without the headaches",
+    "k8s 1.31 released: what's new for cluster operators",
+    "Kubernets security: five misconfigurations to avoid",
+    "Terrafrom vs. Pulumi: infrastructure as code compared",
+    "Google Cloud Platform adds Gemini to BigQuery",
+    "GCP and Azure race to host OpenAI workloads",
+    "ChatGPT gets memory; OpenAI explains the privacy model",
+    "Large language models in the public sector",
+    "LLMs and the future of search",
+    "Building an LLM-powered chatbot with SageMaker",
+    "Machine learning pipelines with Pandas and Scikit-learn",
+    "ML ops: from notebook to production",
+    "Model Context Protocol (MCP) servers explained",
+    "Serverless databases: Aurora Limitless vs. RDS",
+    "S3 Express One Zone cuts latency for analytics",
+    "CloudWatch Logs Insights now supports SQL queries",
+    "Open source maintainers and the CNCF",
+    "CNC machining meets robotics",
+    "Ransomware gang hits hospital; health records leaked",
+    "New malware targets Linux servers via SSH",
+    "Gartner Magic Quadrant for cloud computing 2025",
+    "Forrester: leadership and innovation in technology",
+    "Blockchain without the hype",
+    "Microsoft and GitHub announce Copilot updates",
+    "Trainium2 and Inferentia2 power cheaper inference",
+    "Transformers explained for software engineers",
+    "Microservices or monolith? It depends",
+    "Containers, devops, and compliance at scale",
+    "Foundational model evaluation at Google",
+    "TOFAG certification study guide",
+    "The algorithm behind recommendation feeds",
+    "Artificial intelligence regulation in the EU",
+    "A robot that folds laundry",
+    "Data engineering on a budget",
+    "Datadog vs. CloudWatch: a cost comparison",
+    "API design patterns for REST and gRPC",
+    "GPT-4o mini is cheaper and faster",
+    "Apple unveils new iPhone lineup",
+    "Weekly newsletter #42",
+    "Why we left the clouds",
+    "Cloudflare outage post-mortem",
+    "Kubernetes, Kubernetes, Kubernetes!",
+    "Sagemaker Studio gets a new IDE",
+    "Gemini 2.0 Flash and Gemini Pro benchmarks",
+    "Awsome tools for developers",
+    "Serverles functions cold starts measured",
+    "Mainframe modernization with AWS",
+    "Said the ML engineer: email marketing is dead",
+    "Healthcare data platforms",
+    "Airflow vs. Dagster for data pipelines",
+    "Terraform 1.9 adds input validation improvements",
+    "The Claude 3.5 Sonnet release notes",
+    "Pandemic-era supply chains",
+    "",
+    "!!!",
+    "AI",
+    "ai ai ai",
+    "Paid subscriptions at Google",
+    "Rust for Linux kernel drivers",
+    "Inference at the edge: robots and drones",
+    "Dataset licensing for foundation models",
+    "Observability with OpenTelemetry and CloudWatch",
+    "State of DevOps report",
+    "Complying with GDPR: a compliance checklist",
+    "Tech layoffs continue at Microsoft",
+    "Scikit-learn 1.5 released",
+    "Public-sector cloud adoption",
+    "Secure your API keys in GitHub Actions",
+]
+
+GOLDEN_HASHTAGS = {
+    'AWS announces new Graviton instances for EC2': ['#AWS', '#EC2'],
+    'Amazon Web Services expands Bedrock with Claude models': ['#AWS', '#Bedrock', '#Claude'],
+    'How to run Kubernetes on Fargate without the headaches': ['#Fargate', '#Kubernetes'],
+    "k8s 1.31 released: what's new for cluster operators": ['#Kubernetes'],
+    'Kubernets security: five misconfigurations to avoid': ['#Kubernetes'],
+    'Terrafrom vs. Pulumi: infrastructure as code compared': ['#Terraform'],
+    'Google Cloud Platform adds Gemini to BigQuery': ['#Cloud', '#GCP', '#Gemini', '#Google'],
+    'GCP and Azure race to host OpenAI workloads': ['#AI', '#Azure', '#GCP', '#OpenAI'],
+    'ChatGPT gets memory; OpenAI explains the privacy model': ['#AI', '#ChatGPT', '#GPT', '#OpenAI'],
+    'Large language models in the public sector': ['#LLM', '#PublicSector'],
+    'LLMs and the future of search': ['#LLM'],
+    'Building an LLM-powered chatbot with SageMaker': ['#LLM', '#SageMaker'],
+    'Machine learning pipelines with Pandas and Scikit-learn': ['#ML', '#Pandas', '#Scikit'],
+    'ML ops: from notebook to production': ['#ML'],
+    'Model Context Protocol (MCP) servers explained': ['#AI', '#MCP'],
+    'Serverless databases: Aurora Limitless vs. RDS': ['#Aurora', '#RDS', '#data', '#database', '#serverless'],
+    'S3 Express One Zone cuts latency for analytics': ['#S3'],
+    'CloudWatch Logs Insights now supports SQL queries': ['#Cloud', '#CloudWatch', '#SQL'],
+    'Open source maintainers and the CNCF': ['#AI', '#CNCF', '#OpenSource'],
+    'CNC machining meets robotics': ['#CNCF', '#robot'],
+    'Ransomware gang hits hospital; health records leaked': ['#RDS', '#health', '#ransomware'],
+    'New malware targets Linux servers via SSH': ['#Linux', '#malware'],
+    'Gartner Magic Quadrant for cloud computing 2025': ['#Cloud', '#CloudComputing', '#Gartner'],
+    'Forrester: leadership and innovation in technology': ['#Forrester', '#innovation', '#leadership', '#technology'],
+    'Blockchain without the hype': ['#AI', '#blockchain'],
+    'Microsoft and GitHub announce Copilot updates': ['#GitHub', '#Microsoft'],
+    'Trainium2 and Inferentia2 power cheaper inference': ['#AI', '#Inferentia', '#Trainium'],
+    'Transformers explained for software engineers': ['#AI', '#transformers'],
+    'Microservices or monolith? It depends': ['#microservices'],
+    'Containers, devops, and compliance at scale': ['#AI', '#DevOps', '#compliance', '#containers'],
+    'Foundational model evaluation at Google': ['#FM', '#Google'],
+    'TOFAG certification study guide': ['#TOGAF'],
+    'The algorithm behind recommendation feeds': ['#algorithm'],
+    'Artificial intelligence regulation in the EU': ['#AI'],
+    'A robot that folds laundry': ['#robot'],
+    'Data engineering on a budget': ['#data'],
+    'Datadog vs. CloudWatch: a cost comparison': ['#Cloud', '#CloudWatch', '#data'],
+    'API design patterns for REST and gRPC': ['#API'],
+    'GPT-4o mini is cheaper and faster': ['#GPT'],
+    'Apple unveils new iPhone lineup': [],
+    'Weekly newsletter #42': [],
+    'Why we left the clouds': ['#Cloud'],
+    'Cloudflare outage post-mortem': ['#Cloud'],
+    'Kubernetes, Kubernetes, Kubernetes!': ['#Kubernetes'],
+    'Sagemaker Studio gets a new IDE': ['#SageMaker'],
+    'Gemini 2.0 Flash and Gemini Pro benchmarks': ['#Gemini'],
+    'Awsome tools for developers': ['#AWS'],
+    'Serverles functions cold starts measured': ['#serverless'],
+    'Mainframe modernization with AWS': ['#AI', '#AWS'],
+    'Said the ML engineer: email marketing is dead': ['#AI', '#ML'],
+    'Healthcare data platforms': ['#data', '#health'],
+    'Airflow vs. Dagster for data pipelines': ['#AI', '#data'],
+    'Terraform 1.9 adds input validation improvements': ['#Terraform'],
+    'The Claude 3.5 Sonnet release notes': ['#Claude'],
+    'Pandemic-era supply chains': ['#AI'],
+    '': [],
+    '!!!': [],
+    'AI': ['#AI', '#OpenAI', '#Trainium', '#blockchain', '#containers'],
+    'ai ai ai': ['#AI'],
+    'Paid subscriptions at Google': ['#AI', '#Google'],
+    'Rust for Linux kernel drivers': ['#Linux'],
+    'Inference at the edge: robots and drones': ['#robot'],
+    'Dataset licensing for foundation models': ['#FM', '#data', '#database'],
+    'Observability with OpenTelemetry and CloudWatch': ['#Cloud', '#CloudWatch'],
+    'State of DevOps report': ['#DevOps'],
+    'Complying with GDPR: a compliance checklist': ['#compliance'],
+    'Tech layoffs continue at Microsoft': ['#Microsoft'],
+    'Scikit-learn 1.5 released': ['#Scikit'],
+    'Public-sector cloud adoption': ['#Cloud', '#PublicSector'],
+    'Secure your API keys in GitHub Actions': ['#API', '#GitHub'],
+}
@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def stub_summary(prompt):
+    article = prompt.rsplit('Article content:', 1)[-1]
+    return ' '.join(article.split()[:8])
+
+
+class StubLLM:
+    """
+    Provider for llm_client.LLMClient answering with the first words of the
+    article. Counts its invocations in `calls` and keeps the prompts in
+    `prompts`; `error`, when set, is raised instead.
+    """
+    model = 'stub-model'
+
+    def __init__(self, error=None, model=None):
+        self.calls = 0
+        self.prompts = []
+        self.error = error
+        self.model = model or self.model
+        self.lock = threading.Lock()
+
+    def complete(self, prompt, max_tokens, timeout, temperature=0.8):
+        with self.lock:
+            self.calls += 1
+            self.prompts.append(prompt)
+        if self.error is not None:
+            raise self.error
+        return stub_summary(prompt)
+
+
+class LLMServer:
+    """
+    Local OpenAI compatible chat completions server for tests.
+
+    Every answer takes `latency` seconds. The first `failures` requests get
+    `failure_status` instead (with a `retry_after` Retry-After header). Requests are recorded in
+    `self.requests` as (headers, body), and the most requests in flight at
+    once in `self.peak`.
+    """
+    def __init__(self, latency=0, failures=0, failure_status=429, retry_after='0'):
+        self.latency = latency
+        self.failures = failures
+        self.failure_status = failure_status
+        self.retry_after = retry_after
+        self.requests = []
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with server.lock:
+                    server.requests.append((dict(self.headers), body))
+                    failing = len(server.requests) <= server.failures
+                    server.in_flight += 1
+                    server.peak = max(server.peak, server.in_flight)
+                try:
+                    time.sleep(server.latency)
+                    if failing:
+                        self._send(server.failure_status, {'error': {'message': 'stub failure'}},
+                                   {'Retry-After': server.retry_after})
+                    else:
+                        content = stub_summary(body['messages'][-1]['content'])
+                        self._send(200, {'choices': [{'message': {'role': 'assistant', 'content': content}}]})
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 128
+
+        self.httpd = Server(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def api_base(self):
+        return "http://127.0.0.1:{}/v1".format(self.httpd.server_address[1])
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
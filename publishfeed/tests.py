@@ -5,7 +5,52 @@ import sqlalchemy
 from sqlalchemy.orm import sessionmaker
 from unittest.mock import MagicMock
 from test_data.feedparser_data import fake_response
-from helpers import RSSContentHelper, FeedSetHelper
+from helpers import EnrichmentHelper, RSSContentHelper, FeedSetHelper
+from fetch_engine import FeedFetcher
+from fetch_state import FileFetchStateStore
+from dynamo_ops import ENRICH_INDEX, QUEUE_INDEX, DynamoDBOps
+from management.backfill_queue_index import backfill_table
+from management.canonicalize_urls import canonicalize_table
+from selection import selection_policy
+from test_data.fake_dynamodb import FakeDynamoDBResource
+from test_data.fake_ssm import FakeSSMClient
+from test_data.stub_llm import LLMServer, StubLLM
+from llm_client import DeadlineExceeded, LLMAuthError, LLMClient, LLMError, OpenAIChatProvider, RateLimiter
+from summary_cache import DynamoSummaryStore, SummaryCache, clear_summary_cache, get_summary_cache
+import llm_helpers
+from condense import condense, estimate_tokens
+from local_summarizer import summarize_local
+from enrichment import enrich_items, summarize_texts
+from extraction_memo import DynamoExtractionStore, ExtractionMemo, clear_extraction_memo, domain_of, get_extraction_memo
+from html_text import extract_text
+import parallel_enrich
+from generate_hashtags_fuzzy import HashtagMatcher, clear_matchers, dictionary_version, feed_matcher, get_matcher
+from generate_hashtags_fuzzy import generate_hashtags_batch, generate_hashtags_fuzzy
+from parallel_enrich import enrich_parallel
+from page_cache import DiskPageStore, PageCache, get_page_cache, reset_page_cache
+from munch import munchify
+from seen_filter import BloomFilter, SeenFilterStore
+from canonical import canonicalize_url, item_identity
+from config_snapshot import FeedConfig, META_FEED_ID, clear_config_snapshot, load_config_snapshot
+import clients
+import http_client
+import httpx
+import requests
+import json
+import tweepy
+from config_loader import LINKEDIN_PARAMETER, ConfigLoader, clear_secrets, ssm_calls, twitter_parameter
+import lambda_fetch
+from test_data.feed_server import FeedServer, rss_feed
+from test_data.article_pages import site_routes
+from test_data.crashing_parser import parse_or_exit
+from test_data.hashtag_titles import GOLDEN_HASHTAGS, TITLES
+import os
+import random
+import tempfile
+import time
+import warnings
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
 
 class TestFeedSet(unittest.TestCase):
     def setUp(self):
@@ -79,5 +124,1565 @@ class TestFeedSet(unittest.TestCase):
 
         self.assertEqual(len(self.session.query(RSSContent).all()), items_count, "Entries count has changed")
 
+class TestFeedFetcher(unittest.TestCase):
+    DATE = 'Mon, 06 Jan 2025 10:00:00 GMT'
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def feed_routes(self, slow_count, fast_count, delay):
+        routes = {}
+        for i in range(slow_count):
+            routes[f'/slow{i}'] = {'delay': delay, 'body': rss_feed(f'slow{i}', [
+                (f'Slow {i}', f'http://example.com/slow/{i}', self.DATE)])}
+        for i in range(fast_count):
+            routes[f'/fast{i}'] = {'body': rss_feed(f'fast{i}', [
+                (f'Fast {i}', f'http://example.com/fast/{i}', self.DATE)])}
+        return routes
+
+    def test_wall_clock_tracks_slowest_feed(self):
+        delay = 0.5
+        with FeedServer(self.feed_routes(6, 4, delay)) as server:
+            urls = [server.url(path) for path in server.routes]
+            fetcher = FeedFetcher(max_concurrency=10, per_host_concurrency=10)
+            started = time.monotonic()
+            results = list(fetcher.fetch(urls))
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(len(results), len(urls))
+        self.assertTrue(all(r.status == 200 for r in results))
+        # Serial fetching would take 6 * delay
+        self.assertLess(elapsed, 3 * delay)
+        # Fast feeds are handed back before the slow ones finish
+        self.assertTrue(all('/fast' in r.url for r in results[:4]))
+
+    def test_per_host_limit(self):
+        delay = 0.3
+        with FeedServer(self.feed_routes(3, 0, delay)) as server:
+            urls = [server.url(path) for path in server.routes]
+            fetcher = FeedFetcher(max_concurrency=10, per_host_concurrency=1)
+            started = time.monotonic()
+            list(fetcher.fetch(urls))
+            elapsed = time.monotonic() - started
+
+        self.assertGreaterEqual(elapsed, 3 * delay)
+
+    def test_errors_are_reported_per_url(self):
+        with FeedServer(self.feed_routes(0, 1, 0)) as server:
+            urls = [server.url('/fast0'), server.url('/missing'), 'http://127.0.0.1:1/closed']
+            results = {r.url: r for r in FeedFetcher().fetch(urls)}
+
+        self.assertEqual(results[urls[0]].status, 200)
+        self.assertEqual(results[urls[1]].status, 404)
+        self.assertIsNotNone(results[urls[2]].error)
+
+    @unittest.mock.patch('helpers.ConfigLoader')
+    @unittest.mock.patch('helpers.DynamoDBOps')
+    def test_get_pages_from_feeds(self, db_ops_class, config_loader_class):
+        db_ops = db_ops_class.return_value
+        db_ops.check_rss_items_exist.side_effect = lambda urls: {
+            url for url in urls if url == 'http://example.com/fast/0'}
+        with FeedServer(self.feed_routes(1, 2, 0.1)) as server:
+            config_loader_class.return_value.load_feed_config.return_value = {
+                'urls': [server.url(path) for path in server.routes]}
+            state_path = os.path.join(self.tmp_dir.name, 'fetch_state.json')
+            helper = FeedSetHelper('TestFeed', fetch_state_store=FileFetchStateStore(state_path))
+            helper.get_pages_from_feeds()
+
+        db_ops.batch_write_rss_items.assert_called_once()
+        items = db_ops.batch_write_rss_items.call_args[0][0]
+        self.assertEqual(sorted(item['link'] for item in items),
+                         ['http://example.com/fast/1', 'http://example.com/slow/0'])
+        self.assertTrue(all(item['feed_id'] == 'TestFeed' for item in items))
+
+
+    @unittest.mock.patch('helpers.ConfigLoader')
+    @unittest.mock.patch('helpers.DynamoDBOps')
+    def test_conditional_get_skips_unchanged_feeds(self, db_ops_class, config_loader_class):
+        db_ops = db_ops_class.return_value
+        db_ops.check_rss_items_exist.return_value = set()
+        db_ops.batch_write_rss_items.return_value = True
+        routes = self.feed_routes(0, 2, 0)
+        routes['/fast0']['etag'] = '"v1"'
+        state_path = os.path.join(self.tmp_dir.name, 'fetch_state.json')
+
+        with FeedServer(routes) as server:
+            config_loader_class.return_value.load_feed_config.return_value = {
+                'urls': [server.url('/fast0'), server.url('/fast1')]}
+            first = FeedSetHelper('TestFeed', fetch_state_store=FileFetchStateStore(state_path))
+            first_stats = first.get_pages_from_feeds()
+            checks = db_ops.check_rss_items_exist.call_count
+
+            second = FeedSetHelper('TestFeed', fetch_state_store=FileFetchStateStore(state_path))
+            second_stats = second.get_pages_from_feeds()
+
+        self.assertEqual(first_stats['parsed'], 2)
+        self.assertEqual(second_stats['not_modified'], 1)
+        self.assertEqual(second_stats['unchanged'], 1)
+        self.assertEqual(second_stats['parsed'], 0)
+        self.assertEqual(db_ops.check_rss_items_exist.call_count, checks)
+        second_requests = dict(server.requests[-2:])
+        self.assertEqual(second_requests['/fast0'].get('If-None-Match'), '"v1"')
+
+
+class TestBatchedExistenceChecks(unittest.TestCase):
+    def setUp(self):
+        self.resource = FakeDynamoDBResource()
+        self.enterContext(clients.override('dynamodb', self.resource))
+        self.db_ops = DynamoDBOps()
+        for i in range(0, 250, 5):
+            self.db_ops.rss_table.put_item(Item={'url': f'http://example.com/{i}'})
+
+    def test_chunks_and_dedupes(self):
+        urls = [f'http://example.com/{i}' for i in range(250)]
+        existing = self.db_ops.check_rss_items_exist(urls + urls[:50])
+
+        self.assertEqual(existing, {f'http://example.com/{i}' for i in range(0, 250, 5)})
+        self.assertEqual(self.resource.calls['batch_get_item'], 3)
+
+    def test_retries_unprocessed_keys(self):
+        self.resource.batch_get_limit = 30
+        urls = [f'http://example.com/{i}' for i in range(100)]
+        existing = self.db_ops.check_rss_items_exist(urls)
+
+        self.assertEqual(len(existing), 20)
+        self.assertEqual(self.resource.calls['batch_get_item'], 4)
+
+    def test_incomplete_check_returns_none(self):
+        urls = [f'http://example.com/{i}' for i in range(100)]
+        self.resource.batch_get_limit = 10
+        self.assertIsNone(self.db_ops.check_rss_items_exist(urls))
+        with unittest.mock.patch.object(self.resource, 'batch_get_item', side_effect=RuntimeError('throttled')):
+            self.assertIsNone(self.db_ops.check_rss_items_exist(urls))
+
+    @unittest.mock.patch('helpers.ConfigLoader')
+    def test_failed_check_never_overwrites_stored_items(self, config_loader_class):
+        entries = munchify([{'link': f'http://example.com/new{i}', 'title': f'Title {i}'} for i in range(4)])
+        for entry in entries[:2]:
+            self.db_ops.rss_table.put_item(Item={'url': item_identity(entry), 'status': 'published'})
+        with unittest.mock.patch('helpers.DynamoDBOps', return_value=self.db_ops):
+            helper = FeedSetHelper('TestFeed', fetch_state_store=unittest.mock.Mock())
+        helper.seen_keys = set()
+
+        with unittest.mock.patch.object(self.resource, 'batch_get_item', side_effect=RuntimeError('throttled')):
+            new_items = helper._new_items_from_entries(entries)
+        saved, ok = helper._save_new_items(new_items)
+
+        self.assertTrue(ok)
+        self.assertEqual([item['url'] for item in saved], [item_identity(entry) for entry in entries[2:]])
+        for entry in entries[:2]:
+            stored = self.db_ops.rss_table.get_item(Key={'url': item_identity(entry)})['Item']
+            self.assertEqual(stored, {'url': item_identity(entry), 'status': 'published'})
+        self.assertEqual(helper.duplicates, 2)
+
+    @unittest.mock.patch('helpers.ConfigLoader')
+    def test_one_round_trip_per_feed(self, config_loader_class):
+        entries = munchify([
+            {'link': f'http://example.com/{i}', 'title': f'Title {i}'} for i in range(150)
+        ])
+        with unittest.mock.patch('helpers.DynamoDBOps', return_value=self.db_ops):
+            helper = FeedSetHelper('TestFeed', fetch_state_store=unittest.mock.Mock())
+        helper.seen_keys = set()
+        new_items = helper._new_items_from_entries(entries)
+
+        # Two aliases per entry (raw and canonical link): 300 keys in 3 calls
+        self.assertEqual(len(new_items), 120)
+        self.assertEqual(self.resource.calls['batch_get_item'], 3)
+        self.assertNotIn('get_item', self.db_ops.rss_table.calls)
+
+
+class TestHighWaterMark(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.state_path = os.path.join(self.tmp_dir.name, 'fetch_state.json')
+
+    def entries(self, days):
+        return [(f'Post {day}', f'http://example.com/{day}', f'Mon, {day:02d} Jan 2025 10:00:00 GMT')
+                for day in days]
+
+    def run_twice(self, first_days, second_days):
+        routes = {'/feed': {'body': rss_feed('feed', self.entries(first_days))}}
+        with unittest.mock.patch('helpers.ConfigLoader') as config_loader_class, \
+                unittest.mock.patch('helpers.DynamoDBOps') as db_ops_class, \
+                FeedServer(routes) as server:
+            db_ops = db_ops_class.return_value
+            db_ops.check_rss_items_exist.side_effect = lambda urls: set()
+            db_ops.batch_write_rss_items.return_value = True
+            config_loader_class.return_value.load_feed_config.return_value = {'urls': [server.url('/feed')]}
+
+            FeedSetHelper('TestFeed', fetch_state_store=FileFetchStateStore(self.state_path)).get_pages_from_feeds()
+            routes['/feed']['body'] = rss_feed('feed', self.entries(second_days))
+            db_ops.check_rss_items_exist.reset_mock()
+            stats = FeedSetHelper('TestFeed', fetch_state_store=FileFetchStateStore(self.state_path)).get_pages_from_feeds()
+        checked = db_ops.check_rss_items_exist.call_args[0][0]
+        return stats, checked
+
+    def test_ordered_feed_stops_at_mark(self):
+        stats, checked = self.run_twice([5, 4, 3], [7, 6, 5, 4, 3])
+
+        self.assertEqual({canonicalize_url(url) for url in checked},
+                         {'https://example.com/7', 'https://example.com/6'})
+        self.assertEqual(stats['below_mark'], 3)
+
+    def test_unordered_feed_falls_back_to_full_scan(self):
+        stats, checked = self.run_twice([5, 4, 3], [4, 7, 5, 6, 3])
+
+        self.assertEqual(len({canonicalize_url(url) for url in checked}), 5)
+        self.assertEqual(stats['below_mark'], 0)
+
+
+class TestSeenFilter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.resource = FakeDynamoDBResource()
+        self.enterContext(clients.override('dynamodb', self.resource))
+        self.db_ops = DynamoDBOps()
+
+    def test_no_false_negatives_and_round_trip(self):
+        bloom = BloomFilter.for_capacity(1000, fp_rate=0.01)
+        urls = [f'http://example.com/{i}' for i in range(1000)]
+        for url in urls:
+            bloom.add(url)
+        restored = BloomFilter.from_bytes(bloom.to_bytes())
+
+        self.assertTrue(all(url in restored for url in urls))
+        false_positives = sum(f'http://example.org/{i}' in restored for i in range(10000))
+        self.assertLess(false_positives / 10000, 0.03)
+        self.assertEqual(restored.count, 1000)
+
+    def test_memory_budget(self):
+        bloom = BloomFilter.for_capacity(1000000, fp_rate=0.001, max_bytes=64 * 1024)
+        self.assertEqual(len(bloom.bits), 64 * 1024)
+
+    def test_rejects_unknown_versions(self):
+        blob = bytearray(BloomFilter.for_capacity(10).to_bytes())
+        blob[5] = 99
+        with self.assertRaises(ValueError):
+            BloomFilter.from_bytes(bytes(blob))
+
+    def test_rebuild_from_parallel_scan(self):
+        for i in range(50):
+            self.db_ops.rss_table.put_item(Item={'url': f'http://example.com/{i}'})
+        local_path = os.path.join(self.tmp_dir.name, 'seen_filter.bin')
+        store = SeenFilterStore(self.db_ops, bucket='', local_path=local_path)
+
+        bloom = store.load()
+        self.assertEqual(self.resource.calls['scan'], 4)
+        self.assertTrue(all(f'http://example.com/{i}' in bloom for i in range(50)))
+
+        # The local copy is used on the next load
+        self.assertEqual(store.load().count, 50)
+        self.assertEqual(self.resource.calls['scan'], 4)
+
+    @unittest.mock.patch('helpers.ConfigLoader')
+    def test_only_maybe_seen_links_hit_dynamodb(self, config_loader_class):
+        bloom = BloomFilter.for_capacity(1000)
+        for i in range(10):
+            self.db_ops.rss_table.put_item(Item={'url': f'http://example.com/{i}'})
+            bloom.add(f'http://example.com/{i}')
+        entries = munchify([
+            {'link': f'http://example.com/{i}', 'title': f'Title {i}'} for i in range(20)
+        ])
+        with unittest.mock.patch('helpers.DynamoDBOps', return_value=self.db_ops):
+            helper = FeedSetHelper('TestFeed', fetch_state_store=unittest.mock.Mock(), seen_filter=bloom)
+        helper.seen_keys = set()
+        with unittest.mock.patch.object(self.db_ops, 'check_rss_items_exist',
+                                        wraps=self.db_ops.check_rss_items_exist) as check:
+            new_items = helper._new_items_from_entries(entries)
+
+        self.assertEqual(len(new_items), 10)
+        looked_up = check.call_args[0][0]
+        self.assertLessEqual(len(looked_up), 12)
+        self.assertEqual(helper.definitely_new, 40 - len(looked_up))
+
+    @unittest.mock.patch('helpers.ConfigLoader')
+    def test_filter_misses_never_overwrite_stored_items(self, config_loader_class):
+        # Stored by another writer, the filter never saw them
+        entries = munchify([{'link': f'http://example.com/{i}', 'title': f'Title {i}'} for i in range(4)])
+        for entry in entries[:2]:
+            self.db_ops.rss_table.put_item(Item={'url': item_identity(entry), 'status': 'published'})
+        bloom = BloomFilter.for_capacity(1000)
+        with unittest.mock.patch('helpers.DynamoDBOps', return_value=self.db_ops):
+            helper = FeedSetHelper('TestFeed', fetch_state_store=unittest.mock.Mock(), seen_filter=bloom)
+        helper.seen_keys = set()
+
+        saved, ok = helper._save_new_items(helper._new_items_from_entries(entries))
+        self.assertTrue(ok)
+        self.assertEqual([item['url'] for item in saved], [item_identity(entry) for entry in entries[2:]])
+        for entry in entries[:2]:
+            stored = self.db_ops.rss_table.get_item(Key={'url': item_identity(entry)})['Item']
+            self.assertEqual(stored, {'url': item_identity(entry), 'status': 'published'})
+            self.assertIn(item_identity(entry), bloom)
+        self.assertEqual(helper.duplicates, 2)
+
+
+class TestCanonicalization(unittest.TestCase):
+    def test_canonicalize_url(self):
+        variants = [
+            'http://www.example.com/post/?utm_source=rss&utm_medium=feed',
+            'https://example.com/post#comments',
+            'https://EXAMPLE.com:443/post/',
+            'https://www.google.com/url?q=https://example.com/post/%3Futm_campaign%3Dx&sa=D',
+        ]
+        self.assertEqual({canonicalize_url(url) for url in variants}, {'https://example.com/post'})
+        self.assertEqual(canonicalize_url('https://example.com/p?b=2&a=1&fbclid=x'),
+                         'https://example.com/p?a=1&b=2')
+
+    def test_identity_prefers_guid(self):
+        self.assertEqual(item_identity({'id': 'tag:example.com,2025:42', 'link': 'https://example.com/a'}),
+                         'guid:example.com:tag:example.com,2025:42')
+        self.assertEqual(item_identity({'id': 'http://example.com/?p=42', 'link': 'https://example.com/a'}),
+                         'https://example.com?p=42')
+        self.assertEqual(item_identity({'link': 'https://example.com/a/?utm_source=x'}),
+                         'https://example.com/a')
+
+    @unittest.mock.patch('helpers.ConfigLoader')
+    def test_duplicates_across_feeds_and_legacy_rows(self, config_loader_class):
+        resource = FakeDynamoDBResource()
+        with clients.override('dynamodb', resource):
+            db_ops = DynamoDBOps()
+        # Row written before canonicalization, keyed by its raw link
+        db_ops.rss_table.put_item(Item={'url': 'http://example.com/old/?utm_source=rss'})
+        feed_a = munchify([
+            {'link': 'https://example.com/new?utm_source=a', 'title': 'New'},
+            {'link': 'http://example.com/old/?utm_source=rss', 'title': 'Old'},
+        ])
+        feed_b = munchify([{'link': 'http://www.example.com/new/', 'title': 'New again'}])
+        with unittest.mock.patch('helpers.DynamoDBOps', return_value=db_ops):
+            helper = FeedSetHelper('TestFeed', fetch_state_store=unittest.mock.Mock())
+        helper.seen_keys = set()
+        new_items = helper._new_items_from_entries(feed_a) + helper._new_items_from_entries(feed_b)
+
+        self.assertEqual([(item['url'], item['link']) for item in new_items],
+                         [('https://example.com/new', 'https://example.com/new?utm_source=a')])
+        self.assertEqual(helper.duplicates, 2)
+
+    @unittest.mock.patch('helpers.ConfigLoader')
+    def test_numeric_guids_of_different_sites_do_not_collide(self, config_loader_class):
+        resource = FakeDynamoDBResource()
+        with clients.override('dynamodb', resource):
+            db_ops = DynamoDBOps()
+        feed_a = munchify([{'id': '1234', 'link': 'https://a.example.com/post', 'title': 'A'}])
+        feed_b = munchify([{'id': '1234', 'link': 'https://www.b.example.org/story?utm_source=rss', 'title': 'B'}])
+        with unittest.mock.patch('helpers.DynamoDBOps', return_value=db_ops):
+            helper_a = FeedSetHelper('FeedA', fetch_state_store=unittest.mock.Mock())
+            helper_b = FeedSetHelper('FeedB', fetch_state_store=unittest.mock.Mock())
+        helper_a.seen_keys = set()
+        helper_b.seen_keys = set()
+        self.assertTrue(db_ops.batch_write_rss_items(helper_a._new_items_from_entries(feed_a)))
+        new_items = helper_b._new_items_from_entries(feed_b)
+
+        self.assertEqual([item['url'] for item in new_items], ['guid:b.example.org:1234'])
+        self.assertEqual(set(db_ops.rss_table.items), {'guid:a.example.com:1234'})
+        self.assertEqual(helper_b.duplicates, 0)
+
+    def test_canonicalize_table_scopes_legacy_guids(self):
+        table = FakeDynamoDBResource().Table('RSSContent')
+        table.put_item(Item={'url': 'guid:1234', 'link': 'https://a.example.com/post', 'status': 'published'})
+        table.put_item(Item={'url': 'guid:a.example.com:99', 'link': 'https://a.example.com/99'})
+        table.put_item(Item={'url': 'https://example.com/post', 'link': 'https://example.com/post'})
+
+        self.assertEqual(canonicalize_table(table), (3, 1, 0))
+        self.assertEqual(table.items['guid:a.example.com:1234'],
+                         {'url': 'guid:a.example.com:1234', 'link': 'https://a.example.com/post',
+                          'status': 'published'})
+        self.assertEqual(set(table.items),
+                         {'guid:a.example.com:1234', 'guid:a.example.com:99', 'https://example.com/post'})
+        # Running it again changes nothing
+        self.assertEqual(canonicalize_table(table)[1:], (0, 0))
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        http_client.reset_stats()
+
+    def test_connections_are_reused(self):
+        routes = {f'/page{i}': {'body': b'<html>page</html>'} for i in range(5)}
+        with FeedServer(routes) as server:
+            for path in routes:
+                self.assertEqual(http_client.get(server.url(path)).content, b'<html>page</html>')
+            stats = http_client.stats()
+
+        self.assertEqual(stats['requests'], 5)
+        self.assertEqual(stats['connections'], 1)
+        self.assertEqual(stats['reused'], 4)
+
+    def test_size_cap(self):
+        routes = {'/big': {'body': b'x' * 5000}}
+        with FeedServer(routes) as server:
+            with self.assertRaises(http_client.ResponseTooLarge):
+                http_client.get(server.url('/big'), max_bytes=1000)
+            self.assertEqual(len(http_client.get(server.url('/big')).content), 5000)
+
+    def test_http2_path_behaves_like_requests(self):
+        routes = {'/page': {'body': b'<html>page</html>'}, '/slow': {'body': b'late', 'delay': 1},
+                  '/gone': {'body': b'gone', 'status': 404}}
+        with FeedServer(routes) as server, \
+                unittest.mock.patch('http_client._use_http2', return_value=True), \
+                unittest.mock.patch('http_client._get_http2_client', return_value=httpx.Client()):
+            response = http_client.get(server.url('/page'))
+            self.assertIsInstance(response, requests.Response)
+            self.assertTrue(response.ok)
+            self.assertEqual(response.content, b'<html>page</html>')
+            self.assertEqual(response.headers['content-length'], '17')
+
+            with self.assertRaises(requests.HTTPError):
+                http_client.get(server.url('/gone')).raise_for_status()
+            with self.assertRaises(requests.Timeout):
+                http_client.get(server.url('/slow'), timeout=(1, 0.2))
+            with self.assertRaises(http_client.ResponseTooLarge):
+                http_client.get(server.url('/page'), max_bytes=5)
+            # Raw bytes are sent as the body, without httpx's deprecation of data=bytes
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', DeprecationWarning)
+                self.assertEqual(http_client.put(server.url('/page'), data=b'image').status_code, 501)
+
+    def test_feed_fetcher_reports_to_counters(self):
+        routes = {f'/feed{i}': {'body': b'<rss/>'} for i in range(3)}
+        with FeedServer(routes) as server:
+            list(FeedFetcher(per_host_concurrency=1).fetch([server.url(path) for path in routes]))
+
+        self.assertEqual(http_client.stats()['requests'], 3)
+        self.assertEqual(http_client.stats()['connections'], 1)
+
+
+class FakeLambdaContext:
+    invoked_function_arn = 'arn:aws:lambda:us-east-1:123456789012:function:RssFeedStack-FetchFeedFunction'
+
+    def __init__(self, seconds):
+        self.deadline = time.monotonic() + seconds
+
+    def get_remaining_time_in_millis(self):
+        return int((self.deadline - time.monotonic()) * 1000)
+
+
+class TestDeadlineAwareFetch(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cursor_store = FileFetchStateStore(os.path.join(self.tmp_dir.name, 'fetch_state.json'))
+        for name, value in [('FETCH_DEADLINE_MARGIN', 0.2), ('FETCH_MIN_FEED_TIME', 0.1),
+                            ('FETCH_FEED_TIME_BUDGET', 0.5)]:
+            patcher = unittest.mock.patch.object(config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_stops_before_deadline_and_resumes(self):
+        processed = []
+
+        class SlowHelper:
+            def __init__(self, feed_id, feed_config=None, seen_filter=None, db_ops=None):
+                self.feed_id = feed_id
+                self.done_urls = []
+
+            def get_pages_from_feeds(self, deadline=None, skip_urls=()):
+                time.sleep(0.3)
+                processed.append(self.feed_id)
+                return {'deferred': 0, 'new_items': 1}
+
+        feeds = [FeedConfig({'feed_id': f'feed{i}'}) for i in range(5)]
+        with unittest.mock.patch('lambda_fetch.FeedSetHelper', SlowHelper):
+            started = time.monotonic()
+            totals, complete = lambda_fetch.fetch_feeds(feeds, FakeLambdaContext(1.0), self.cursor_store)
+            elapsed = time.monotonic() - started
+
+            self.assertFalse(complete)
+            self.assertLess(elapsed, 1.0)
+            first_run = list(processed)
+            self.assertEqual(self.cursor_store.get(lambda_fetch.CURSOR_KEY)['done_feeds'], first_run)
+
+            totals, complete = lambda_fetch.fetch_feeds(feeds, FakeLambdaContext(5.0), self.cursor_store)
+
+        self.assertTrue(complete)
+        self.assertEqual(sorted(processed), [f'feed{i}' for i in range(5)])
+        self.assertEqual(totals['new_items'], 5 - len(first_run))
+        self.assertEqual(self.cursor_store.get(lambda_fetch.CURSOR_KEY), {})
+
+    def test_stale_cursor_starts_a_new_run(self):
+        processed = []
+
+        class QuickHelper:
+            def __init__(self, feed_id, feed_config=None, seen_filter=None, db_ops=None):
+                self.feed_id = feed_id
+                self.done_urls = []
+
+            def get_pages_from_feeds(self, deadline=None, skip_urls=()):
+                processed.append((self.feed_id, list(skip_urls)))
+                return {'deferred': 0}
+
+        feeds = [FeedConfig({'feed_id': f'feed{i}'}) for i in range(3)]
+        started_at = (datetime.now() - timedelta(seconds=config.FETCH_CURSOR_MAX_AGE + 60)).isoformat()
+        # A run cut short, then resumed by the next daily run, that never finished
+        self.cursor_store.put(lambda_fetch.CURSOR_KEY, {'started_at': started_at, 'done_feeds': ['feed0', 'feed1'],
+                                                        'partial': {'feed2': ['https://example.com/feed']}})
+        with unittest.mock.patch('lambda_fetch.FeedSetHelper', QuickHelper):
+            totals, complete = lambda_fetch.fetch_feeds(feeds, FakeLambdaContext(5.0), self.cursor_store)
+
+        self.assertTrue(complete)
+        # From scratch, the feeds the old run never got to first
+        self.assertEqual(processed, [('feed2', []), ('feed0', []), ('feed1', [])])
+
+        # A recent cursor is still resumed
+        recent = datetime.now().isoformat()
+        self.cursor_store.put(lambda_fetch.CURSOR_KEY, {'started_at': recent, 'done_feeds': ['feed0', 'feed1'],
+                                                        'partial': {}})
+        processed.clear()
+        with unittest.mock.patch('lambda_fetch.FeedSetHelper', QuickHelper):
+            lambda_fetch.fetch_feeds(feeds, FakeLambdaContext(5.0), self.cursor_store)
+        self.assertEqual(processed, [('feed2', [])])
+        # The daily schedule resumes a paused run rather than abandoning it
+        self.assertGreater(config.FETCH_CURSOR_MAX_AGE, 24 * 3600)
+
+    def test_seen_filter_saved_after_each_feed(self):
+        class AddingHelper:
+            def __init__(self, feed_id, feed_config=None, seen_filter=None, db_ops=None):
+                self.feed_id = feed_id
+                self.seen_filter = seen_filter
+                self.done_urls = []
+
+            def get_pages_from_feeds(self, deadline=None, skip_urls=()):
+                if self.feed_id != 'feed1':
+                    self.seen_filter.add(f'https://example.com/{self.feed_id}')
+                return {'deferred': 0}
+
+        bloom = BloomFilter.for_capacity(100)
+        store = unittest.mock.Mock()
+        saved = []
+        store.save.side_effect = lambda bloom: saved.append(bloom.count)
+        feeds = [FeedConfig({'feed_id': f'feed{i}'}) for i in range(3)]
+        with unittest.mock.patch('lambda_fetch.FeedSetHelper', AddingHelper):
+            lambda_fetch.fetch_feeds(feeds, FakeLambdaContext(5.0), self.cursor_store, bloom, None, store)
+        self.assertEqual(saved, [1, 2])
+
+    @unittest.mock.patch('helpers.ConfigLoader')
+    @unittest.mock.patch('helpers.DynamoDBOps')
+    def test_slow_urls_are_deferred(self, db_ops_class, config_loader_class):
+        db_ops_class.return_value.check_rss_items_exist.return_value = set()
+        db_ops_class.return_value.batch_write_rss_items.return_value = True
+        date = 'Mon, 06 Jan 2025 10:00:00 GMT'
+        routes = {
+            '/fast': {'body': rss_feed('fast', [('Fast', 'http://example.com/fast', date)])},
+            '/slow': {'delay': 2, 'body': rss_feed('slow', [('Slow', 'http://example.com/slow', date)])},
+        }
+        with FeedServer(routes) as server:
+            urls = [server.url('/slow'), server.url('/fast')]
+            config_loader_class.return_value.load_feed_config.return_value = {'urls': urls}
+            feeds = [FeedConfig({'feed_id': 'TestFeed'})]
+            with unittest.mock.patch('lambda_fetch.FeedSetHelper',
+                                     lambda feed_id, feed_config=None, seen_filter=None, db_ops=None: FeedSetHelper(
+                                         feed_id, fetch_state_store=self.cursor_store)):
+                started = time.monotonic()
+                totals, complete = lambda_fetch.fetch_feeds(feeds, FakeLambdaContext(0.7), self.cursor_store)
+                elapsed = time.monotonic() - started
+
+        self.assertFalse(complete)
+        self.assertLess(elapsed, 1.5)
+        self.assertEqual(totals['deferred'], 1)
+        self.assertEqual(self.cursor_store.get(lambda_fetch.CURSOR_KEY)['partial'],
+                         {'TestFeed': [server.url('/fast')]})
+
+
+class TestConfigSnapshot(unittest.TestCase):
+    def setUp(self):
+        clear_config_snapshot()
+        self.addCleanup(clear_config_snapshot)
+        self.resource = FakeDynamoDBResource(keys={'FeedConfigurations': 'feed_id'})
+        with clients.override('dynamodb', self.resource):
+            self.db_ops = DynamoDBOps()
+        self.table = self.resource.Table('FeedConfigurations')
+        self.table.page_size = 10
+        for i in range(25):
+            self.table.put_item(Item={'feed_id': f'feed{i:02d}', 'urls': [f'http://example.com/{i}']})
+        self.table.put_item(Item={'feed_id': META_FEED_ID, 'version': 'v1'})
+        self.table.calls.clear()
+
+    def test_scan_follows_pagination(self):
+        snapshot = load_config_snapshot(self.db_ops)
+
+        self.assertEqual(len(snapshot), 25)
+        self.assertEqual(self.table.calls['scan'], 3)
+        self.assertIsNone(snapshot.get(META_FEED_ID))
+        self.assertEqual(snapshot.get('feed24').urls, ['http://example.com/24'])
+        self.assertEqual(snapshot.version, 'v1')
+
+    def test_warm_invocations_reuse_snapshot(self):
+        first = load_config_snapshot(self.db_ops, ttl=60)
+        second = load_config_snapshot(self.db_ops, ttl=60)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.table.calls, {'scan': 3})
+
+    def test_expired_snapshot_checks_version(self):
+        first = load_config_snapshot(self.db_ops, ttl=0)
+        self.assertIs(load_config_snapshot(self.db_ops, ttl=0), first)
+        self.assertEqual(self.table.calls, {'scan': 3, 'get_item': 1})
+
+        self.table.put_item(Item={'feed_id': 'feed99', 'urls': []})
+        self.table.put_item(Item={'feed_id': META_FEED_ID, 'version': 'v2'})
+        refreshed = load_config_snapshot(self.db_ops, ttl=0)
+
+        self.assertEqual(len(refreshed), 26)
+        self.assertEqual(refreshed.version, 'v2')
+
+    def test_helper_uses_given_config(self):
+        snapshot = load_config_snapshot(self.db_ops)
+        with unittest.mock.patch('helpers.ConfigLoader') as config_loader_class, \
+                unittest.mock.patch('helpers.DynamoDBOps'):
+            helper = FeedSetHelper('feed03', feed_config=snapshot.get('feed03'))
+
+        config_loader_class.return_value.load_feed_config.assert_not_called()
+        self.assertEqual(helper.feed_config['urls'], ['http://example.com/3'])
+
+
+class TestClientRegistry(unittest.TestCase):
+    def setUp(self):
+        clients.clear()
+        self.addCleanup(clients.clear)
+        self.boto3 = self.enterContext(unittest.mock.patch('clients.boto3'))
+
+    def test_helpers_share_boto3_clients(self):
+        feed_config = FeedConfig({'feed_id': 'TestFeed', 'urls': []})
+        for feed_id in ('feed1', 'feed2', 'feed3'):
+            RSSContentHelper(feed_id, feed_config=feed_config)
+            FeedSetHelper(feed_id, feed_config=feed_config, fetch_state_store=unittest.mock.Mock())
+
+        self.boto3.resource.assert_called_once_with('dynamodb')
+        self.boto3.client.assert_called_once_with('ssm')
+
+    @unittest.mock.patch('twitter.tweepy.Client')
+    def test_twitter_client_rebuilt_only_when_secrets_change(self, tweepy_client):
+        secrets = {'consumer_key': 'a', 'consumer_secret': 'b', 'access_key': 'c', 'access_secret': 'd'}
+        first = clients.twitter('feed1', secrets)
+
+        self.assertIs(clients.twitter('feed1', dict(secrets)), first)
+        self.assertIsNot(clients.twitter('feed2', secrets), first)
+        rotated = clients.twitter('feed1', dict(secrets, access_secret='e'))
+        self.assertIsNot(rotated, first)
+        self.assertEqual(tweepy_client.call_count, 3)
+
+    def test_override_is_scoped(self):
+        fake = unittest.mock.Mock()
+        with clients.override('client:ssm', fake):
+            self.assertIs(clients.client('ssm'), fake)
+            with clients.override('client:ssm', 'inner'):
+                self.assertEqual(clients.client('ssm'), 'inner')
+            self.assertIs(clients.client('ssm'), fake)
+        self.assertIs(clients.client('ssm'), self.boto3.client.return_value)
+
+
+class TestSecretsCache(unittest.TestCase):
+    def setUp(self):
+        clear_secrets()
+        self.addCleanup(clear_secrets)
+        self.ssm = FakeSSMClient({
+            twitter_parameter(f'feed{i}'): json.dumps({'consumer_key': f'key{i}'}) for i in range(25)
+        })
+        self.ssm.parameters[LINKEDIN_PARAMETER] = json.dumps({'access_token': 'token'})
+        self.enterContext(clients.override('client:ssm', self.ssm))
+        self.loader = ConfigLoader(db_ops=unittest.mock.Mock())
+
+    def test_prefetch_batches_every_secret(self):
+        feed_ids = [f'feed{i}' for i in range(25)] + ['missing']
+        self.loader.prefetch_secrets(feed_ids)
+        self.assertEqual(self.ssm.calls['get_parameters'], 3)
+
+        for feed_id in feed_ids:
+            self.loader.load_secrets(feed_id)
+            self.loader.load_linkedin_secrets()
+        self.assertIsNone(self.loader.load_openai_key())
+        self.assertEqual(self.loader.load_secrets('feed7'), {'consumer_key': 'key7'})
+        self.assertIsNone(self.loader.load_secrets('missing'))
+        self.assertEqual(self.ssm.calls['get_parameters'], 3)
+        self.assertEqual(ssm_calls(), 3)
+
+    def test_ttl_and_invalidation(self):
+        self.loader.prefetch_secrets(['feed1'])
+        self.ssm.parameters[twitter_parameter('feed1')] = json.dumps({'consumer_key': 'rotated'})
+
+        self.assertEqual(self.loader.load_secrets('feed1'), {'consumer_key': 'key1'})
+        self.loader.invalidate_secrets(twitter_parameter('feed1'))
+        self.assertEqual(self.loader.load_secrets('feed1'), {'consumer_key': 'rotated'})
+        self.assertEqual(self.ssm.calls['get_parameters'], 2)
+
+        with unittest.mock.patch.object(config, 'SECRETS_TTL', 0):
+            self.loader.load_linkedin_secrets()
+        self.assertEqual(self.ssm.calls['get_parameters'], 3)
+
+    def test_rejected_twitter_credentials_are_reloaded(self):
+        twitter = unittest.mock.Mock()
+        twitter.update_status.side_effect = tweepy.errors.Unauthorized(
+            unittest.mock.Mock(status_code=401, reason='Unauthorized', json=dict))
+        self.enterContext(clients.override('twitter', twitter))
+        helper = RSSContentHelper('feed1', feed_config=FeedConfig({'feed_id': 'feed1'}),
+                                  db_ops=unittest.mock.Mock())
+        helper.db_ops.select_unpublished_item.return_value = {
+            'url': 'https://example.com/a', 'title': 'Title'}
+        with unittest.mock.patch('enrichment.extract_article_text', return_value=''), \
+                unittest.mock.patch('enrichment.thumbnail_url', return_value=''), \
+                unittest.mock.patch.object(helper, '_post_to_linkedin'):
+            helper.tweet_rsscontent()
+            helper.tweet_rsscontent()
+
+        helper.db_ops.mark_as_published.assert_not_called()
+        self.assertEqual(self.ssm.calls['get_parameters'], 2)
+
+
+class TestFeedQueue(unittest.TestCase):
+    def setUp(self):
+        self.resource = FakeDynamoDBResource(indexes={'RSSContent': {QUEUE_INDEX: ('queue_feed', 'queue_sort', ())}})
+        self.enterContext(clients.override('dynamodb', self.resource))
+        self.db_ops = DynamoDBOps()
+        self.table = self.resource.Table('RSSContent')
+
+    def _add_items(self, feed_id, count):
+        self.db_ops.batch_write_rss_items([
+            {'url': f'https://{feed_id}.example.com/{i}', 'title': f'{feed_id} {i}',
+             'dateAdded': f'2025-01-{i % 28 + 1:02d}T10:00:00', 'feed_id': feed_id}
+            for i in range(count)
+        ])
+
+    def test_feeds_only_publish_their_own_items(self):
+        self._add_items('feedA', 3)
+        self._add_items('feedB', 3)
+
+        published = []
+        while True:
+            item = self.db_ops.select_unpublished_item('feedA')
+            if item is None:
+                break
+            published.append(item)
+            self.db_ops.mark_as_published(item['url'])
+
+        self.assertEqual(len(published), 3)
+        self.assertTrue(all(item['feed_id'] == 'feedA' for item in published))
+        self.assertEqual(self.db_ops.select_unpublished_item('feedB')['feed_id'], 'feedB')
+        self.assertEqual(self.table.items[published[0]['url']]['status'], 'published')
+        self.assertNotIn('queue_feed', self.table.items[published[0]['url']])
+
+    def test_only_chosen_item_read_in_full(self):
+        self._add_items('feedA', 10)
+        self.table.calls.clear()
+
+        item = self.db_ops.select_unpublished_item('feedA')
+
+        self.assertEqual(set(self.table.last_query['Items'][0]), {'url', 'queue_feed', 'queue_sort'})
+        self.assertIn('title', item)
+        self.assertLessEqual(self.table.calls['query'], 2)
+        self.assertEqual(self.table.calls['get_item'], 1)
+
+    def test_index_size_tracks_backlog(self):
+        self._add_items('feedA', 100)
+        for i in range(60):
+            self.db_ops.mark_as_published(f'https://feedA.example.com/{i}')
+        self.assertEqual(self.table.index_size(QUEUE_INDEX), 40)
+
+        self._add_items('feedB', 50)
+        for i in range(50):
+            self.db_ops.mark_as_published(f'https://feedB.example.com/{i}')
+        self.assertEqual(len(self.table.items), 150)
+        self.assertEqual(self.table.index_size(QUEUE_INDEX), 40)
+
+    def test_min_date_and_query_cost_independent_of_other_feeds(self):
+        self._add_items('feedA', 10)
+        self.table.calls.clear()
+        item = self.db_ops.select_unpublished_item('feedA', min_date='2025-01-09')
+        self.assertGreater(item['dateAdded'], '2025-01-09')
+        # Older items are passed over, not taken out of the queue
+        self.assertNotIn('update_item', self.table.calls)
+        self.assertEqual(self.table.index_size(QUEUE_INDEX), 10)
+        older = [item for item in self.table.items.values() if item['dateAdded'] < '2025-01-09']
+        self.assertTrue(all(item['status'] == 'unpublished' and 'queue_feed' in item for item in older))
+
+        self.db_ops.select_unpublished_item('feedA')
+        alone = self.table.last_query['ScannedCount']
+        for i in range(50):
+            self._add_items(f'other{i}', 20)
+        self.db_ops.select_unpublished_item('feedA')
+        self.assertEqual(self.table.last_query['ScannedCount'], alone)
+
+    def test_backfill(self):
+        self.table.put_item(Item={'url': 'https://example.com/a', 'feed_id': 'feedA', 'status': 'unpublished',
+                                  'dateAdded': '2025-01-01T00:00:00'})
+        self.table.put_item(Item={'url': 'https://example.com/b', 'feed_id': 'feedA', 'status': 'published',
+                                  'dateAdded': '2025-01-02T00:00:00', 'feed_status': 'feedA#published',
+                                  'queue_feed': 'feedA', 'queue_sort': '2025-01-02T00:00:00'})
+        self.table.put_item(Item={'url': 'https://example.com/c', 'status': 'unpublished'})
+        self.table.put_item(Item={'url': 'https://example.com/d', 'status': 'published'})
+
+        self.assertEqual(backfill_table(self.table, dry_run=True), (4, 2, 1))
+        self.assertIsNone(self.db_ops.select_unpublished_item('feedA'))
+        self.assertEqual(backfill_table(self.table), (4, 2, 1))
+        self.assertEqual(backfill_table(self.table), (4, 0, 1))
+        self.assertEqual(self.db_ops.select_unpublished_item('feedA')['url'], 'https://example.com/a')
+        self.assertEqual(self.table.index_size(QUEUE_INDEX), 1)
+        self.assertNotIn('feed_status', self.table.items['https://example.com/b'])
+
+
+class TestSelectionPolicies(unittest.TestCase):
+    def setUp(self):
+        self.resource = FakeDynamoDBResource(indexes={'RSSContent': {QUEUE_INDEX: ('queue_feed', 'queue_sort', ())}})
+        self.enterContext(clients.override('dynamodb', self.resource))
+        self.db_ops = DynamoDBOps()
+        self.table = self.resource.Table('RSSContent')
+        self.titles = ['Python tips', 'Cloud news', 'Python and AWS on the cloud', 'Gardening']
+
+    def _add_items(self, policy, count=4):
+        self.db_ops.batch_write_rss_items([
+            {'url': f'https://example.com/{i}', 'title': self.titles[i % len(self.titles)],
+             'dateAdded': f'2025-01-{i + 1:02d}T10:00:00', 'feed_id': 'feedA'}
+            for i in range(count)
+        ], policy)
+
+    def _publish_order(self, policy):
+        order = []
+        while True:
+            item = self.db_ops.select_unpublished_item('feedA', policy)
+            if item is None:
+                return order
+            order.append(item['url'].rsplit('/', 1)[1])
+            self.db_ops.mark_as_published(item['url'])
+
+    def test_ordered_policies(self):
+        for feed_config, expected in [
+            ({'selection': 'oldest'}, ['0', '1', '2', '3']),
+            ({'selection': 'freshest'}, ['3', '2', '1', '0']),
+            ({'selection': 'score', 'score_keywords': ['python', 'cloud']}, ['2', '0', '1', '3']),
+        ]:
+            self.table.items.clear()
+            policy = selection_policy(FeedConfig(dict(feed_config, feed_id='feedA')))
+            self._add_items(policy)
+            self.assertEqual(self._publish_order(policy), expected, feed_config)
+
+    def test_min_date_with_policies_not_ordered_by_date(self):
+        for feed_config in [{'selection': 'score', 'score_keywords': ['python', 'cloud']},
+                            {'selection': 'uniform'}]:
+            self.table.items.clear()
+            policy = selection_policy(FeedConfig(dict(feed_config, feed_id='feedA')))
+            self._add_items(policy, count=8)
+            self.table.calls.clear()
+            for _ in range(10):
+                item = self.db_ops.select_unpublished_item('feedA', policy, min_date='2025-01-06')
+                self.assertGreater(item['dateAdded'], '2025-01-06', feed_config)
+            self.assertNotIn('update_item', self.table.calls)
+            self.assertEqual(self.table.index_size(QUEUE_INDEX), 8)
+
+    def test_uniform_reaches_whole_backlog_with_constant_reads(self):
+        random.seed(7)
+        policy = selection_policy({'selection': 'uniform'})
+        self.db_ops.batch_write_rss_items([
+            {'url': f'https://example.com/{i}', 'title': 'Title', 'feed_id': 'feedA',
+             'dateAdded': f'2025-01-01T10:{i // 60:02d}:{i % 60:02d}'}
+            for i in range(200)
+        ], policy)
+        self.table.calls.clear()
+
+        picked = [int(self.db_ops.select_unpublished_item('feedA', policy)['url'].rsplit('/', 1)[1])
+                  for _ in range(100)]
+
+        # Not just the oldest items, as with the earlier 50 oldest sample
+        self.assertGreater(len(set(picked)), 50)
+        self.assertTrue(any(position >= 150 for position in picked))
+        self.assertLessEqual(self.table.calls['query'], 200)
+        self.assertEqual(self.table.calls['get_item'], 100)
+
+    def test_default_and_unknown_policies(self):
+        with unittest.mock.patch.object(config, 'DEFAULT_SELECTION_POLICY', 'freshest'):
+            self.assertEqual(selection_policy(FeedConfig({'feed_id': 'feedA'})).name, 'freshest')
+            self.assertEqual(selection_policy({'selection': 'bogus'}).name, 'freshest')
+
+    def test_backfill_rekeys_for_new_policy(self):
+        self._add_items(selection_policy({'selection': 'oldest'}))
+        policy = selection_policy({'selection': 'freshest'})
+        self.assertEqual(backfill_table(self.table, policies={'feedA': policy}), (4, 0, 0))
+
+        uniform = selection_policy({'selection': 'uniform'})
+        self.assertEqual(backfill_table(self.table, policies={'feedA': uniform}), (4, 4, 0))
+        self.assertTrue(all(uniform.is_current(item) for item in self.table.items.values()))
+
+
+class TestEnrichment(unittest.TestCase):
+    def setUp(self):
+        self.resource = FakeDynamoDBResource(indexes={'RSSContent': {
+            QUEUE_INDEX: ('queue_feed', 'queue_sort', ()),
+            ENRICH_INDEX: ('enrich_feed', 'dateAdded', ()),
+        }})
+        self.enterContext(clients.override('dynamodb', self.resource))
+        self.db_ops = DynamoDBOps()
+        self.table = self.resource.Table('RSSContent')
+        self.feed = FeedConfig({'feed_id': 'feedA', 'hashtags': '#feedA', 'selection': 'oldest'})
+        self.db_ops.batch_write_rss_items([
+            {'url': f'https://example.com/{i}', 'link': f'https://example.com/{i}?utm_source=rss',
+             'title': f'Kubernetes release {i}', 'dateAdded': f'2025-01-0{i + 1}T10:00:00', 'feed_id': 'feedA'}
+            for i in range(3)
+        ], selection_policy(self.feed))
+        self.extract = self.enterContext(unittest.mock.patch(
+            'enrichment.extract_article_text', return_value='Article text ' * 20))
+        self.summarize = self.enterContext(unittest.mock.patch(
+            'enrichment.summarize_many',
+            side_effect=lambda texts, titles, deadline=None: ['Kubernetes ships a release' if text else ''
+                                                              for text in texts]))
+        self.enterContext(unittest.mock.patch('enrichment.thumbnail_url', return_value='https://example.com/a.png'))
+
+        self.twitter = unittest.mock.Mock()
+        self.linkedin = unittest.mock.Mock()
+        self.enterContext(clients.override('twitter', self.twitter))
+        self.enterContext(clients.override('linkedin', self.linkedin))
+        loader = unittest.mock.Mock()
+        loader.load_secrets.return_value = {'consumer_key': 'key'}
+        loader.load_linkedin_secrets.return_value = {'access_token': 'token'}
+        self.enterContext(unittest.mock.patch('helpers.ConfigLoader', return_value=loader))
+
+    def test_new_items_are_enriched_once(self):
+        self.assertEqual(self.table.index_size(ENRICH_INDEX), 3)
+
+        helper = EnrichmentHelper('feedA', feed_config=self.feed, db_ops=self.db_ops)
+        stats = helper.enrich_pending()
+        self.assertEqual(stats, {'pending': 3, 'enriched': 3, 'failed': 0, 'deferred': 0})
+        self.assertEqual(set(helper.timings), {'hashtags', 'extract', 'summarize', 'thumbnail', 'render'})
+        self.assertEqual(self.table.index_size(ENRICH_INDEX), 0)
+
+        item = self.table.items['https://example.com/0']
+        self.assertEqual(item['enrich_state'], 'enriched')
+        self.assertEqual(len(item['text_digest']), 64)
+        self.assertEqual(item['summary'], 'Kubernetes ships a release')
+        self.assertIn('#Kubernetes', item['hashtags'])
+        self.assertEqual(item['thumbnail_url'], 'https://example.com/a.png')
+        self.assertEqual(item['posts']['twitter'],
+                         'Kubernetes ships a release \n\nhttps://example.com/0?utm_source=rss ')
+        # Still queued for publishing
+        self.assertEqual(item['queue_feed'], 'feedA')
+
+        self.assertEqual(helper.enrich_pending()['pending'], 0)
+        self.assertEqual(self.extract.call_count, 3)
+
+    def test_publish_only_reads_and_posts_enriched_items(self):
+        EnrichmentHelper('feedA', feed_config=self.feed, db_ops=self.db_ops).enrich_pending()
+        self.extract.reset_mock()
+        self.summarize.reset_mock()
+
+        helper = RSSContentHelper('feedA', feed_config=self.feed, db_ops=self.db_ops)
+        helper.tweet_rsscontent()
+
+        self.extract.assert_not_called()
+        self.summarize.assert_not_called()
+        stored = self.table.items['https://example.com/0']
+        self.twitter.update_status.assert_called_once_with(stored['posts']['twitter'])
+        self.linkedin.post.assert_called_once_with(
+            stored['title'], stored['link'], 'Kubernetes ships a release', 'https://example.com/a.png')
+        self.assertEqual(stored['status'], 'published')
+        self.assertEqual(set(helper.timings), {'select', 'secrets', 'linkedin', 'twitter', 'mark_published'})
+
+    def test_unenriched_item_is_enriched_inline(self):
+        self.extract.return_value = ''
+        helper = RSSContentHelper('feedA', feed_config=self.feed, db_ops=self.db_ops)
+        helper.tweet_rsscontent()
+
+        stored = self.table.items['https://example.com/0']
+        self.assertEqual(stored['enrich_state'], 'enriched')
+        self.assertNotIn('enrich_feed', stored)
+        self.summarize.assert_not_called()
+        # Fallback post: title, hashtags, link and the feed's hashtags
+        tweet = self.twitter.update_status.call_args[0][0]
+        self.assertTrue(tweet.startswith('Kubernetes release 0\n#Kubernetes'))
+        self.assertTrue(tweet.endswith('https://example.com/0?utm_source=rss #feedA'))
+        self.assertIn('extract', helper.timings)
+        self.assertEqual(stored['status'], 'published')
+
+    def test_deadline_leaves_items_queued(self):
+        helper = EnrichmentHelper('feedA', feed_config=self.feed, db_ops=self.db_ops)
+        stats = helper.enrich_pending(deadline=time.monotonic() - 1)
+        self.assertEqual(stats['deferred'], 3)
+        self.assertEqual(self.table.index_size(ENRICH_INDEX), 3)
+
+    def test_failed_enrichment_is_left_to_publish(self):
+        self.extract.side_effect = RuntimeError('boom')
+        stats = EnrichmentHelper('feedA', feed_config=self.feed, db_ops=self.db_ops).enrich_pending(limit=1)
+        self.assertEqual(stats['failed'], 1)
+        failed = self.table.items['https://example.com/2']
+        self.assertEqual(failed['enrich_state'], 'failed')
+        self.assertNotIn('enrich_feed', failed)
+
+    def test_partly_saved_batch_only_retries_the_rest(self):
+        save_enrichment = self.db_ops.save_enrichment
+        calls = []
+
+        def flaky_save(url, attributes):
+            calls.append(url)
+            if len(calls) == 2:
+                raise RuntimeError('throttled')
+            save_enrichment(url, attributes)
+
+        with unittest.mock.patch.object(self.db_ops, 'save_enrichment', side_effect=flaky_save):
+            stats = EnrichmentHelper('feedA', feed_config=self.feed, db_ops=self.db_ops).enrich_pending()
+
+        self.assertEqual(stats, {'pending': 3, 'enriched': 3, 'failed': 0, 'deferred': 0})
+        # The item saved before the error is not enriched again
+        self.assertEqual(calls.count('https://example.com/2'), 1)
+        self.assertEqual(self.extract.call_count, 5)
+        self.assertEqual(self.table.index_size(ENRICH_INDEX), 0)
+
+
+class TestSummaryCache(unittest.TestCase):
+    ARTICLE = 'Kubernetes 1.33 ships sidecar containers as stable. ' * 40
+
+    def setUp(self):
+        self.resource = FakeDynamoDBResource(keys={'SummaryCache': 'digest'})
+        self.enterContext(clients.override('dynamodb', self.resource))
+        self.enterContext(unittest.mock.patch.dict(os.environ, {'SUMMARY_CACHE_TABLE_NAME': 'SummaryCache'}))
+        clear_summary_cache()
+        self.addCleanup(clear_summary_cache)
+        self.llm = StubLLM()
+        self.enterContext(clients.override('llm', LLMClient(self.llm)))
+
+    def test_hit_skips_the_llm(self):
+        first = llm_helpers.summarize_text(self.ARTICLE)
+        # Same text, other whitespace
+        second = llm_helpers.summarize_text('  ' + self.ARTICLE.replace(' ', '\n  '))
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.llm.calls, 1)
+        stats = get_summary_cache().stats()
+        self.assertEqual((stats['misses'], stats['local_hits']), (1, 1))
+
+    def test_durable_layer_survives_a_cold_start(self):
+        llm_helpers.summarize_text(self.ARTICLE)
+        clear_summary_cache() # new Lambda container
+
+        llm_helpers.summarize_text(self.ARTICLE)
+        llm_helpers.summarize_text(self.ARTICLE)
+
+        self.assertEqual(self.llm.calls, 1)
+        stats = get_summary_cache().stats()
+        self.assertEqual((stats['durable_hits'], stats['local_hits'], stats['misses']), (1, 1, 0))
+        self.assertEqual(len(self.resource.Table('SummaryCache').items), 1)
+
+    def test_prompt_version_and_model_are_part_of_the_key(self):
+        llm_helpers.summarize_text(self.ARTICLE)
+        with unittest.mock.patch('llm_helpers.SUMMARY_PROMPT_VERSION', '2'):
+            llm_helpers.summarize_text(self.ARTICLE)
+        other_model = StubLLM(model='gpt-4o-mini')
+        with clients.override('llm', LLMClient(other_model)):
+            llm_helpers.summarize_text(self.ARTICLE)
+        self.assertEqual(self.llm.calls + other_model.calls, 3)
+
+    def test_key_is_the_full_text_not_the_condensed_input(self):
+        # Both articles condense to the same prompt, but are different articles
+        other = self.ARTICLE + '\n\nA late paragraph says the release was postponed.'
+        with unittest.mock.patch.object(config, 'LLM_INPUT_TOKEN_BUDGET', 15):
+            llm_helpers.summarize_text(self.ARTICLE)
+            llm_helpers.summarize_text(other)
+            self.assertEqual(self.llm.prompts[0], self.llm.prompts[1])
+            self.assertEqual(self.llm.calls, 2)
+
+            # Hits are not condensed again
+            with unittest.mock.patch('llm_helpers.condense') as condense_mock:
+                llm_helpers.summarize_text(other)
+            condense_mock.assert_not_called()
+        self.assertEqual(self.llm.calls, 2)
+
+    def test_failures_are_not_cached(self):
+        self.llm.error = RuntimeError('rate limited')
+        self.assertEqual(llm_helpers.summarize_text(self.ARTICLE), '')
+        self.llm.error = None
+        self.assertTrue(llm_helpers.summarize_text(self.ARTICLE))
+        self.assertEqual(self.llm.calls, 2)
+
+    def test_local_layer_is_lru(self):
+        cache = SummaryCache(capacity=2, store=DynamoSummaryStore('SummaryCache'))
+        for key in ('a', 'b', 'c'):
+            cache.put(key, key.upper())
+        self.assertEqual(list(cache.entries), ['b', 'c'])
+        self.assertEqual(cache.get('a'), 'A') # from the durable layer
+        self.assertEqual(list(cache.entries), ['c', 'a'])
+        self.assertEqual(cache.stats()['durable_hits'], 1)
+
+
+class TestCondense(unittest.TestCase):
+    TITLE = 'Kubernetes 1.33 makes sidecar containers stable'
+
+    def article(self):
+        filler = ' '.join(f'Unrelated sentence number {i} about the weather and lunch.' for i in range(8))
+        paragraphs = [
+            'The Kubernetes project released version 1.33 today. Sidecar containers are now stable.',
+            'Release highlights',
+        ]
+        paragraphs += [filler] * 3 + [
+            f'Paragraph {i}: {filler}' for i in range(40)
+        ] + ['Sidecar containers restart policy replaces the old workarounds in Kubernetes.']
+        paragraphs += ['Subscribe to our newsletter'] * 20
+        return '\n\n'.join(paragraphs)
+
+    def test_short_text_is_unchanged(self):
+        text = 'A short article. Nothing to cut.'
+        self.assertEqual(condense(text, self.TITLE, budget=100), text)
+
+    def test_keeps_lead_headings_and_title_sentences_within_budget(self):
+        text = self.article()
+        condensed = condense(text, self.TITLE, budget=200)
+
+        self.assertGreater(estimate_tokens(text), 2000)
+        self.assertLessEqual(estimate_tokens(condensed), 200)
+        lines = condensed.split('\n')
+        self.assertEqual(lines[0], 'The Kubernetes project released version 1.33 today. Sidecar containers are now stable.')
+        self.assertEqual(lines[1], 'Release highlights')
+        self.assertIn('Sidecar containers restart policy replaces the old workarounds in Kubernetes.', condensed)
+        # Repeated boilerplate appears once at most
+        self.assertLessEqual(condensed.count('Subscribe to our newsletter'), 1)
+
+    def test_prompt_is_built_from_condensed_text(self):
+        clear_summary_cache()
+        self.addCleanup(clear_summary_cache)
+        llm = StubLLM()
+        with clients.override('llm', LLMClient(llm)), \
+                unittest.mock.patch.object(config, 'LLM_INPUT_TOKEN_BUDGET', 300):
+            llm_helpers.summarize_text(self.article(), title=self.TITLE)
+
+        article = llm.prompts[0].rsplit('Article content:', 1)[1]
+        self.assertLessEqual(estimate_tokens(article), 301)
+        self.assertIn('Sidecar containers are now stable.', article)
+
+
+class TestLLMClient(unittest.TestCase):
+    ARTICLES = [f'Article {i} says that release {i} of the platform is out today. ' * 20 for i in range(8)]
+
+    def setUp(self):
+        clear_summary_cache()
+        self.addCleanup(clear_summary_cache)
+
+    def client(self, server, **kwargs):
+        return LLMClient(OpenAIChatProvider(lambda: 'sk-test', api_base=server.api_base), **kwargs)
+
+    def test_summarize_many_runs_concurrently(self):
+        with LLMServer(latency=0.3) as server:
+            with clients.override('llm', self.client(server)):
+                started = time.monotonic()
+                summaries = llm_helpers.summarize_many(self.ARTICLES + [''])
+                elapsed = time.monotonic() - started
+
+        self.assertEqual(summaries[3], 'Article 3 says that release 3 of the')
+        self.assertEqual(summaries[-1], '')
+        self.assertEqual(len(server.requests), 8)
+        self.assertEqual(server.requests[0][0]['Authorization'], 'Bearer sk-test')
+        self.assertEqual(server.peak, 8)
+        # Roughly one call's latency, not eight
+        self.assertLess(elapsed, 1.2)
+
+    def test_transient_errors_are_retried(self):
+        with LLMServer(failures=2) as server:
+            client = self.client(server)
+            with unittest.mock.patch.object(config, 'LLM_BACKOFF_BASE', 0.01):
+                self.assertTrue(client.complete('Article content: a b c'))
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(client.stats(), {'requests': 3, 'retries': 2, 'failures': 0})
+
+    def test_retry_after_as_http_date(self):
+        retry_at = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        for header, low, high in [(retry_at, 25, 30), ('Wed, 21 Oct 2015 07:28:00 GMT', 0, 0),
+                                  ('7', 7, 7), ('soon', None, None)]:
+            with self.subTest(header=header):
+                with LLMServer(failures=1, retry_after=header) as server:
+                    with self.assertRaises(LLMError) as raised:
+                        OpenAIChatProvider(lambda: 'sk-test', api_base=server.api_base).complete('prompt', 10, 5)
+                retry_after = raised.exception.retry_after
+                self.assertTrue(raised.exception.retryable)
+                if low is None:
+                    self.assertIsNone(retry_after)
+                else:
+                    self.assertTrue(low <= retry_after <= high, retry_after)
+
+        # An unparseable header falls back to the jittered backoff
+        with LLMServer(failures=1, retry_after='soon') as server:
+            client = self.client(server)
+            with unittest.mock.patch.object(config, 'LLM_BACKOFF_BASE', 0.01):
+                self.assertTrue(client.complete('Article content: a b c'))
+        self.assertEqual(client.stats(), {'requests': 2, 'retries': 1, 'failures': 0})
+
+    def test_rejected_key_is_not_retried(self):
+        with LLMServer(failures=5, failure_status=401) as server:
+            with clients.override('llm', self.client(server)), \
+                    unittest.mock.patch('llm_helpers._invalidate_openai_key') as invalidate:
+                self.assertEqual(llm_helpers.summarize_text(self.ARTICLES[0]), '')
+            with self.assertRaises(LLMAuthError):
+                self.client(server).complete('prompt')
+        self.assertEqual(len(server.requests), 2)
+        invalidate.assert_called_once()
+
+    def test_request_deadline(self):
+        with LLMServer(latency=2) as server:
+            client = self.client(server, request_deadline=0.5)
+            started = time.monotonic()
+            results = client.complete_many(['a', 'b'])
+        self.assertTrue(all(isinstance(result, DeadlineExceeded) or 'timed out' in str(result).lower()
+                            for result in results))
+        self.assertLess(time.monotonic() - started, 1.5)
+
+    def test_rate_limits(self):
+        limiter = RateLimiter(rpm=60, tpm=1000000)
+        for _ in range(60):
+            limiter.acquire(10, deadline=time.monotonic())
+        # The 61st request has to wait a second for the bucket to refill
+        with self.assertRaises(DeadlineExceeded):
+            limiter.acquire(10, deadline=time.monotonic() + 0.5)
+
+        limiter = RateLimiter(rpm=1000, tpm=1000)
+        limiter.acquire(600)
+        # 200 tokens short, 12 seconds of refill
+        with self.assertRaises(DeadlineExceeded):
+            limiter.acquire(600, deadline=time.monotonic() + 1)
+        limiter.acquire(400, deadline=time.monotonic() + 0.1)
+
+
+class TestLocalSummarizer(unittest.TestCase):
+    TITLE = 'Python 3.13 removes the global interpreter lock'
+    TEXT = '\n\n'.join([
+        'Python 3.13 ships an experimental build without the global interpreter lock.',
+        'The conference was held in a large hall. Lunch was served at noon. Many people attended the talks.',
+        'Free-threaded Python lets threads run Python code in parallel on several cores.',
+        'Removing the global interpreter lock has been discussed for years by the Python core developers.',
+        'Subscribe to our newsletter',
+        'The weather was pleasant during the whole week of the event.',
+    ])
+
+    def setUp(self):
+        clear_summary_cache()
+        self.addCleanup(clear_summary_cache)
+
+    def test_summary_is_short_relevant_and_fast(self):
+        summarize_local(self.TEXT, self.TITLE) # warm the stemmer cache
+        started = time.perf_counter()
+        summary = summarize_local(self.TEXT, self.TITLE, max_chars=200)
+        elapsed = time.perf_counter() - started
+
+        self.assertLessEqual(len(summary), 200)
+        self.assertIn('global interpreter lock', summary)
+        self.assertNotIn('Lunch', summary)
+        self.assertNotIn('newsletter', summary)
+        self.assertLess(elapsed, 0.05)
+        self.assertEqual(summarize_local('', self.TITLE), '')
+
+    def summarize(self, mode, llm, race_deadline=8):
+        feed = FeedConfig({'feed_id': 'feedA', 'summarizer': mode})
+        with clients.override('llm', llm), \
+                unittest.mock.patch.object(config, 'SUMMARY_RACE_DEADLINE', race_deadline):
+            return summarize_texts([self.TEXT, ''], [self.TITLE, 'Empty'], [['#Python'], []], feed)
+
+    def test_local_mode_never_calls_the_llm(self):
+        stub = StubLLM()
+        results = self.summarize('local', LLMClient(stub))
+        self.assertEqual(stub.calls, 0)
+        self.assertEqual(results[0][1], 'local')
+        self.assertTrue(results[0][0].endswith('#Python'))
+        self.assertEqual(results[1], ('', ''))
+
+    def test_fallback_mode_covers_llm_failures(self):
+        failing = StubLLM(error=RuntimeError('service unavailable'))
+        self.assertEqual(self.summarize('fallback', LLMClient(failing))[0][1], 'local')
+        self.assertEqual(self.summarize('llm', LLMClient(failing))[0], ('', ''))
+        self.assertEqual(self.summarize('fallback', LLMClient(StubLLM()))[0][1], 'llm')
+
+    def test_race_mode_does_not_wait_for_a_slow_llm(self):
+        with LLMServer(latency=2) as server:
+            client = LLMClient(OpenAIChatProvider(lambda: 'sk-test', api_base=server.api_base))
+            started = time.monotonic()
+            results = self.summarize('race', client, race_deadline=0.3)
+        self.assertLess(time.monotonic() - started, 1.5)
+        self.assertEqual(results[0][1], 'local')
+
+
+class TestPageCache(unittest.TestCase):
+    PARAGRAPH = ('<p>The new release of the database adds vector search, so embeddings can be queried '
+                 'next to the regular data without running a separate service for them.</p>')
+
+    def setUp(self):
+        reset_page_cache()
+        self.addCleanup(reset_page_cache)
+        clear_summary_cache()
+        self.addCleanup(clear_summary_cache)
+
+    def article(self, name, paragraphs=4):
+        return {'body': (
+            '<html><head><title>{0}</title>'
+            '<meta property="og:title" content="{0}"/><meta property="og:type" content="article"/>'
+            '<meta property="og:image" content="/images/{0}.png"/><meta property="og:url" content="/{0}"/>'
+            '<meta property="og:description" content="{0}"/></head>'
+            '<body><article><h1>{0}</h1>{1}</article></body></html>'
+        ).format(name, self.PARAGRAPH * paragraphs).encode('utf-8')}
+
+    def test_one_fetch_per_article(self):
+        routes = {f'/article{i}': self.article(f'article{i}') for i in range(3)}
+        feed = FeedConfig({'feed_id': 'feedA', 'summarizer': 'local'})
+        with FeedServer(routes) as server:
+            items = [{'url': server.url(path), 'title': f'Vector search in release {i}'}
+                     for i, path in enumerate(routes)]
+            results = enrich_items(items, feed)
+            fetched = [path for path, headers in server.requests]
+
+        self.assertEqual(sorted(fetched), sorted(routes))
+        for result in results:
+            self.assertEqual(result['summary_source'], 'local')
+            self.assertTrue(result['thumbnail_url'].endswith('.png'))
+        self.assertEqual(get_page_cache().stats()['fetches'], 3)
+
+    def test_every_fallback_parses_the_same_download(self):
+        routes = {'/short': self.article('short', paragraphs=0)}
+        with FeedServer(routes) as server, \
+                unittest.mock.patch('llm_helpers.time.sleep') as sleep:
+            self.assertEqual(llm_helpers.extract_article_text(server.url('/short')), '')
+            fetched = [path for path, headers in server.requests]
+
+        self.assertEqual(fetched, ['/short'])
+        sleep.assert_not_called()
+
+    def test_failed_fetch_is_retried_only_with_other_headers(self):
+        routes = {'/blocked': {'body': b'denied', 'status': 403}}
+        cache = PageCache()
+        with FeedServer(routes) as server:
+            url = server.url('/blocked')
+            for agent in ('bot', 'bot', 'browser'):
+                self.assertFalse(cache.fetch(url, headers={'User-Agent': agent}).ok)
+            self.assertEqual(len(server.requests), 2)
+
+    def test_disk_layer_is_reused_until_it_expires(self):
+        directory = tempfile.mkdtemp()
+        routes = {'/article': self.article('article')}
+        with FeedServer(routes) as server:
+            url = server.url('/article')
+            PageCache(store=DiskPageStore(directory)).fetch(url)
+            # A later invocation, same /tmp
+            page = PageCache(store=DiskPageStore(directory)).fetch(url)
+            self.assertEqual(page.content, routes['/article']['body'])
+            self.assertEqual(len(server.requests), 1)
+
+            PageCache(store=DiskPageStore(directory, ttl=0.01)).get(url)
+            time.sleep(0.05)
+            expired = PageCache(store=DiskPageStore(directory, ttl=0.01))
+            expired.fetch(url)
+            self.assertEqual(expired.stats()['fetches'], 1)
+            self.assertEqual(len(server.requests), 2)
+
+
+class TestExtractionMemo(unittest.TestCase):
+    def setUp(self):
+        reset_page_cache()
+        self.addCleanup(reset_page_cache)
+        clear_extraction_memo()
+        self.addCleanup(clear_extraction_memo)
+        self.memo_file = os.path.join(tempfile.mkdtemp(), 'extraction_memo.json')
+        self.enterContext(unittest.mock.patch.dict(os.environ, {'EXTRACTION_MEMO_FILE': self.memo_file}))
+        self.sleep = self.enterContext(unittest.mock.patch('llm_helpers.time.sleep'))
+
+    def extract(self, server, path):
+        before = len(server.requests)
+        text = llm_helpers.extract_article_text(server.url(path))
+        return text, len(server.requests) - before
+
+    def test_known_good_strategy_is_tried_first(self):
+        with FeedServer(site_routes('blocked', 2)) as server:
+            self.assertTrue(self.extract(server, '/article0')[0])
+            self.assertEqual(get_extraction_memo().stats()['attempts'], 4)
+            clear_extraction_memo() # cold start, the memo is read back from its store
+            self.assertTrue(self.extract(server, '/article1')[0])
+
+        stats = get_extraction_memo().stats()
+        self.assertEqual((stats['articles'], stats['attempts']), (1, 1))
+        with open(self.memo_file) as f:
+            record = json.load(f)[f'127.0.0.1:{server.httpd.server_address[1]}']
+        self.assertEqual(record['last_success'], 'curl')
+        self.assertEqual(record['strategies']['newspaper']['failures'], 1)
+        self.sleep.assert_not_called()
+
+    def test_blocked_site_costs_one_request_once_known(self):
+        with FeedServer(site_routes('blocked', 2)) as server:
+            text, first_requests = self.extract(server, '/article0')
+            self.assertTrue(text)
+            text, second_requests = self.extract(server, '/article1')
+            self.assertTrue(text)
+
+        self.assertGreater(first_requests, 5)
+        self.assertEqual(second_requests, 1)
+        self.assertEqual(get_extraction_memo().stats()['attempts_per_article'], 2.5)
+
+    def test_deadline_bounds_slow_sites(self):
+        routes = {'/slow': {'body': b'<html></html>', 'delay': 2}}
+        with FeedServer(routes) as server, \
+                unittest.mock.patch.object(config, 'EXTRACT_DEADLINE', 0.5):
+            started = time.monotonic()
+            self.assertEqual(llm_helpers.extract_article_text(server.url('/slow')), '')
+            elapsed = time.monotonic() - started
+        self.assertLess(elapsed, 1.5)
+
+    def test_dynamodb_store(self):
+        resource = FakeDynamoDBResource(keys={'ExtractionMemo': 'domain'})
+        with clients.override('dynamodb', resource):
+            memo = ExtractionMemo(store=DynamoExtractionStore('ExtractionMemo'))
+            memo.record('example.com', [('newspaper', False, 120), ('curl', True, 40)])
+            # A new container reads the record back
+            memo = ExtractionMemo(store=DynamoExtractionStore('ExtractionMemo'))
+            self.assertEqual(memo.order('example.com', ['newspaper', 'advanced', 'curl']),
+                             ['curl', 'advanced', 'newspaper'])
+
+
+class TestHtmlText(unittest.TestCase):
+    PAGE = """<html><head><title>Release notes</title><script>var tracking = 1;</script></head><body>
+    <header><nav><a href="/">Home</a> <a href="/news">News</a> <a href="/about">About us and our team</a></nav></header>
+    <div class="layout">
+      <div id="main-story">
+        <h1>Sidecar containers are stable</h1>
+        <p>Kubernetes 1.33 graduates sidecar containers to stable, after two releases in beta.</p>
+        <p>Sidecars start before the main container and stop after it, so <a href="/logs">log shippers</a>
+           and proxies see every request.</p>
+        <h2>Upgrading</h2>
+        <ul><li>Clusters on 1.32 can enable the feature gate today.</li><li>No change is needed for existing pods.</li></ul>
+        <div class="share-buttons"><a href="/t">Share on social media with your friends</a></div>
+      </div>
+      <div class="related-posts"><p>Related: ten things you did not know about containers, part two.</p></div>
+      <div id="comments"><p>Great article, thanks for writing it up, it was very useful.</p></div>
+    </div>
+    <footer><p>Copyright 2025, all rights reserved by the example company.</p></footer>
+    </body></html>"""
+
+    def test_keeps_the_article_blocks_in_order(self):
+        self.assertEqual(extract_text(self.PAGE).split('\n'), [
+            'Sidecar containers are stable',
+            'Kubernetes 1.33 graduates sidecar containers to stable, after two releases in beta.',
+            'Sidecars start before the main container and stop after it, so log shippers and proxies see every request.',
+            'Upgrading',
+            'Clusters on 1.32 can enable the feature gate today.',
+            'No change is needed for existing pods.',
+        ])
+
+    def test_pages_without_text(self):
+        self.assertEqual(extract_text(b''), '')
+        self.assertEqual(extract_text('<html><body><nav><a href="/">Home</a></nav></body></html>'), '')
+
+    def test_is_the_first_extraction_strategy(self):
+        reset_page_cache()
+        self.addCleanup(reset_page_cache)
+        clear_extraction_memo()
+        self.addCleanup(clear_extraction_memo)
+        with FeedServer(site_routes('list', 1)) as server, \
+                unittest.mock.patch('llm_helpers._download_article') as newspaper_parse:
+            text = llm_helpers.extract_article_text(server.url('/article0'))
+        self.assertIn('vector search', text)
+        newspaper_parse.assert_not_called()
+        self.assertEqual(get_extraction_memo().stats()['attempts'], 1)
+
+
+class TestParallelEnrich(unittest.TestCase):
+    def setUp(self):
+        reset_page_cache()
+        self.addCleanup(reset_page_cache)
+        clear_extraction_memo()
+        self.addCleanup(clear_extraction_memo)
+        routes = site_routes('newspaper', 4)
+        routes['/blocked'] = site_routes('blocked', 1)['/article0']
+        self.server = self.enterContext(FeedServer(routes))
+        self.items = [{'url': self.server.url(path), 'title': f'Kubernetes release {i}'}
+                      for i, path in enumerate(routes)]
+        self.feed = FeedConfig({'feed_id': 'feedA', 'summarizer': 'local'})
+
+    def attributes(self, results):
+        return {
+            item['url']: {key: value for key, value in attributes.items() if key not in ('enriched_at', 'enrich_ms')}
+            for item, attributes in results
+        }
+
+    def test_same_results_as_in_process_enrichment(self):
+        with unittest.mock.patch.object(config, 'ENRICH_BATCH_SIZE', 2):
+            parallel = list(enrich_parallel(self.items, self.feed, workers=2))
+        article_fetches = [path for path, headers in self.server.requests if path.startswith('/article')]
+        self.assertEqual(sorted(article_fetches), [f'/article{i}' for i in range(4)])
+        # Downloads went through the page cache, extractions into the domain memo
+        parallel_fetches = get_page_cache().stats()['fetches']
+        memo = get_extraction_memo()
+        self.assertEqual(memo.stats()['extracted'], len(self.items))
+        self.assertEqual(memo.get(domain_of(self.server.url('/')))['last_success'], 'curl')
+
+        # Without the domain memo and the pages of the parallel run
+        clear_extraction_memo()
+        reset_page_cache()
+        serial = zip(self.items, enrich_items(self.items, self.feed))
+        self.assertEqual(self.attributes(parallel), self.attributes(serial))
+        # The fallback found the workers' downloads in the cache
+        self.assertEqual(parallel_fetches, get_page_cache().stats()['fetches'])
+        for item, attributes in parallel:
+            self.assertTrue(attributes['text_digest'])
+            self.assertEqual(attributes['summary_source'], 'local')
+
+    def test_dead_worker_is_replaced(self):
+        worker_pool = parallel_enrich.WorkerPool
+        with unittest.mock.patch('parallel_enrich.WorkerPool',
+                                 lambda workers: worker_pool(workers, parser=parse_or_exit)):
+            results = list(enrich_parallel(self.items, self.feed, workers=2))
+        self.assertEqual(len(results), len(self.items))
+        self.assertTrue(all(attributes['text_digest'] for item, attributes in results))
+
+    def test_enrichment_helper_with_workers(self):
+        resource = FakeDynamoDBResource(indexes={'RSSContent': {
+            QUEUE_INDEX: ('queue_feed', 'queue_sort', ()),
+            ENRICH_INDEX: ('enrich_feed', 'dateAdded', ()),
+        }})
+        self.enterContext(clients.override('dynamodb', resource))
+        self.enterContext(clients.override('client:ssm', unittest.mock.Mock()))
+        db_ops = DynamoDBOps()
+        db_ops.batch_write_rss_items([
+            dict(item, dateAdded=f'2025-01-0{i + 1}T10:00:00', feed_id='feedA') for i, item in enumerate(self.items)
+        ], selection_policy(self.feed))
+
+        helper = EnrichmentHelper('feedA', feed_config=self.feed, db_ops=db_ops)
+        stats = helper.enrich_pending(workers=2)
+        self.assertEqual(stats, {'pending': 5, 'enriched': 5, 'failed': 0, 'deferred': 0})
+        self.assertEqual(resource.Table('RSSContent').index_size(ENRICH_INDEX), 0)
+        self.assertIn('download', helper.timings)
+
+
+class TestHashtagMatcher(unittest.TestCase):
+    def test_matches_golden_titles(self):
+        for title, hashtags in GOLDEN_HASHTAGS.items():
+            with self.subTest(title=title):
+                self.assertEqual(sorted(generate_hashtags_fuzzy(title)), hashtags)
+
+    def test_batch_matches_single_titles(self):
+        self.assertEqual(generate_hashtags_batch(TITLES), [generate_hashtags_fuzzy(title) for title in TITLES])
+        self.assertEqual(generate_hashtags_batch([]), [])
+
+    def test_exact_phrases_overlap(self):
+        matcher = HashtagMatcher({'cloud': '#Cloud', 'cloud computing': '#CloudComputing',
+                                  'computing': '#computing', 'Cloud': '#Cloud'}, threshold=None)
+        self.assertEqual(len(matcher), 3)
+        self.assertEqual(matcher.match('Cloud computing, explained'), ['#Cloud', '#CloudComputing', '#computing'])
+        self.assertEqual(matcher.match('Cloudy computers'), [])
+
+    def test_fuzzy_threshold(self):
+        matcher = HashtagMatcher({'kubernetes': '#Kubernetes'})
+        self.assertEqual(matcher.match('Kubernets in production'), ['#Kubernetes'])
+        self.assertEqual(HashtagMatcher({'kubernetes': '#Kubernetes'}, threshold=None).match('Kubernets'), [])
+
+    def test_feed_dictionary(self):
+        self.addCleanup(clear_matchers)
+        keywords = {'python': '#Python', 'Kubernetes': '#Kubernetes'}
+        feed = FeedConfig({'feed_id': 'feedA', 'hashtag_keywords': keywords,
+                           'hashtag_version': dictionary_version(keywords)})
+        self.assertEqual(generate_hashtags_fuzzy('Python on AWS Lambda', feed), ['#Python'])
+        self.assertEqual(generate_hashtags_batch(['Python on AWS Lambda'], FeedConfig({'feed_id': 'feedB'})),
+                         [['#AWS']])
+        self.assertEqual(len(feed_matcher(feed)), 2)
+
+    def test_matchers_are_cached_per_version(self):
+        self.addCleanup(clear_matchers)
+        keywords = {'python': '#Python'}
+        version = dictionary_version(keywords)
+        self.assertEqual(version, dictionary_version(dict(reversed(keywords.items()))))
+        matcher = get_matcher(keywords, version)
+        self.assertIs(get_matcher(dict(keywords), version), matcher)
+        self.assertIs(get_matcher(keywords), matcher)
+        self.assertIsNot(get_matcher({'python': '#python3'}), matcher)
+        self.assertIs(get_matcher(), get_matcher({}))
+        self.assertIs(feed_matcher(FeedConfig({'feed_id': 'feedA', 'hashtag_keywords': {}})), get_matcher())
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,7 @@
-import requests
 import yaml
 
+import http_client
+
 def load_feed_urls_from_yaml(file_path):
     with open(file_path, 'r') as f:
         data = yaml.safe_load(f)
@@ -18,7 +19,7 @@ def validate_feed_urls(urls, timeout=10):
 
     for url in urls:
         try:
-            response = requests.get(url, headers=headers, timeout=timeout)
+            response = http_client.get(url, headers=headers, timeout=timeout)
             content_type = response.headers.get('Content-Type', '')
 
             if response.status_code == 200 and ('xml' in content_type or 'rss' in content_type or 'atom' in content_type):
@@ -27,7 +28,7 @@ def validate_feed_urls(urls, timeout=10):
                 results.append((url, False, "Accessible but not a feed"))
             else:
                 results.append((url, False, f"HTTP {response.status_code}"))
-        except requests.RequestException as e:
+        except http_client.REQUEST_ERRORS as e:
             results.append((url, False, str(e)))
 
     return results